@@ -1,19 +1,28 @@
 from pyairtable import Api
 from pyairtable.api.table import Table
 from pyairtable.api.types import RecordDict
+from requests.adapters import BaseAdapter
 
 import bigger_picker.config as config
+import bigger_picker.sessions as sessions
 from bigger_picker.credentials import load_token
 
 
 class AirtableManager:
     def __init__(
-        self, api_key: str | None = None, base_id: str = config.AIRTABLE_BASE_ID
+        self,
+        api_key: str | None = None,
+        base_id: str = config.AIRTABLE_BASE_ID,
+        transport: BaseAdapter | None = None,
     ):
         if api_key is None:
             api_key = load_token("AIRTABLE_TOKEN")
 
-        self.api = Api(api_key)
+        # Retries come from the shared session settings rather than pyairtable's
+        self.api = Api(api_key, retry_strategy=False)
+        sessions.configure_session(self.api.session)
+        if transport is not None:
+            sessions.mount_transport(self.api.session, transport)
         self.base_id = base_id
         self.tables = {
             table_name: self.api.table(base_id, table_id)
@@ -43,6 +52,16 @@ class AirtableManager:
 
         return table.create(payload, typecast=True)
 
+    def batch_create_records(
+        self, table_name: str, payloads: list[dict]
+    ) -> list[RecordDict]:
+        """Creates records in chunks of 10 (the Airtable per-request limit)."""
+        if not payloads:
+            return []
+        table = self.get_table(table_name)
+
+        return table.batch_create(payloads, typecast=True)
+
     def upload_attachment(
         self, table_name: str, record_id: str, field_name: str, file_path: str
     ) -> RecordDict:
@@ -5,6 +5,7 @@ import asana
 from asana.rest import ApiException
 
 import bigger_picker.config as config
+import bigger_picker.sessions as sessions
 from bigger_picker.credentials import load_token
 
 
@@ -28,14 +29,23 @@ class AsanaManager:
     )
 
     def __init__(
-        self, asana_token: str | None = None, project_id: str = config.ASANA_PROJECT_ID
+        self,
+        asana_token: str | None = None,
+        project_id: str = config.ASANA_PROJECT_ID,
+        transport=None,
     ):
         if asana_token is None:
             asana_token = load_token("ASANA_TOKEN")
 
         configuration = asana.Configuration()
         configuration.access_token = asana_token
+        sessions.configure_asana(configuration)
         self.client = asana.ApiClient(configuration)
+        sessions.configure_asana_client(self.client)
+        if transport is not None:
+            # Anything with urllib3's PoolManager.request, e.g. a FakeAsana
+            # transport for offline benchmarks
+            self.client.rest_client.pool_manager = transport
         self.tasks_api_instance = asana.TasksApi(self.client)
         self.events_api_instance = asana.EventsApi(self.client)
         self.project_id = project_id
@@ -1,11 +1,22 @@
 import json
 import os
+import threading
 from datetime import datetime
 
+from bigger_picker.jsonl import append_jsonl, read_jsonl
+
+# Batches in these states are never polled or processed again
+_FINISHED = ("completed", "failed")
+
 
 class BatchTracker:
-    def __init__(self, filepath="batches.json"):
+    def __init__(self, filepath="batches.json", ledger_path: str | None = None):
         self.filepath = filepath
+        if ledger_path is None:
+            ledger_path = os.path.splitext(filepath)[0] + ".ledger.jsonl"
+        self.ledger_path = ledger_path
+        self._ledger: dict[tuple[str, str], dict] | None = None
+        self._ledger_lock = threading.Lock()
         if not os.path.exists(filepath):
             self._save({})
 
@@ -14,24 +25,188 @@ class BatchTracker:
             return json.load(f)
 
     def _save(self, data):
-        with open(self.filepath, "w") as f:
+        # Write to a temporary file first so a crash mid-write never leaves a
+        # truncated tracker behind.
+        tmp_path = f"{self.filepath}.tmp"
+        with open(tmp_path, "w") as f:
             json.dump(data, f, indent=4)
+        os.replace(tmp_path, self.filepath)
 
-    def add_batch(self, batch_id, batch_type):
+    def add_batch(
+        self,
+        batch_id,
+        batch_type,
+        requests: list[dict] | None = None,
+        prompt_version: str | None = None,
+        estimated_tokens: int | None = None,
+    ):
+        """Record a submitted batch and, optionally, one row per request in it."""
         data = self._load()
+
+        attempts = {}
+        for batch in data.values():
+            if batch.get("type") != batch_type:
+                continue
+            for row in batch.get("requests", {}).values():
+                article_id = row["article_id"]
+                attempts[article_id] = max(
+                    attempts.get(article_id, 0), row.get("attempt", 1)
+                )
+
+        rows = {}
+        for request in requests or []:
+            article_id = request["article_id"]
+            rows[request["custom_id"]] = {
+                "article_id": article_id,
+                "stage": batch_type,
+                "file_id": request.get("file_id"),
+                "attempt": attempts.get(article_id, 0) + 1,
+                "status": "pending",
+            }
+
         data[batch_id] = {
             "type": batch_type,  # 'abstract', 'fulltext', or 'extraction'
             "status": "in_progress",
             "created_at": datetime.now().isoformat(),
         }
+        if prompt_version is not None:
+            data[batch_id]["prompt_version"] = prompt_version
+        if estimated_tokens is not None:
+            data[batch_id]["estimated_tokens"] = estimated_tokens
+        if rows:
+            data[batch_id]["requests"] = rows
         self._save(data)
 
+    def get_prompt_version(self, batch_id) -> str | None:
+        data = self._load()
+        return data.get(batch_id, {}).get("prompt_version")
+
     def get_pending_batches(self):
         data = self._load()
-        return {k: v for k, v in data.items() if v["status"] != "completed"}
+        return {k: v for k, v in data.items() if v["status"] not in _FINISHED}
 
     def mark_completed(self, batch_id):
         data = self._load()
         if batch_id in data:
             data[batch_id]["status"] = "completed"
             self._save(data)
+        self._discard_results(batch_id)
+
+    def mark_failed(self, batch_id):
+        """Record a batch that OpenAI rejected, so it is no longer polled."""
+        data = self._load()
+        if batch_id in data:
+            data[batch_id]["status"] = "failed"
+            self._save(data)
+        self._discard_results(batch_id)
+
+    def get_enqueued_tokens(self) -> int:
+        """Estimated input tokens of the batches still waiting on OpenAI."""
+        data = self._load()
+        return sum(
+            batch.get("estimated_tokens", 0)
+            for batch in data.values()
+            if batch["status"] not in _FINISHED
+        )
+
+    def get_result(self, batch_id, custom_id) -> dict:
+        """Steps already applied for a result, or an empty dict."""
+        with self._ledger_lock:
+            return dict(self._load_ledger().get((batch_id, custom_id), {}))
+
+    def record_result(self, batch_id, custom_id, **steps):
+        """Append the outcome of an applied step to the idempotency ledger."""
+        self.record_results(batch_id, {custom_id: steps})
+
+    def record_results(self, batch_id, steps_by_id: dict[str, dict]):
+        """Record steps for many results of a batch with a single fsync."""
+        if not steps_by_id:
+            return
+        with self._ledger_lock:
+            ledger = self._load_ledger()
+            append_jsonl(
+                self.ledger_path,
+                (
+                    {"batch_id": batch_id, "custom_id": custom_id, **steps}
+                    for custom_id, steps in steps_by_id.items()
+                ),
+            )
+            for custom_id, steps in steps_by_id.items():
+                ledger.setdefault((batch_id, custom_id), {}).update(steps)
+
+    def _load_ledger(self) -> dict[tuple[str, str], dict]:
+        if self._ledger is not None:
+            return self._ledger
+
+        ledger = {}
+        for entry in read_jsonl(self.ledger_path):
+            key = (entry.pop("batch_id"), entry.pop("custom_id"))
+            ledger.setdefault(key, {}).update(entry)
+        self._ledger = ledger
+        return ledger
+
+    def _discard_results(self, batch_id):
+        """Drop ledger entries for a batch that will not be processed again."""
+        with self._ledger_lock:
+            ledger = self._load_ledger()
+            if not any(key[0] == batch_id for key in ledger):
+                return
+            self._ledger = {k: v for k, v in ledger.items() if k[0] != batch_id}
+            tmp_path = f"{self.ledger_path}.tmp"
+            with open(tmp_path, "w") as f:
+                for (b_id, custom_id), steps in self._ledger.items():
+                    entry = {"batch_id": b_id, "custom_id": custom_id, **steps}
+                    f.write(json.dumps(entry) + "\n")
+            os.replace(tmp_path, self.ledger_path)
+
+    def get_checkpoint(self, batch_id) -> int:
+        """Index of the next unprocessed line in the batch's output file."""
+        data = self._load()
+        return data.get(batch_id, {}).get("checkpoint", 0)
+
+    def save_progress(self, batch_id, checkpoint: int, statuses: dict[str, str]):
+        """Store the output file checkpoint and new request statuses together."""
+        data = self._load()
+        if batch_id not in data:
+            return
+        data[batch_id]["checkpoint"] = checkpoint
+        rows = data[batch_id].get("requests", {})
+        for custom_id, status in statuses.items():
+            if custom_id in rows:
+                rows[custom_id]["status"] = status
+        self._save(data)
+
+    def get_requests(
+        self,
+        batch_id: str | None = None,
+        article_id: int | None = None,
+        stage: str | None = None,
+        status: str | None = None,
+    ) -> list[dict]:
+        data = self._load()
+        rows = []
+        for b_id, batch in data.items():
+            if batch_id is not None and b_id != batch_id:
+                continue
+            for custom_id, row in batch.get("requests", {}).items():
+                if article_id is not None and row["article_id"] != article_id:
+                    continue
+                if stage is not None and row["stage"] != stage:
+                    continue
+                if status is not None and row["status"] != status:
+                    continue
+                rows.append({"batch_id": b_id, "custom_id": custom_id, **row})
+        return rows
+
+    def get_pending_article_ids(self, stage: str | None = None) -> set[int]:
+        """Article IDs with a request in a batch that has not completed yet."""
+        data = self._load()
+        article_ids = set()
+        for batch in data.values():
+            if batch["status"] in _FINISHED:
+                continue
+            if stage is not None and batch["type"] != stage:
+                continue
+            for row in batch.get("requests", {}).values():
+                article_ids.add(row["article_id"])
+        return article_ids
@@ -0,0 +1,89 @@
+import json
+import os
+import tempfile
+import time
+from collections.abc import Callable
+
+import bigger_picker.config as config
+
+
+class BatchWriter:
+    """Streams batch rows to JSONL files split at OpenAI's size and row limits."""
+
+    def __init__(
+        self,
+        batch_type: str,
+        serialize: Callable[[dict], str] = json.dumps,
+        max_bytes: int = config.BATCH_MAX_BYTES,
+        max_rows: int = config.BATCH_MAX_ROWS,
+        directory: str | None = None,
+    ):
+        self.batch_type = batch_type
+        self.max_bytes = max_bytes
+        self.max_rows = max_rows
+        self._serialize = serialize
+        self._tmpdir = None
+        if directory is None:
+            self._tmpdir = tempfile.TemporaryDirectory(prefix="bigger_picker_batch_")
+            directory = self._tmpdir.name
+        self.directory = directory
+        self.files: list[dict] = []
+        self._handle = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cleanup()
+
+    @property
+    def rows(self) -> int:
+        return sum(f["rows"] for f in self.files)
+
+    def add(self, row: dict, tracked: dict | None = None) -> None:
+        """Writes a row, keeping `tracked` for BatchTracker.add_batch."""
+        line = (self._serialize(row) + "\n").encode()
+        if len(line) > self.max_bytes:
+            raise ValueError(
+                f"Row {row.get('custom_id')} is {len(line)} bytes, over the "
+                f"{self.max_bytes} byte batch file limit."
+            )
+
+        current = self.files[-1] if self._handle is not None else None
+        if (
+            current is None
+            or current["rows"] >= self.max_rows
+            or current["bytes"] + len(line) > self.max_bytes
+        ):
+            current = self._roll_over()
+
+        self._handle.write(line)  # type: ignore
+        current["rows"] += 1
+        current["bytes"] += len(line)
+        if tracked is not None:
+            current["tracked"].append(tracked)
+
+    def close(self) -> list[dict]:
+        """Flushes the open file and returns the finished files."""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        return self.files
+
+    def cleanup(self) -> None:
+        self.close()
+        if self._tmpdir is not None:
+            self._tmpdir.cleanup()
+            self._tmpdir = None
+
+    def _roll_over(self) -> dict:
+        self.close()
+        filename = (
+            f"batch_input_{self.batch_type}_{int(time.time())}_"
+            f"{len(self.files) + 1}.jsonl"
+        )
+        path = os.path.join(self.directory, filename)
+        self._handle = open(path, "wb")
+        batch_file = {"path": path, "rows": 0, "bytes": 0, "tracked": []}
+        self.files.append(batch_file)
+        return batch_file
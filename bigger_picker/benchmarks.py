@@ -0,0 +1,358 @@
+import gc
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime
+
+from rich.console import Console
+from rich.table import Table
+
+import bigger_picker.utils as utils
+from bigger_picker.airtable import AirtableManager
+from bigger_picker.asana import AsanaManager
+from bigger_picker.batchwriter import BatchWriter
+from bigger_picker.duplicateindex import DuplicateIndex
+from bigger_picker.fakeservices import (
+    FakeAirtable,
+    FakeAsana,
+    FakeRayyan,
+    FakeService,
+    synthetic_datasets,
+)
+from bigger_picker.integration import IntegrationManager
+from bigger_picker.openai import OpenAIManager
+from bigger_picker.prescreen import AbstractPrescreen, prescreen_text
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+
+# A benchmark builds its inputs for a given record count and seed, and returns
+# the call to time together with the fakes whose requests should be counted.
+Benchmark = Callable[[int, int], tuple[Callable[[], object], dict[str, FakeService]]]
+
+
+def _integration(**managers) -> IntegrationManager:
+    return IntegrationManager(console=Console(quiet=True), **managers)
+
+
+def bench_scores(scale: int, seed: int):
+    airtable = FakeAirtable(dataset_count=scale, seed=seed)
+    integration = _integration(
+        airtable_manager=AirtableManager(
+            "benchmark", transport=airtable.requests_transport()
+        )
+    )
+    return integration.updated_datasets_scores, {"airtable": airtable}
+
+
+def bench_dedup(scale: int, seed: int):
+    datasets = [
+        {"id": f"rec{i:014d}", "createdTime": "", "fields": fields}
+        for i, fields in enumerate(synthetic_datasets(scale, rng=seed))
+    ]
+    return (
+        lambda: utils.identify_duplicate_datasets(datasets, threshold=0.51),
+        {},
+    )
+
+
+def bench_dedup_minhash(scale: int, seed: int):
+    datasets = [
+        {"id": f"rec{i:014d}", "createdTime": "", "fields": fields}
+        for i, fields in enumerate(synthetic_datasets(scale, rng=seed))
+    ]
+    return (
+        lambda: utils.identify_duplicate_datasets(
+            datasets, threshold=0.51, indexing="minhash"
+        ),
+        {},
+    )
+
+
+def bench_dedup_incremental(scale: int, seed: int):
+    # The index is built from all but the last 1% of datasets before timing,
+    # so the timed run only checks the newly added ones
+    datasets = [
+        {"id": f"rec{i:014d}", "createdTime": "", "fields": fields}
+        for i, fields in enumerate(synthetic_datasets(scale, rng=seed))
+    ]
+    directory = tempfile.TemporaryDirectory()
+    index = DuplicateIndex(os.path.join(directory.name, "duplicate_index.json"))
+    index.update(datasets[: scale - max(1, scale // 100)], threshold=0.51)
+
+    def run():
+        with directory:
+            return index.update(datasets, threshold=0.51)
+
+    return run, {}
+
+
+def bench_sync(scale: int, seed: int):
+    airtable = FakeAirtable(dataset_count=scale, seed=seed)
+    asana = FakeAsana(task_count=scale, seed=seed)
+    integration = _integration(
+        airtable_manager=AirtableManager(
+            "benchmark", transport=airtable.requests_transport()
+        ),
+        asana_manager=AsanaManager("benchmark", transport=asana.urllib3_transport()),
+    )
+    return integration.sync_airtable_and_asana, {"airtable": airtable, "asana": asana}
+
+
+def bench_batch_jsonl(scale: int, seed: int):
+    articles = list(FakeRayyan(record_count=scale, seed=seed).articles.values())
+    openai = OpenAIManager(api_key="benchmark")
+
+    def run():
+        with tempfile.TemporaryDirectory() as directory:
+            with BatchWriter(
+                "abstract", serialize=openai.serialize_batch_row, directory=directory
+            ) as writer:
+                for article in articles:
+                    if not article["abstracts"]:
+                        continue
+                    body = openai.prepare_abstract_body(
+                        article["abstracts"][0]["content"]
+                    )
+                    writer.add(
+                        openai.create_batch_row(f"abstract_{article['id']}", body),
+                        tracked={"custom_id": article["id"]},
+                    )
+                return writer.close()
+
+    return run, {}
+
+
+def bench_prescreen(scale: int, seed: int):
+    texts = [
+        prescreen_text(article)
+        for article in FakeRayyan(record_count=scale, seed=seed).articles.values()
+    ]
+    prescreen = AbstractPrescreen()
+    return lambda: prescreen.screen(texts), {}
+
+
+BENCHMARKS: dict[str, Benchmark] = {
+    "scores": bench_scores,
+    "dedup": bench_dedup,
+    "dedup_minhash": bench_dedup_minhash,
+    "dedup_incremental": bench_dedup_incremental,
+    "sync": bench_sync,
+    "batch_jsonl": bench_batch_jsonl,
+    "prescreen": bench_prescreen,
+}
+
+
+def run_benchmark(
+    name: str, scale: int, repeat: int = 3, seed: int = 0, memory: bool = True
+) -> dict:
+    """Times the fastest of `repeat` runs, then measures peak memory in one more."""
+    timings = []
+    api_calls: dict[str, int] = {}
+    for _ in range(max(1, repeat)):
+        operation, fakes = BENCHMARKS[name](scale, seed)
+        gc.collect()
+        start = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - start)
+        api_calls = {
+            service: sum(fake.request_counts.values())
+            for service, fake in fakes.items()
+        }
+
+    peak_mb = None
+    if memory:
+        # Measured separately because tracing slows every allocation down
+        operation, _ = BENCHMARKS[name](scale, seed)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            operation()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        peak_mb = round(peak / 1024 / 1024, 2)
+
+    return {
+        "benchmark": name,
+        "scale": scale,
+        "seconds": round(min(timings), 4),
+        "peak_mb": peak_mb,
+        "api_calls": api_calls,
+    }
+
+
+def labelled_duplicates(
+    scale: int, seed: int = 0, duplicate_ratio: float = 0.05
+) -> tuple[list[dict], set[frozenset[str]]]:
+    """Synthetic dataset records and the true pairs of duplicate record ids."""
+    rng = random.Random(seed)
+    records = [
+        {"id": f"rec{i:014d}", "createdTime": "", "fields": fields}
+        for i, fields in enumerate(
+            synthetic_datasets(scale, duplicate_ratio=0, rng=rng)
+        )
+    ]
+    truth = set()
+    for i, record in enumerate(records[1:], start=1):
+        if rng.random() >= duplicate_ratio:
+            continue
+        original = records[rng.randrange(i)]
+        name = original["fields"]["Dataset Name"]
+        words = name.split()
+        variant = rng.choice(["wave", "reorder", "drop", "typo"])
+        if variant == "wave":
+            name = f"{name} (Wave {rng.randint(2, 5)})"
+        elif variant == "reorder":
+            rng.shuffle(words)
+            name = " ".join(words)
+        elif variant == "drop":
+            del words[rng.randrange(len(words))]
+            name = " ".join(words)
+        else:
+            k = rng.randrange(len(name) - 1)
+            name = name[:k] + name[k + 1] + name[k] + name[k + 2 :]
+
+        fields = record["fields"]
+        fields["Dataset Name"] = name
+        fields["Dataset Contact Name"] = original["fields"]["Dataset Contact Name"]
+        if rng.random() < 0.5:
+            fields["Dataset Contact Email"] = original["fields"][
+                "Dataset Contact Email"
+            ]
+        truth.add(frozenset((record["id"], original["id"])))
+    return records, truth
+
+
+def compare_blockers(
+    scale: int,
+    seed: int = 0,
+    strategies: tuple[str, ...] = ("sortedneighbourhood", "minhash"),
+) -> list[dict]:
+    """Candidate pairs, time and duplicate recall of each indexing strategy."""
+    records, truth = labelled_duplicates(scale, seed)
+    rows = []
+    for indexing in strategies:
+        start = time.perf_counter()
+        pairs = utils.duplicate_candidate_pairs(records, indexing=indexing)
+        seconds = time.perf_counter() - start
+        found = {frozenset(pair) for pair in pairs}
+        rows.append(
+            {
+                "indexing": indexing,
+                "scale": scale,
+                "pairs": len(pairs),
+                "seconds": round(seconds, 4),
+                "recall": round(len(truth & found) / len(truth), 4) if truth else None,
+            }
+        )
+    return rows
+
+
+def create_blocker_table(rows: list[dict]) -> Table:
+    table = Table(title="Duplicate blockers")
+    table.add_column("Indexing", style="cyan")
+    table.add_column("Records", justify="right")
+    table.add_column("Pairs", justify="right")
+    table.add_column("Time (s)", justify="right")
+    table.add_column("Recall", justify="right")
+
+    for row in rows:
+        table.add_row(
+            row["indexing"],
+            f"{row['scale']:,}",
+            f"{row['pairs']:,}",
+            f"{row['seconds']:.3f}",
+            "-" if row["recall"] is None else f"{row['recall']:.1%}",
+        )
+    return table
+
+
+def save_results(path: str, results: list[dict]) -> None:
+    data = {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=4)
+
+
+def load_results(path: str) -> list[dict]:
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def compare_results(
+    results: list[dict], baseline: list[dict], tolerance: float = 0.2
+) -> list[dict]:
+    """Pairs results with their baseline and flags time, memory or API call growth."""
+    previous = {(row["benchmark"], row["scale"]): row for row in baseline}
+    comparisons = []
+    for row in results:
+        base = previous.get((row["benchmark"], row["scale"]))
+        if base is None:
+            comparisons.append({**row, "baseline": None, "regressed": False})
+            continue
+
+        time_ratio = row["seconds"] / base["seconds"] if base["seconds"] else None
+        memory_ratio = None
+        if row["peak_mb"] is not None and base["peak_mb"]:
+            memory_ratio = row["peak_mb"] / base["peak_mb"]
+        calls = sum(row["api_calls"].values())
+        base_calls = sum(base["api_calls"].values())
+        comparisons.append(
+            {
+                **row,
+                "baseline": base,
+                "time_ratio": time_ratio,
+                "memory_ratio": memory_ratio,
+                "regressed": (
+                    (time_ratio or 0) > 1 + tolerance
+                    or (memory_ratio or 0) > 1 + tolerance
+                    or calls > base_calls
+                ),
+            }
+        )
+    return comparisons
+
+
+def create_benchmark_table(comparisons: list[dict]) -> Table:
+    table = Table(title="Benchmarks")
+    table.add_column("Benchmark", style="cyan")
+    table.add_column("Records", justify="right")
+    table.add_column("Time (s)", justify="right")
+    table.add_column("Peak MB", justify="right")
+    table.add_column("API calls", justify="right")
+    table.add_column("vs baseline", justify="right")
+
+    for row in comparisons:
+        calls = ", ".join(f"{k}: {v}" for k, v in row["api_calls"].items()) or "-"
+        change = "-"
+        if row.get("baseline") is not None:
+            parts = []
+            if row["time_ratio"] is not None:
+                parts.append(f"time x{row['time_ratio']:.2f}")
+            if row["memory_ratio"] is not None:
+                parts.append(f"mem x{row['memory_ratio']:.2f}")
+            base_calls = sum(row["baseline"]["api_calls"].values())
+            delta = sum(row["api_calls"].values()) - base_calls
+            if delta:
+                parts.append(f"calls {delta:+d}")
+            style = "red" if row["regressed"] else "green"
+            change = f"[{style}]{', '.join(parts) or 'same'}[/{style}]"
+
+        table.add_row(
+            row["benchmark"],
+            f"{row['scale']:,}",
+            f"{row['seconds']:.3f}",
+            "-" if row["peak_mb"] is None else f"{row['peak_mb']:.1f}",
+            calls,
+            change,
+        )
+    return table
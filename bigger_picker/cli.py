@@ -1,6 +1,7 @@
 import os
 import time
 from datetime import datetime
+from functools import partial
 
 import typer
 from dotenv import load_dotenv
@@ -18,10 +19,23 @@ from rich.progress import (
 from bigger_picker.airtable import AirtableManager
 from bigger_picker.asana import AsanaManager
 from bigger_picker.batchtracker import BatchTracker
+from bigger_picker.config import (
+    ASANA_SEARCHES_ENUM_VALUES,
+    EXTRACTION_WORKERS,
+    OPENAI_BATCH_QUEUE_TOKENS,
+    OPENAI_REQUESTS_PER_MINUTE,
+    OPENAI_TOKENS_PER_MINUTE,
+)
+from bigger_picker.decisionstore import DecisionStore
+from bigger_picker.duplicateindex import DuplicateIndex
 from bigger_picker.integration import IntegrationManager
 from bigger_picker.openai import OpenAIManager
+from bigger_picker.pdftext import PdfTextCache
+from bigger_picker.prescreen import AbstractPrescreen
+from bigger_picker.ratelimit import RateLimiter
 from bigger_picker.rayyan import RayyanManager
-from bigger_picker.utils import create_stats_table, setup_logger
+from bigger_picker.screeningcache import ScreeningCache
+from bigger_picker.utils import DUPLICATE_INDEXING, create_stats_table, setup_logger
 
 app = typer.Typer()
 
@@ -33,12 +47,34 @@ def process(
     asana_token: str = typer.Option(None, help="Asana API token"),
     openai_api_key: str = typer.Option(None, help="OpenAI API key"),
     openai_model: str = typer.Option("gpt-5.1", help="OpenAI model to use"),
+    openai_base_url: str = typer.Option(
+        None,
+        help="Base URL of an OpenAI-compatible API, e.g. a fake-openai server",
+    ),
     rayyan_creds_path: str = typer.Option(
         None, help="Path to Rayyan credentials JSON file"
     ),
     max_articles: int = typer.Option(
         None, help="Maximum number of articles to process"
     ),
+    skip_extracted: bool = typer.Option(
+        True,
+        help="Link articles already in Airtable by DOI or title and year "
+        "instead of extracting them again",
+    ),
+    incremental_duplicates: bool = typer.Option(
+        False,
+        "--incremental-duplicates",
+        help="Only compare new or changed datasets when marking duplicates",
+    ),
+    duplicate_index_path: str = typer.Option(
+        "duplicate_index.json", help="Path to the local duplicate blocking index"
+    ),
+    duplicate_indexing: str = typer.Option(
+        "auto",
+        help="Candidate pairs for a full duplicate check: auto, full, "
+        "sortedneighbourhood or minhash",
+    ),
     debug: bool = typer.Option(
         False, "--debug", help="Enable debug logging to console"
     ),
@@ -53,15 +89,20 @@ def process(
 
     console = Console()
 
+    if duplicate_indexing not in DUPLICATE_INDEXING:
+        console.log(f"[red]Unknown duplicate indexing: {duplicate_indexing}[/red]")
+        raise typer.Exit(2)
+
     airtable = AirtableManager(airtable_api_key)
     asana = AsanaManager(asana_token)
-    openai = OpenAIManager(openai_api_key, openai_model)
+    openai = OpenAIManager(openai_api_key, openai_model, openai_base_url)
     rayyan = RayyanManager(rayyan_creds_path)
     integration = IntegrationManager(
         asana_manager=asana,
         airtable_manager=airtable,
         openai_manager=openai,
         rayyan_manager=rayyan,
+        duplicate_index=DuplicateIndex(duplicate_index_path),
         console=console,
         debug=debug,
     )
@@ -70,6 +111,8 @@ def process(
 
     with console.status("Getting unextracted articles..."):
         articles = integration.rayyan.get_unextracted_articles()
+        if skip_extracted:
+            articles = integration.skip_extracted_articles(articles)
         if max_articles is not None:
             articles = articles[:max_articles]
         console.log(f"Found {len(articles)} unextracted articles.")
@@ -95,7 +138,10 @@ def process(
 
     with console.status("Marking duplicates"):
         console.log("Identifying duplicates...")
-        integration.mark_duplicates()
+        if incremental_duplicates:
+            integration.mark_new_duplicates()
+        else:
+            integration.mark_duplicates(indexing=duplicate_indexing)
         console.log("Duplicates marked.")
 
 
@@ -138,12 +184,37 @@ def screenft(
     dotenv_path: str = typer.Option(None, help="Path to .env file with credentials"),
     openai_api_key: str = typer.Option(None, help="OpenAI API key"),
     openai_model: str = typer.Option("gpt-5.1", help="OpenAI model to use"),
+    openai_base_url: str = typer.Option(
+        None,
+        help="Base URL of an OpenAI-compatible API, e.g. a fake-openai server",
+    ),
     rayyan_creds_path: str = typer.Option(
         None, help="Path to Rayyan credentials JSON file"
     ),
     max_articles: int = typer.Option(
         None, help="Maximum number of articles to process"
     ),
+    fulltext_text: bool = typer.Option(
+        False,
+        "--fulltext-text",
+        help="Screen fulltexts from locally extracted methods, participants and "
+        "data availability sections instead of uploading the PDF (needs pypdf)",
+    ),
+    pdf_text_cache: str = typer.Option(
+        "pdf_text_cache", help="Directory for cached fulltext text"
+    ),
+    concurrency: int = typer.Option(
+        1, help="Number of articles to screen at the same time"
+    ),
+    rpm: int = typer.Option(
+        OPENAI_REQUESTS_PER_MINUTE, help="OpenAI requests per minute budget"
+    ),
+    tpm: int = typer.Option(
+        OPENAI_TOKENS_PER_MINUTE, help="OpenAI input tokens per minute budget"
+    ),
+    decisions_path: str = typer.Option(
+        "decisions.jsonl", help="Path to the local store of screening decisions"
+    ),
     debug: bool = typer.Option(
         False, "--debug", help="Enable debug logging to console"
     ),
@@ -158,11 +229,18 @@ def screenft(
 
     console = Console()
 
-    openai = OpenAIManager(openai_api_key, openai_model)
+    openai = OpenAIManager(
+        openai_api_key,
+        openai_model,
+        openai_base_url,
+        rate_limiter=RateLimiter(rpm, tpm),
+    )
     rayyan = RayyanManager(rayyan_creds_path)
     integration = IntegrationManager(
         openai_manager=openai,
         rayyan_manager=rayyan,
+        pdf_text=PdfTextCache(pdf_text_cache) if fulltext_text else None,
+        decisions=DecisionStore(decisions_path),
         console=console,
         debug=debug,
     )
@@ -184,9 +262,12 @@ def screenft(
         console=console,
     ) as progress:
         task = progress.add_task("Screening fulltexts...", total=len(articles))
-        for article in articles:
-            integration.screen_fulltext(article)
-            progress.advance(task, advance=1)
+        integration.screen_concurrently(
+            integration.screen_fulltext,
+            articles,
+            concurrency=concurrency,
+            on_done=lambda: progress.advance(task, advance=1),
+        )
     console.log("Screening complete.")
 
 
@@ -195,12 +276,40 @@ def screenabstract(
     dotenv_path: str = typer.Option(None, help="Path to .env file with credentials"),
     openai_api_key: str = typer.Option(None, help="OpenAI API key"),
     openai_model: str = typer.Option("gpt-5.1", help="OpenAI model to use"),
+    openai_base_url: str = typer.Option(
+        None,
+        help="Base URL of an OpenAI-compatible API, e.g. a fake-openai server",
+    ),
     rayyan_creds_path: str = typer.Option(
         None, help="Path to Rayyan credentials JSON file"
     ),
     max_articles: int = typer.Option(
         None, help="Maximum number of articles to process"
     ),
+    prescreen: bool = typer.Option(
+        False,
+        "--prescreen",
+        help="Exclude clear non-matches (adult-only studies, reviews) with local "
+        "keyword rules before sending abstracts to the model",
+    ),
+    reuse_decisions: bool = typer.Option(
+        True, help="Reuse decisions for abstracts already screened with this prompt"
+    ),
+    screening_cache_path: str = typer.Option(
+        "screening_cache.jsonl", help="Path to the abstract decision cache"
+    ),
+    concurrency: int = typer.Option(
+        1, help="Number of articles to screen at the same time"
+    ),
+    rpm: int = typer.Option(
+        OPENAI_REQUESTS_PER_MINUTE, help="OpenAI requests per minute budget"
+    ),
+    tpm: int = typer.Option(
+        OPENAI_TOKENS_PER_MINUTE, help="OpenAI input tokens per minute budget"
+    ),
+    decisions_path: str = typer.Option(
+        "decisions.jsonl", help="Path to the local store of screening decisions"
+    ),
     debug: bool = typer.Option(
         False, "--debug", help="Enable debug logging to console"
     ),
@@ -215,11 +324,21 @@ def screenabstract(
 
     console = Console()
 
-    openai = OpenAIManager(openai_api_key, openai_model)
+    openai = OpenAIManager(
+        openai_api_key,
+        openai_model,
+        openai_base_url,
+        rate_limiter=RateLimiter(rpm, tpm),
+    )
     rayyan = RayyanManager(rayyan_creds_path)
     integration = IntegrationManager(
         openai_manager=openai,
         rayyan_manager=rayyan,
+        prescreen=AbstractPrescreen() if prescreen else None,
+        screening_cache=ScreeningCache(screening_cache_path)
+        if reuse_decisions
+        else None,
+        decisions=DecisionStore(decisions_path),
         console=console,
         debug=debug,
     )
@@ -242,12 +361,159 @@ def screenabstract(
         console=console,
     ) as progress:
         task = progress.add_task("Screening abstracts...", total=len(articles))
-        for article in articles:
-            integration.screen_abstract(article)
-            progress.advance(task, advance=1)
+        integration.screen_concurrently(
+            integration.screen_abstract,
+            articles,
+            concurrency=concurrency,
+            on_done=lambda: progress.advance(task, advance=1),
+        )
     console.log("Screening complete.")
 
 
+@app.command()
+def rescreen(
+    stage: str = typer.Argument(..., help="Stage to re-screen: abstract or fulltext"),
+    dotenv_path: str = typer.Option(None, help="Path to .env file with credentials"),
+    openai_api_key: str = typer.Option(None, help="OpenAI API key"),
+    openai_model: str = typer.Option("gpt-5.1", help="OpenAI model to use"),
+    openai_base_url: str = typer.Option(
+        None,
+        help="Base URL of an OpenAI-compatible API, e.g. a fake-openai server",
+    ),
+    rayyan_creds_path: str = typer.Option(
+        None, help="Path to Rayyan credentials JSON file"
+    ),
+    max_articles: int = typer.Option(
+        None, help="Maximum number of articles to process"
+    ),
+    concurrency: int = typer.Option(
+        1, help="Number of articles to screen at the same time"
+    ),
+    rpm: int = typer.Option(
+        OPENAI_REQUESTS_PER_MINUTE, help="OpenAI requests per minute budget"
+    ),
+    tpm: int = typer.Option(
+        OPENAI_TOKENS_PER_MINUTE, help="OpenAI input tokens per minute budget"
+    ),
+    decisions_path: str = typer.Option(
+        "decisions.jsonl", help="Path to the local store of screening decisions"
+    ),
+    debug: bool = typer.Option(
+        False, "--debug", help="Enable debug logging to console"
+    ),
+):
+    """Re-screens only the articles decided under an older prompt version."""
+    setup_logger()
+
+    if dotenv_path:
+        load_dotenv(dotenv_path)
+    else:
+        BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+        load_dotenv(os.path.join(BASE_DIR, ".env"))
+
+    console = Console()
+
+    stages = {"abstract": "abstract_screen", "fulltext": "fulltext_screen"}
+    if stage not in stages:
+        console.log(f"[red]Unknown stage '{stage}', use abstract or fulltext.[/red]")
+        raise typer.Exit(2)
+
+    openai = OpenAIManager(
+        openai_api_key,
+        openai_model,
+        openai_base_url,
+        rate_limiter=RateLimiter(rpm, tpm),
+    )
+    rayyan = RayyanManager(rayyan_creds_path)
+    integration = IntegrationManager(
+        openai_manager=openai,
+        rayyan_manager=rayyan,
+        decisions=DecisionStore(decisions_path),
+        console=console,
+        debug=debug,
+    )
+
+    with console.status(f"Finding outdated {stage} decisions..."):
+        articles = integration.outdated_articles(
+            stages[stage], max_articles=max_articles
+        )
+        console.log(f"Found {len(articles)} articles to re-screen.")
+
+    screen = (
+        integration.screen_abstract
+        if stage == "abstract"
+        else integration.screen_fulltext
+    )
+    with Progress(
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        TaskProgressColumn(),
+        TimeElapsedColumn(),
+        TimeRemainingColumn(),
+        console=console,
+    ) as progress:
+        task = progress.add_task(f"Re-screening {stage}s...", total=len(articles))
+        integration.screen_concurrently(
+            partial(screen, rescreen=True),
+            articles,
+            concurrency=concurrency,
+            on_done=lambda: progress.advance(task, advance=1),
+        )
+    console.log("Re-screening complete.")
+
+
+@app.command()
+def tag_search(
+    ris_files: list[str] = typer.Argument(  # noqa: B008
+        ..., help="RIS export(s) from the search"
+    ),
+    label: str = typer.Option(..., help="Rayyan label to apply to matching articles"),
+    dotenv_path: str = typer.Option(None, help="Path to .env file with credentials"),
+    rayyan_creds_path: str = typer.Option(
+        None, help="Path to Rayyan credentials JSON file"
+    ),
+    doi_index_path: str = typer.Option(
+        "rayyan_doi_index.json", help="Path to the local Rayyan DOI index"
+    ),
+    refresh_index: bool = typer.Option(
+        True, help="Fetch records added to Rayyan since the last index refresh"
+    ),
+    debug: bool = typer.Option(
+        False, "--debug", help="Enable debug logging to console"
+    ),
+):
+    setup_logger()
+
+    if dotenv_path:
+        load_dotenv(dotenv_path)
+    else:
+        BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+        load_dotenv(os.path.join(BASE_DIR, ".env"))
+
+    console = Console()
+
+    if label not in ASANA_SEARCHES_ENUM_VALUES:
+        console.log(
+            f"[yellow]Warning: '{label}' is not a known search label. "
+            "Extracted articles will not pick it up as a search.[/yellow]"
+        )
+
+    rayyan = RayyanManager(rayyan_creds_path, doi_index_path=doi_index_path)
+    integration = IntegrationManager(
+        rayyan_manager=rayyan,
+        console=console,
+        debug=debug,
+    )
+
+    with console.status("Tagging matching articles..."):
+        article_ids, unmatched = integration.tag_search(
+            ris_files, label, refresh_index=refresh_index
+        )
+    console.log(f"Applied '{label}' to {len(article_ids)} articles.")
+    if unmatched:
+        console.log(f"{len(unmatched)} DOIs were not found in the Rayyan review.")
+
+
 @app.command()
 def monitor(
     dotenv_path: str = typer.Option(None, help="Path to .env file with credentials"),
@@ -255,6 +521,10 @@ def monitor(
     asana_token: str = typer.Option(None, help="Asana API token"),
     openai_api_key: str = typer.Option(None, help="OpenAI API key"),
     openai_model: str = typer.Option("gpt-5.1", help="OpenAI model to use"),
+    openai_base_url: str = typer.Option(
+        None,
+        help="Base URL of an OpenAI-compatible API, e.g. a fake-openai server",
+    ),
     rayyan_creds_path: str = typer.Option(
         None, help="Path to Rayyan credentials JSON file"
     ),
@@ -269,6 +539,38 @@ def monitor(
         help="Sync Asana and Airtable without checking Rayyan to screen/extract",
     ),
     full_frequency: int = typer.Option(5, help="Frequency of full syncs (in cycles)"),
+    extraction_workers: int = typer.Option(
+        EXTRACTION_WORKERS, help="Number of extraction results to process concurrently"
+    ),
+    fulltext_text: bool = typer.Option(
+        False,
+        "--fulltext-text",
+        help="Screen fulltexts from locally extracted methods, participants and "
+        "data availability sections instead of uploading the PDF (needs pypdf)",
+    ),
+    pdf_text_cache: str = typer.Option(
+        "pdf_text_cache", help="Directory for cached fulltext text"
+    ),
+    prescreen: bool = typer.Option(
+        False,
+        "--prescreen",
+        help="Exclude clear non-matches (adult-only studies, reviews) with local "
+        "keyword rules before sending abstracts to the model",
+    ),
+    reuse_decisions: bool = typer.Option(
+        True, help="Reuse decisions for abstracts already screened with this prompt"
+    ),
+    screening_cache_path: str = typer.Option(
+        "screening_cache.jsonl", help="Path to the abstract decision cache"
+    ),
+    decisions_path: str = typer.Option(
+        "decisions.jsonl", help="Path to the local store of screening decisions"
+    ),
+    batch_queue_tokens: int = typer.Option(
+        OPENAI_BATCH_QUEUE_TOKENS,
+        help="Input tokens allowed in unfinished batches at once (the account's "
+        "batch queue limit); 0 disables the budget",
+    ),
     debug: bool = typer.Option(
         False, "--debug", help="Enable debug logging to console"
     ),
@@ -286,11 +588,19 @@ def monitor(
     integration = IntegrationManager(
         asana_manager=AsanaManager(asana_token),
         airtable_manager=AirtableManager(airtable_api_key),
-        openai_manager=OpenAIManager(openai_api_key, openai_model),
+        openai_manager=OpenAIManager(openai_api_key, openai_model, openai_base_url),
         rayyan_manager=RayyanManager(rayyan_creds_path),
         batch_tracker=BatchTracker(),
+        pdf_text=PdfTextCache(pdf_text_cache) if fulltext_text else None,
+        prescreen=AbstractPrescreen() if prescreen else None,
+        screening_cache=ScreeningCache(screening_cache_path)
+        if reuse_decisions
+        else None,
+        decisions=DecisionStore(decisions_path),
         console=console,
         debug=debug,
+        extraction_workers=extraction_workers,
+        batch_queue_tokens=batch_queue_tokens or None,
     )
 
     assert (
@@ -313,6 +623,16 @@ def monitor(
             "fulltext_screen": 0,
             "extraction": 0,
         },
+        "throughput": {
+            "abstract_screen": "-",
+            "fulltext_screen": "-",
+            "extraction": "-",
+        },
+        "prompt_cache": {
+            "abstract_screen": "-",
+            "fulltext_screen": "-",
+            "extraction": "-",
+        },
         "start_time": datetime.now(),
         "consecutive_errors": {"asana": 0, "rayyan": 0, "openai": 0},
     }
@@ -344,6 +664,8 @@ def monitor(
                         unscreened_abstracts,
                         unscreened_fulltexts,
                         unextracted_articles,
+                        # The token budget, when set, decides how many fit
+                        max_num_batches_per_type=None if batch_queue_tokens else 3,
                     )
                     pending = integration.tracker.get_pending_batches()
                     stats = integration.update_stats_pending_batches(
@@ -384,6 +706,113 @@ def monitor(
         console.print("\n[yellow]Monitor stopped by user[/yellow]")
 
 
+@app.command()
+def fake_openai(
+    host: str = typer.Option("127.0.0.1", help="Interface to listen on"),
+    port: int = typer.Option(8765, help="Port to listen on"),
+    latency: float = typer.Option(0.0, help="Seconds added to every request"),
+    error_rate: float = typer.Option(
+        0.0, help="Share of responses that fail with a 500"
+    ),
+    batch_seconds: float = typer.Option(
+        5.0, help="Seconds from batch creation until it completes"
+    ),
+    cached_ratio: float = typer.Option(
+        0.0, help="Share of input tokens reported as cached"
+    ),
+    seed: int = typer.Option(None, help="Random seed for generated responses"),
+):
+    """Run a local OpenAI stand-in for offline load and integration tests."""
+    from bigger_picker.fakeopenai import FakeOpenAIServer
+
+    console = Console()
+    server = FakeOpenAIServer(
+        host=host,
+        port=port,
+        latency=latency,
+        error_rate=error_rate,
+        batch_seconds=batch_seconds,
+        cached_ratio=cached_ratio,
+        seed=seed,
+    )
+    console.log(f"Fake OpenAI API listening on {server.url}")
+    console.log(f"Use --openai-base-url {server.url} to point commands at it.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.log("Stopping fake OpenAI API.")
+
+
+@app.command()
+def benchmark(
+    scale: list[str] = typer.Option(  # noqa: B008
+        ["1k", "10k"], help="Record counts to run: 1k, 10k or 100k"
+    ),
+    only: list[str] = typer.Option(  # noqa: B008
+        None, help="Benchmarks to run, e.g. scores, dedup, sync or batch_jsonl"
+    ),
+    repeat: int = typer.Option(3, help="Timed runs per benchmark; the fastest counts"),
+    memory: bool = typer.Option(True, help="Measure peak memory in an extra run"),
+    seed: int = typer.Option(0, help="Seed for the synthetic data"),
+    save: str = typer.Option(None, help="Write the results to this baseline file"),
+    compare: str = typer.Option(None, help="Compare against this baseline file"),
+    tolerance: float = typer.Option(
+        0.2, help="Allowed relative slowdown or memory growth before failing"
+    ),
+    blockers: bool = typer.Option(
+        False,
+        "--blockers",
+        help="Also compare duplicate indexing strategies by pair count and recall",
+    ),
+):
+    """Benchmark the pipeline on synthetic data against fakes of the services."""
+    # Imported here so other commands do not load the fakes and synthetic data
+    import bigger_picker.benchmarks as benchmarks
+
+    console = Console()
+    names = only or list(benchmarks.BENCHMARKS)
+    unknown = [n for n in names if n not in benchmarks.BENCHMARKS] + [
+        s for s in scale if s not in benchmarks.SCALES
+    ]
+    if unknown:
+        console.log(f"[red]Unknown benchmark or scale: {', '.join(unknown)}[/red]")
+        raise typer.Exit(2)
+
+    results = []
+    for size in scale:
+        for name in names:
+            with console.status(f"Running {name} at {size}..."):
+                results.append(
+                    benchmarks.run_benchmark(
+                        name,
+                        benchmarks.SCALES[size],
+                        repeat=repeat,
+                        seed=seed,
+                        memory=memory,
+                    )
+                )
+
+    if blockers:
+        rows = []
+        for size in scale:
+            with console.status(f"Comparing duplicate blockers at {size}..."):
+                rows.extend(
+                    benchmarks.compare_blockers(benchmarks.SCALES[size], seed=seed)
+                )
+        console.print(benchmarks.create_blocker_table(rows))
+
+    baseline = benchmarks.load_results(compare) if compare else []
+    comparisons = benchmarks.compare_results(results, baseline, tolerance)
+    console.print(benchmarks.create_benchmark_table(comparisons))
+
+    if save:
+        benchmarks.save_results(save, results)
+        console.log(f"Saved results to {save}")
+    if any(row["regressed"] for row in comparisons):
+        console.log("[red]Regressions against the baseline.[/red]")
+        raise typer.Exit(1)
+
+
 click_app = typer.main.get_command(app)
 
 if __name__ == "__main__":
@@ -22,6 +22,12 @@ RAYYAN_EXCLUSION_LABELS = [
     "__EXR__wrong population",
     "__EXR__background article",
 ]
+# Access tokens are refreshed this many seconds before they expire
+RAYYAN_TOKEN_REFRESH_MARGIN = 300
+# Transient Rayyan errors are retried after a jittered delay of up to
+# base * 2**attempt seconds, capped at the maximum
+RAYYAN_RETRY_BACKOFF = 1.0
+RAYYAN_RETRY_MAX_BACKOFF = 30.0
 
 # _______AIRTABLE_________
 AIRTABLE_BASE_ID = "appYuP4DjRt023FK1"
@@ -33,6 +39,8 @@ AIRTABLE_TABLE_IDS = {
     "Outcomes": "tbl9oOmISnYmwDwlV",
 }
 AIRTABLE_DEFAULT_VIEW_ID = "viwkrTb1IADMvI6eg"
+# Records per create request, Airtable's limit
+AIRTABLE_BATCH_SIZE = 10
 
 # _______ASANA_________
 ASANA_WORKSPACE_ID = "653672074038961"
@@ -170,5 +178,124 @@ General Instructions
 If a field is not reported or cannot be determined with confidence, set its value to null or leave it blank/empty.
 Be thorough, cautious, and prioritize precision and reliability over guesswork.
 """  # noqa: E501
+# OpenAI batch input files are capped at 200 MB and 50,000 requests. Files
+# roll over a little before either limit.
+BATCH_MAX_BYTES = 190 * 1024 * 1024
+BATCH_MAX_ROWS = 49_000
+
+# Fulltexts can be screened from locally extracted text instead of the PDF.
+# Only these sections are sent, found by the headings below; a paper with
+# none of them is sent as a PDF.
+FULLTEXT_SECTIONS = ["methods", "participants", "data availability"]
+FULLTEXT_SECTION_HEADINGS = {
+    "methods": r"(materials and )?methods?|methodology|study design|measures"
+    r"|procedures?|statistical analys[ie]s",
+    "participants": r"participants|subjects|sample|study population|population",
+    "data availability": r"data (availability|sharing|access)( statement)?"
+    r"|availability of data( and materials?)?",
+    # Headings that end a kept section
+    "other": r"abstract|introduction|background|results|discussion"
+    r"|conclusions?|references|acknowledge?ments?|funding"
+    r"|(conflicts? of interest|competing interests)|limitations",
+}
+FULLTEXT_MAX_CHARS = 60_000
+FULLTEXT_TEXT_WORKERS = 4
+
+# Review designs named by the pre-screen's review rule
+_REVIEW_DESIGNS = (
+    r"systematic(?:ally)? review\w*|meta-?analy[sz](?:is|es)|scoping review"
+    r"|narrative review|literature review|umbrella review"
+)
+
+# Adult groups named by the pre-screen's sample rule
+_ADULT_GROUPS = (
+    r"(?:older |young |healthy |working |community-dwelling )?adults|elderly"
+    r"|university students|college students|undergraduates|employees|nurses"
+    r"|veterans"
+)
+
+# Abstracts can be pre-screened locally before they are sent to the model.
+# An abstract (with its title) is only excluded when it matches a rule's
+# "exclude" pattern and none of its "keep" patterns, so anything uncertain
+# still goes to the model. Patterns are case-insensitive.
+ABSTRACT_PRESCREEN_RULES = [
+    {
+        "reason": "Adult-only sample",
+        # Only how the sample is described counts, e.g. "a sample of 300
+        # adults" or "participants were nurses", not a passing comparison
+        # such as "unlike adults".
+        "exclude": rf"\b(?:(?:sample|cohort|panel|survey|group) of"
+        rf"|surveyed|recruited|enrolled|interviewed|included|studied)"
+        rf" (?:\d[\d,]* )?(?:{_ADULT_GROUPS})\b"
+        rf"|\b\d[\d,]* (?:{_ADULT_GROUPS})\b"
+        r"|\b(?:participants|respondents|subjects) were (?:all )?"
+        rf"(?:{_ADULT_GROUPS})\b",
+        "keep": r"\b(?:child|children|childhood|adolescen\w*|youths?|teen\w*"
+        r"|pupils?|schools?|infants?|toddlers?|preschool\w*|kids?|parent\w*"
+        r"|boys|girls|minors?|pa?ediatric|young people|grades?|graders?"
+        r"|\d+[- ]year[- ]olds?)\b",
+    },
+    {
+        "reason": "Review rather than primary study",
+        # Only the paper's own design counts: a review term in the title or
+        # opening the abstract, or phrasing such as "we conducted a systematic
+        # review" or "this meta-analysis". Primary studies often cite reviews.
+        "exclude": rf"^[^\n]*\b(?:{_REVIEW_DESIGNS})"
+        rf"|^[^\n]*\n\W*(?:an? )?(?:{_REVIEW_DESIGNS})"
+        r"|\b(?:we|authors) (?:conducted|performed|undertook|carried out|present)"
+        rf" (?:an? )?(?:{_REVIEW_DESIGNS})"
+        rf"|\b(?:this|the present|the current) (?:{_REVIEW_DESIGNS})",
+        "keep": r"\b(?:cohort|cross-sectional|longitudinal|surveyed|recruited"
+        r"|participants (?:were|completed)|data from|secondary analysis"
+        r"|randomi[sz]ed|trials?|experiments?|experimental|samples?|sampled"
+        r"|children|adolescen\w*)\b",
+    },
+]
+
+# _______CONCURRENCY_________
+# Maximum number of in-flight calls per service when results are processed
+# by the worker pool. Airtable allows 5 requests per second per base.
+SERVICE_CONCURRENCY = {
+    "rayyan": 4,
+    "airtable": 3,
+    "asana": 3,
+}
+EXTRACTION_WORKERS = 4
+# Budgets for synchronous OpenAI calls made by the screening commands. Match
+# them to the account's rate limits for the model in use.
+OPENAI_REQUESTS_PER_MINUTE = 500
+OPENAI_TOKENS_PER_MINUTE = 500_000
+# Rough input sizes used against the token budgets: characters per token of
+# text, tokens per PDF page (text plus page image), and tokens assumed for a
+# PDF whose pages cannot be counted
+OPENAI_CHARS_PER_TOKEN = 4
+OPENAI_PDF_TOKENS_PER_PAGE = 1_500
+OPENAI_PDF_TOKENS = 20_000
+# Input tokens the account may have queued in unfinished batches for the
+# model ("batch queue limit" on the OpenAI limits page). New batches are
+# sized to what is left, so none fail with token_limit_exceeded.
+OPENAI_BATCH_QUEUE_TOKENS = 15_000_000
+
+# _______HTTP_________
+# Connection settings shared by every service client. The pool should be at
+# least as large as the busiest entry in SERVICE_CONCURRENCY so concurrent
+# calls reuse open connections instead of opening new ones.
+HTTP_POOL_SIZE = 10
+HTTP_KEEPALIVE_EXPIRY = 30.0
+HTTP_CONNECT_TIMEOUT = 10.0
+HTTP_READ_TIMEOUT = 120.0
+HTTP_MAX_RETRIES = 3
+HTTP_RETRY_BACKOFF = 0.5
+
 # _______RENDER_________
 RENDER_WEBHOOK_URL = "https://bigger-picker.onrender.com/webhook"
+
+# _______DUPLICATES_________
+# Name tokens shared by more datasets than this are too common to block on
+# when duplicates are checked incrementally. Email blocks are never skipped.
+DUPLICATE_MAX_BLOCK_SIZE = 500
+# MinHash LSH blocking on dataset names. A name pair is found half of the
+# time at a shingle Jaccard similarity of (1 / BANDS) ** (1 / ROWS), about
+# 0.71 here; more bands or fewer rows find more pairs.
+DUPLICATE_MINHASH_BANDS = 16
+DUPLICATE_MINHASH_ROWS = 8
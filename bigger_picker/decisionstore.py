@@ -0,0 +1,52 @@
+import threading
+from datetime import datetime
+
+from bigger_picker.jsonl import append_jsonl, read_jsonl
+
+
+class DecisionStore:
+    """Latest decision and prompt version for each article at each stage."""
+
+    def __init__(self, filepath="decisions.jsonl"):
+        self.filepath = filepath
+        self._latest: dict[tuple[int, str], dict] | None = None
+        self._lock = threading.Lock()
+
+    def record(
+        self, article_id: int, stage: str, version: str, decision: dict | None = None
+    ) -> None:
+        entry = {
+            "article_id": article_id,
+            "stage": stage,
+            "version": version,
+            "decision": decision,
+            "decided_at": datetime.now().isoformat(),
+        }
+        with self._lock:
+            latest = self._load()
+            append_jsonl(self.filepath, [entry])
+            latest[(article_id, stage)] = entry
+
+    def get(self, article_id: int, stage: str) -> dict | None:
+        """The latest entry for an article at a stage, or None."""
+        with self._lock:
+            return self._load().get((article_id, stage))
+
+    def outdated(self, stage: str, version: str) -> list[int]:
+        """Articles whose latest decision at `stage` used another version."""
+        with self._lock:
+            return [
+                article_id
+                for (article_id, entry_stage), entry in self._load().items()
+                if entry_stage == stage and entry["version"] != version
+            ]
+
+    def _load(self) -> dict[tuple[int, str], dict]:
+        if self._latest is not None:
+            return self._latest
+
+        latest = {}
+        for entry in read_jsonl(self.filepath):
+            latest[(entry["article_id"], entry["stage"])] = entry
+        self._latest = latest
+        return latest
@@ -0,0 +1,140 @@
+import json
+import os
+from collections import defaultdict
+from datetime import datetime
+
+from pyairtable.api.types import RecordDict
+
+import bigger_picker.config as config
+import bigger_picker.utils as utils
+
+# Bumped when utils.duplicate_blocking_keys changes, so stored keys are rebuilt
+_KEYS_VERSION = 2
+
+
+class DuplicateIndex:
+    """Blocking index so duplicate detection only compares new or changed datasets."""
+
+    def __init__(
+        self,
+        filepath="duplicate_index.json",
+        max_block_size: int = config.DUPLICATE_MAX_BLOCK_SIZE,
+    ):
+        self.filepath = filepath
+        self.max_block_size = max_block_size
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.filepath):
+            return {}
+        with open(self.filepath) as f:
+            return json.load(f)
+
+    def _save(self, data: dict) -> None:
+        tmp_path = f"{self.filepath}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.filepath)
+
+    def update(
+        self, datasets: list[RecordDict], threshold: float = 0.51
+    ) -> dict[str, list[str]]:
+        """Updates the index; returns duplicates of datasets whose group changed."""
+        data = self._load()
+        entries: dict[str, dict] = data.get("datasets", {})
+        previous_groups = self._groups(entries)
+        if (
+            data.get("threshold") != threshold
+            or data.get("keys_version") != _KEYS_VERSION
+        ):
+            entries = {}
+
+        current = {dataset["id"]: dataset for dataset in datasets}
+
+        removed = set(entries) - set(current)
+        changed = {
+            dataset_id
+            for dataset_id, dataset in current.items()
+            if dataset_id not in entries
+            or entries[dataset_id]["fields"] != utils.duplicate_match_fields(dataset)
+        }
+        stale = removed | changed
+
+        for dataset_id in removed:
+            del entries[dataset_id]
+        for entry in entries.values():
+            entry["matches"] = [m for m in entry["matches"] if m not in stale]
+        for dataset_id in changed:
+            dataset = current[dataset_id]
+            entries[dataset_id] = {
+                "fields": utils.duplicate_match_fields(dataset),
+                "keys": utils.duplicate_blocking_keys(dataset),
+                "matches": [],
+            }
+
+        pairs = self._candidate_pairs(entries, changed)
+        compared = {dataset_id for pair in pairs for dataset_id in pair}
+        matches = utils.match_dataset_pairs(
+            [current[dataset_id] for dataset_id in compared],
+            pairs,
+            threshold=threshold,
+            n_rows=len(current),
+        )
+        for first, second in matches:
+            entries[first]["matches"].append(second)
+            entries[second]["matches"].append(first)
+
+        self._save(
+            {
+                "threshold": threshold,
+                "keys_version": _KEYS_VERSION,
+                "updated_at": datetime.now().isoformat(),
+                "datasets": entries,
+            }
+        )
+
+        groups = self._groups(entries)
+        empty: frozenset[str] = frozenset()
+        group_changed: dict[tuple[int, int], bool] = {}
+        duplicates = {}
+        for dataset_id in current:
+            group = groups.get(dataset_id, empty)
+            previous = previous_groups.get(dataset_id, empty)
+            key = (id(group), id(previous))
+            if key not in group_changed:
+                group_changed[key] = group != previous
+            if group_changed[key]:
+                duplicates[dataset_id] = [d for d in group if d != dataset_id]
+        return duplicates
+
+    def _candidate_pairs(
+        self, entries: dict[str, dict], changed: set[str]
+    ) -> list[tuple[str, str]]:
+        blocks = defaultdict(list)
+        for dataset_id, entry in entries.items():
+            for key in entry["keys"]:
+                blocks[key].append(dataset_id)
+
+        pairs = set()
+        for dataset_id in changed:
+            for key in entries[dataset_id]["keys"]:
+                block = blocks[key]
+                if key.startswith("name:") and len(block) > self.max_block_size:
+                    continue
+                for other in block:
+                    if other != dataset_id:
+                        pairs.add(tuple(sorted((dataset_id, other))))
+        return sorted(pairs)
+
+    @staticmethod
+    def _groups(entries: dict[str, dict]) -> dict[str, frozenset[str]]:
+        # Members share one set per group, so comparing groups stays linear
+        # in the number of datasets even when a group is large
+        groups = {}
+        for members in utils.connected_groups(
+            (dataset_id, match)
+            for dataset_id, entry in entries.items()
+            for match in entry["matches"]
+        ):
+            group = frozenset(members)
+            groups.update(dict.fromkeys(members, group))
+        return groups
@@ -0,0 +1,351 @@
+import json
+import random
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeOpenAIServer:
+    """Local stand-in for the OpenAI Responses, Files and Batches APIs."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        batch_seconds: float = 0.0,
+        cached_ratio: float = 0.0,
+        seed: int | None = None,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.batch_seconds = batch_seconds
+        self.cached_ratio = cached_ratio
+        self.files: dict[str, dict] = {}
+        self.batches: dict[str, dict] = {}
+        self.request_counts: dict[str, int] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+        server = self
+
+        class Handler(_FakeOpenAIHandler):
+            fake = server
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self) -> "FakeOpenAIServer":
+        """Serves requests from a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def serve_forever(self) -> None:
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.httpd.server_close()
+
+    def create_file(self, content: bytes, filename: str, purpose: str) -> dict:
+        file_id = f"file-{uuid.uuid4().hex}"
+        file = {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(content),
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": purpose,
+            "status": "processed",
+        }
+        with self._lock:
+            self.files[file_id] = {"meta": file, "content": content}
+        return file
+
+    def create_batch(self, params: dict) -> dict:
+        batch_id = f"batch_{uuid.uuid4().hex}"
+        batch = {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": params["endpoint"],
+            "errors": None,
+            "input_file_id": params["input_file_id"],
+            "completion_window": params.get("completion_window", "24h"),
+            "status": "in_progress",
+            "output_file_id": None,
+            "error_file_id": None,
+            "created_at": int(time.time()),
+            "in_progress_at": int(time.time()),
+            "completed_at": None,
+            "request_counts": {"total": 0, "completed": 0, "failed": 0},
+            "metadata": params.get("metadata"),
+        }
+        with self._lock:
+            self.batches[batch_id] = {"batch": batch, "ready_at": time.monotonic()}
+        return batch
+
+    def retrieve_batch(self, batch_id: str) -> dict | None:
+        with self._lock:
+            entry = self.batches.get(batch_id)
+            if entry is None:
+                return None
+            batch = entry["batch"]
+            due = (
+                batch["status"] == "in_progress"
+                and time.monotonic() - entry["ready_at"] >= self.batch_seconds
+            )
+            if due:
+                # Concurrent polls see the batch finalizing while one builds it
+                batch["status"] = "finalizing"
+        if due:
+            self._complete_batch(batch)
+        return batch
+
+    def _complete_batch(self, batch: dict) -> None:
+        with self._lock:
+            content = self.files[batch["input_file_id"]]["content"]
+
+        output_lines = []
+        counts = {"total": 0, "completed": 0, "failed": 0}
+        for line in content.decode().splitlines():
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            status_code, body = self.respond(row["body"])
+            counts["total"] += 1
+            counts["completed" if status_code == 200 else "failed"] += 1
+            output_lines.append(
+                json.dumps(
+                    {
+                        "id": f"batch_req_{uuid.uuid4().hex}",
+                        "custom_id": row["custom_id"],
+                        "response": {
+                            "status_code": status_code,
+                            "request_id": uuid.uuid4().hex,
+                            "body": body,
+                        },
+                        "error": None,
+                    }
+                )
+            )
+
+        output = self.create_file(
+            "\n".join(output_lines).encode() + b"\n",
+            f"{batch['id']}_output.jsonl",
+            "batch_output",
+        )
+        batch.update(
+            status="completed",
+            output_file_id=output["id"],
+            completed_at=int(time.time()),
+            request_counts=counts,
+        )
+
+    def respond(self, body: dict) -> tuple[int, dict]:
+        """Status code and body for a Responses API request."""
+        with self._lock:
+            failed = self._rng.random() < self.error_rate
+        if failed:
+            return 500, {
+                "error": {
+                    "message": "Simulated server error",
+                    "type": "server_error",
+                    "code": None,
+                }
+            }
+
+        text_format = (body.get("text") or {}).get("format") or {}
+        schema = text_format.get("schema")
+        with self._lock:
+            if schema is not None:
+                sample = _sample(schema, schema.get("$defs", {}), self._rng)
+            else:
+                sample = "Synthetic response"
+        text = sample if isinstance(sample, str) else json.dumps(sample)
+
+        input_tokens = max(1, len(json.dumps(body.get("input", ""))) // 4)
+        cached_tokens = int(input_tokens * self.cached_ratio)
+        output_tokens = max(1, len(text) // 4)
+        return 200, {
+            "id": f"resp_{uuid.uuid4().hex}",
+            "object": "response",
+            "created_at": int(time.time()),
+            "status": "completed",
+            "model": body.get("model", "fake-model"),
+            "output": [
+                {
+                    "type": "message",
+                    "id": f"msg_{uuid.uuid4().hex}",
+                    "status": "completed",
+                    "role": "assistant",
+                    "content": [
+                        {"type": "output_text", "text": text, "annotations": []}
+                    ],
+                }
+            ],
+            "parallel_tool_calls": True,
+            "tool_choice": "auto",
+            "tools": [],
+            "usage": {
+                "input_tokens": input_tokens,
+                "input_tokens_details": {"cached_tokens": cached_tokens},
+                "output_tokens": output_tokens,
+                "output_tokens_details": {"reasoning_tokens": 0},
+                "total_tokens": input_tokens + output_tokens,
+            },
+        }
+
+    def _count(self, route: str) -> None:
+        with self._lock:
+            self.request_counts[route] = self.request_counts.get(route, 0) + 1
+
+
+class _FakeOpenAIHandler(BaseHTTPRequestHandler):
+    fake: FakeOpenAIServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        # Keep load tests quiet
+        pass
+
+    def do_POST(self):
+        self._delay()
+        path = self.path.split("?")[0].rstrip("/")
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        if path == "/v1/responses":
+            self.fake._count("responses.create")
+            status_code, payload = self.fake.respond(json.loads(body))
+            self._send_json(payload, status_code)
+        elif path == "/v1/files":
+            self.fake._count("files.create")
+            fields, upload = self._parse_multipart(body)
+            filename, content = upload
+            self._send_json(
+                self.fake.create_file(content, filename, fields.get("purpose", ""))
+            )
+        elif path == "/v1/batches":
+            self.fake._count("batches.create")
+            params = json.loads(body)
+            if params.get("input_file_id") not in self.fake.files:
+                self._send_error(404, "Input file not found")
+                return
+            self._send_json(self.fake.create_batch(params))
+        else:
+            self._send_error(404, f"Unknown route {path}")
+
+    def do_GET(self):
+        self._delay()
+        parts = self.path.split("?")[0].strip("/").split("/")
+
+        if parts[:2] == ["v1", "batches"] and len(parts) == 3:
+            self.fake._count("batches.retrieve")
+            batch = self.fake.retrieve_batch(parts[2])
+            if batch is None:
+                self._send_error(404, "Batch not found")
+            else:
+                self._send_json(batch)
+        elif parts[:2] == ["v1", "files"] and len(parts) == 4:
+            self.fake._count("files.content")
+            file = self.fake.files.get(parts[2])
+            if file is None:
+                self._send_error(404, "File not found")
+            else:
+                self._send(file["content"], "application/octet-stream")
+        elif parts[:2] == ["v1", "files"] and len(parts) == 3:
+            file = self.fake.files.get(parts[2])
+            if file is None:
+                self._send_error(404, "File not found")
+            else:
+                self._send_json(file["meta"])
+        else:
+            self._send_error(404, f"Unknown route {self.path}")
+
+    def _delay(self):
+        if self.fake.latency:
+            time.sleep(self.fake.latency)
+
+    def _parse_multipart(self, body: bytes) -> tuple[dict, tuple[str, bytes]]:
+        header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode()
+        message = BytesParser(policy=default_policy).parsebytes(header + body)
+        fields = {}
+        upload = ("upload", b"")
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            payload = part.get_payload(decode=True) or b""
+            if part.get_filename() is not None:
+                upload = (part.get_filename(), payload)
+            else:
+                fields[name] = payload.decode()
+        return fields, upload
+
+    def _send_json(self, payload: dict, status_code: int = 200):
+        self._send(json.dumps(payload).encode(), "application/json", status_code)
+
+    def _send_error(self, status_code: int, message: str):
+        self._send_json(
+            {"error": {"message": message, "type": "invalid_request_error"}},
+            status_code,
+        )
+
+    def _send(self, content: bytes, content_type: str, status_code: int = 200):
+        self.send_response(status_code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+def _sample(schema: dict, defs: dict, rng: random.Random):
+    """Builds a value that satisfies a strict structured-output JSON schema."""
+    if "$ref" in schema:
+        return _sample(defs[schema["$ref"].split("/")[-1]], defs, rng)
+    if "anyOf" in schema:
+        options = [s for s in schema["anyOf"] if s.get("type") != "null"]
+        return _sample(options[0] if options else {"type": "null"}, defs, rng)
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    if "const" in schema:
+        return schema["const"]
+
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object":
+        return {
+            name: _sample(prop, defs, rng)
+            for name, prop in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        return [_sample(schema.get("items", {}), defs, rng)]
+    if kind == "integer":
+        return rng.randint(1, 3)
+    if kind == "number":
+        return round(rng.uniform(1, 100), 1)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    if kind == "string":
+        return "Synthetic value"
+    return None
@@ -0,0 +1,765 @@
+import base64
+import json
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import UTC, datetime
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3 import HTTPHeaderDict
+
+import bigger_picker.config as config
+
+# Smallest file the PDF handling accepts as a PDF
+FAKE_PDF = b"%PDF-1.4\n1 0 obj << /Type /Catalog >> endobj\ntrailer << >>\n%%EOF\n"
+
+
+_PLACES = [
+    "Adelaide",
+    "Bergen",
+    "Boston",
+    "Bristol",
+    "Cape Town",
+    "Chiba",
+    "Dublin",
+    "Edmonton",
+    "Generation R",
+    "Glasgow",
+    "Helsinki",
+    "Kyoto",
+    "Lisbon",
+    "Madrid",
+    "Melbourne",
+    "Montreal",
+    "Munich",
+    "Nairobi",
+    "Odense",
+    "Oslo",
+    "Pelotas",
+    "Perth",
+    "Quebec",
+    "Rotterdam",
+    "Santiago",
+    "Seoul",
+    "Sydney",
+    "Taipei",
+    "Tampere",
+    "Toronto",
+    "Utrecht",
+    "Valencia",
+    "Warsaw",
+    "Zurich",
+]
+_TOPICS = [
+    "Child Development",
+    "Screen Use",
+    "Adolescent Health",
+    "Sleep",
+    "Media Habits",
+    "Family Life",
+    "Physical Activity",
+    "Wellbeing",
+    "School Readiness",
+    "Mental Health",
+    "Digital Childhood",
+    "Growing Up",
+]
+_DESIGNS = ["Cohort", "Panel", "Longitudinal Study", "Trial", "Survey", "Birth Cohort"]
+_GIVEN_NAMES = [
+    "Alex",
+    "Ana",
+    "Ben",
+    "Chen",
+    "Dana",
+    "Eva",
+    "Farid",
+    "Grace",
+    "Hana",
+    "Ivan",
+    "Jia",
+    "Kofi",
+    "Lena",
+    "Mateo",
+    "Nadia",
+    "Omar",
+    "Priya",
+    "Quinn",
+    "Rosa",
+    "Sami",
+    "Tomas",
+    "Uma",
+    "Vera",
+    "Wei",
+    "Yusuf",
+    "Zoe",
+]
+_FAMILY_NAMES = [
+    "Andersen",
+    "Baker",
+    "Costa",
+    "Diaz",
+    "Eriksen",
+    "Fischer",
+    "Garcia",
+    "Hughes",
+    "Ito",
+    "Jensen",
+    "Kim",
+    "Lopez",
+    "Moreau",
+    "Nguyen",
+    "Okafor",
+    "Patel",
+    "Rossi",
+    "Schmidt",
+    "Tanaka",
+    "Urban",
+    "Virtanen",
+    "Walsh",
+    "Xu",
+    "Yilmaz",
+    "Zhang",
+]
+
+
+def synthetic_datasets(
+    count: int, duplicate_ratio: float = 0.05, rng: random.Random | int | None = None
+) -> list[dict]:
+    """Synthetic Airtable Datasets fields, some of them renamed duplicates."""
+    if not isinstance(rng, random.Random):
+        rng = random.Random(rng)
+    statuses = list(config.ASANA_STATUS_ENUM_VALUES)
+    search_names = list(config.ASANA_SEARCHES_ENUM_VALUES)
+
+    datasets = []
+    for index in range(count):
+        if datasets and rng.random() < duplicate_ratio:
+            original = rng.choice(datasets)
+            name = f"{original['Dataset Name']} (Wave {rng.randint(2, 5)})"
+            contact = original["Dataset Contact Name"]
+            email = original["Dataset Contact Email"]
+        else:
+            name = (
+                f"{rng.choice(_PLACES)} {rng.choice(_TOPICS)} "
+                f"{rng.choice(_DESIGNS)} {rng.randint(1990, 2024)}"
+            )
+            contact = f"{rng.choice(_GIVEN_NAMES)} {rng.choice(_FAMILY_NAMES)}"
+            email = f"{contact.replace(' ', '.').lower()}{index}@example.org"
+
+        min_age = rng.randint(0, 10)
+        max_age = rng.randint(min_age, 19)
+        earliest = rng.randint(1990, 2022)
+        searches = rng.sample(search_names, k=rng.randint(0, 2))
+        datasets.append(
+            {
+                "Dataset ID": f"BPIPD-{index + 1}",
+                "Dataset Name": name,
+                "Dataset Contact Name": contact,
+                "Dataset Contact Email": email,
+                "Status": rng.choice(statuses),
+                "Searches": [", ".join(searches)] if searches else [],
+                "Mean Ages": [round(rng.uniform(2, 17), 1)]
+                if rng.random() < 0.7
+                else [],
+                "SD Ages": [round(rng.uniform(0.5, 3), 2)]
+                if rng.random() < 0.6
+                else [],
+                "Min Ages": min_age,
+                "Max Ages": max_age,
+                "Earliest Publication": earliest,
+                "Year of Last Data Point": rng.choice(
+                    [0, earliest + rng.randint(0, 3)]
+                ),
+                "Total Sample Size": rng.randint(20, 20000),
+            }
+        )
+    return datasets
+
+
+class FakeService:
+    """Request counting, latency and rate limiting shared by the service stand-ins."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        rate_limit: int | None = None,
+        seed: int | None = None,
+    ):
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.request_counts: dict[str, int] = {}
+        self.throttled = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+        self._limit_lock = threading.Lock()
+        self._window: deque[float] = deque()
+
+    def handle(
+        self, method: str, path: str, query: dict[str, list[str]], body: bytes | None
+    ) -> tuple[int, dict | bytes]:
+        """Status code and JSON payload (or raw bytes) for a request."""
+        raise NotImplementedError
+
+    def requests_transport(self) -> BaseAdapter:
+        """Adapter to mount on a requests.Session in place of real HTTP."""
+        return _RequestsTransport(self)
+
+    def urllib3_transport(self) -> "_Urllib3Transport":
+        """Stand-in for a urllib3 PoolManager."""
+        return _Urllib3Transport(self)
+
+    def _begin(self, route: str) -> None:
+        with self._lock:
+            self.request_counts[route] = self.request_counts.get(route, 0) + 1
+        if self.rate_limit:
+            self._throttle()
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _throttle(self) -> None:
+        with self._limit_lock:
+            now = time.monotonic()
+            while self._window and now - self._window[0] >= 1.0:
+                self._window.popleft()
+            if len(self._window) >= self.rate_limit:  # type: ignore
+                self.throttled += 1
+                # Holding the lock while waiting queues the other callers too
+                time.sleep(1.0 - (now - self._window[0]))
+                now = time.monotonic()
+                while self._window and now - self._window[0] >= 1.0:
+                    self._window.popleft()
+            self._window.append(now)
+
+    def _new_id(self, prefix: str, length: int = 14) -> str:
+        with self._lock:
+            return prefix + "".join(
+                self._rng.choices("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijkl", k=length)
+            )
+
+
+class FakeRayyan(FakeService):
+    """Stateful stand-in for the Rayyan endpoints the pipeline calls."""
+
+    def __init__(
+        self,
+        record_count: int = 1000,
+        review_id: int = config.RAYYAN_REVIEW_ID,
+        included_ratio: float = 0.1,
+        latency: float = 0.0,
+        rate_limit: int | None = None,
+        seed: int | None = None,
+    ):
+        super().__init__(latency=latency, rate_limit=rate_limit, seed=seed)
+        self.review_id = review_id
+        self.articles: dict[int, dict] = {}
+        self.decisions: dict[int, str] = {}
+        self.notes: dict[int, list[str]] = {}
+        for i in range(record_count):
+            self._add_article(i, self._rng.random() < included_ratio)
+
+    def write_credentials(self, path: str) -> str:
+        """Writes a credentials file the Rayyan SDK accepts."""
+        with open(path, "w") as f:
+            json.dump(self._tokens(), f)
+        return path
+
+    def handle(self, method, path, query, body):
+        parts = path.strip("/").split("/")
+        reviews = ["api", "v1", "reviews", str(self.review_id)]
+
+        if path == "/oauth/token":
+            self._begin("token.refresh")
+            return 200, self._tokens()
+        if parts[:3] == ["api", "v1", "fulltexts"] and len(parts) == 4:
+            self._begin("fulltexts.get")
+            return 200, {"url": f"https://fulltexts.rayyan.test/{parts[3]}.pdf"}
+        if len(parts) == 1 and parts[0].endswith(".pdf"):
+            self._begin("fulltexts.download")
+            return 200, FAKE_PDF
+        if parts[:4] != reviews:
+            self._begin("unknown")
+            return 404, {"error": f"Unknown route {path}"}
+
+        if parts[4:] == ["results"] and method == "GET":
+            self._begin("results")
+            return 200, self._results(query)
+        if parts[4:] == ["customize"] and method == "POST":
+            if "key" in query:
+                self._begin("customize.bulk")
+                article_ids = [int(a) for a in query["article_ids"][0].split(",")]
+                plan = {query["key"][0]: int(query["value"][0])}
+            else:
+                self._begin("customize")
+                payload = json.loads(body or b"{}")
+                article_ids = [int(payload["article_id"])]
+                plan = payload["plan"]
+            return 200, self._customize(article_ids, plan)
+        if parts[4:5] == ["articles"] and parts[6:] == ["notes"] and method == "POST":
+            self._begin("notes.create")
+            text = json.loads(body or b"{}")["text"]
+            with self._lock:
+                self.notes.setdefault(int(parts[5]), []).append(text)
+            return 200, {"text": text}
+
+        self._begin("unknown")
+        return 404, {"error": f"Unknown route {path}"}
+
+    def _results(self, query: dict[str, list[str]]) -> dict:
+        mode = query.get("extra[mode]", [None])[0]
+        labels = query.get("extra[user_labels][]")
+        article_ids = {int(a) for a in query.get("extra[article_ids][]", [])}
+
+        with self._lock:
+            matches = []
+            for article_id, article in self.articles.items():
+                if mode is not None and self.decisions[article_id] != mode:
+                    continue
+                if labels and not any(
+                    label in article["customizations"]["labels"] for label in labels
+                ):
+                    continue
+                if article_ids and article_id not in article_ids:
+                    continue
+                matches.append(article)
+
+            start = int(query.get("start", [0])[0])
+            length = int(query.get("length", [len(matches)])[0])
+            return {
+                "recordsTotal": len(self.articles),
+                "recordsFiltered": len(matches),
+                "data": json.loads(json.dumps(matches[start : start + length])),
+            }
+
+    def _customize(self, article_ids: list[int], plan: dict) -> dict:
+        with self._lock:
+            for article_id in article_ids:
+                labels = self.articles[article_id]["customizations"]["labels"]
+                for label, value in plan.items():
+                    if value == -1:
+                        labels.pop(label, None)
+                    else:
+                        labels[label] = value
+        return {"updated": len(article_ids)}
+
+    def _add_article(self, index: int, included: bool) -> None:
+        article_id = 100000 + index
+        searches = list(config.ASANA_SEARCHES_ENUM_VALUES)
+        labels = {}
+        if self._rng.random() < 0.2:
+            labels[self._rng.choice(searches)] = 1
+
+        fulltexts = []
+        if included:
+            fulltexts.append({"id": 900000 + index, "marked_as_deleted": False})
+            if self._rng.random() < 0.5:
+                labels[config.RAYYAN_LABELS["unextracted"]] = 1
+
+        abstracts = []
+        if self._rng.random() < 0.95:
+            abstracts.append(
+                {"content": f"Synthetic abstract {index} on screen time and health."}
+            )
+
+        year = self._rng.randint(1995, 2025)
+        self.articles[article_id] = {
+            "id": article_id,
+            "title": f"Synthetic article {index}",
+            "authors": [f"Author {index}", f"Coauthor {index % 97}"],
+            "year": year,
+            "doi": f"10.5555/synthetic.{index}" if self._rng.random() < 0.9 else None,
+            "citation": f"Journal of Synthetic Studies {index % 50} - {year}",
+            "abstracts": abstracts,
+            "fulltexts": fulltexts,
+            "customizations": {"labels": labels},
+        }
+        self.decisions[article_id] = "included" if included else "undecided"
+
+    @staticmethod
+    def _tokens() -> dict:
+        return {
+            "access_token": uuid.uuid4().hex,
+            "refresh_token": uuid.uuid4().hex,
+            "expires_in": 7200,
+            "created_at": int(time.time()),
+        }
+
+
+class FakeAirtable(FakeService):
+    """Stateful stand-in for an Airtable base with the tables in config."""
+
+    PAGE_SIZE = 100
+
+    def __init__(
+        self,
+        dataset_count: int = 500,
+        duplicate_ratio: float = 0.05,
+        base_id: str = config.AIRTABLE_BASE_ID,
+        latency: float = 0.0,
+        rate_limit: int | None = None,
+        seed: int | None = None,
+    ):
+        super().__init__(latency=latency, rate_limit=rate_limit, seed=seed)
+        self.base_id = base_id
+        self.tables: dict[str, dict[str, dict]] = {
+            table_id: {} for table_id in config.AIRTABLE_TABLE_IDS.values()
+        }
+        self._table_names = dict(config.AIRTABLE_TABLE_IDS)
+        datasets = self.tables[config.AIRTABLE_TABLE_IDS["Datasets"]]
+        for fields in synthetic_datasets(dataset_count, duplicate_ratio, self._rng):
+            record = self._new_record(fields)
+            datasets[record["id"]] = record
+
+    def records(self, table_name: str) -> list[dict]:
+        with self._lock:
+            return list(self.tables[self._table_names[table_name]].values())
+
+    def handle(self, method, path, query, body):
+        parts = path.strip("/").split("/")
+        if parts[:2] != ["v0", self.base_id]:
+            self._begin("unknown")
+            return 404, {"error": {"type": "NOT_FOUND"}}
+        payload = json.loads(body) if body else {}
+
+        if parts[-1] == "uploadAttachment" and len(parts) == 5:
+            self._begin("attachments.upload")
+            return self._upload_attachment(parts[2], parts[3], payload)
+
+        table_id = self._table_names.get(parts[2], parts[2])
+        table = self.tables.get(table_id)
+        if table is None:
+            self._begin("unknown")
+            return 404, {"error": {"type": "TABLE_NOT_FOUND"}}
+
+        if len(parts) == 3 and method == "GET":
+            self._begin("records.list")
+            return 200, self._list(table, query)
+        if len(parts) == 3 and method == "POST":
+            self._begin("records.create")
+            return 200, self._create(table, payload)
+        if len(parts) == 3 and method == "PATCH":
+            self._begin("records.batch_update")
+            return 200, {
+                "records": [
+                    self._update(table, row["id"], row["fields"])
+                    for row in payload["records"]
+                ]
+            }
+        if len(parts) == 4 and parts[3] in table:
+            if method == "GET":
+                self._begin("records.get")
+                with self._lock:
+                    return 200, json.loads(json.dumps(table[parts[3]]))
+            if method in ("PATCH", "PUT"):
+                self._begin("records.update")
+                return 200, self._update(table, parts[3], payload["fields"])
+
+        self._begin("unknown")
+        return 404, {"error": {"type": "NOT_FOUND"}}
+
+    def _list(self, table: dict, query: dict[str, list[str]]) -> dict:
+        start = int(query.get("offset", [0])[0])
+        page_size = min(int(query.get("pageSize", [self.PAGE_SIZE])[0]), 100)
+        with self._lock:
+            records = list(table.values())[start : start + page_size]
+            page = {"records": json.loads(json.dumps(records))}
+            if start + page_size < len(table):
+                page["offset"] = str(start + page_size)
+        return page
+
+    def _create(self, table: dict, payload: dict) -> dict:
+        rows = payload.get("records")
+        created = []
+        with self._lock:
+            for fields in [row["fields"] for row in rows or [payload]]:
+                record = self._new_record(fields)
+                table[record["id"]] = record
+                created.append(json.loads(json.dumps(record)))
+        return {"records": created} if rows is not None else created[0]
+
+    def _update(self, table: dict, record_id: str, fields: dict) -> dict:
+        with self._lock:
+            record = table[record_id]
+            record["fields"].update(fields)
+            return json.loads(json.dumps(record))
+
+    def _upload_attachment(self, record_id: str, field: str, payload: dict):
+        with self._lock:
+            for table in self.tables.values():
+                if record_id in table:
+                    record = table[record_id]
+                    break
+            else:
+                return 404, {"error": {"type": "ROW_DOES_NOT_EXIST"}}
+            attachment = {
+                "id": self._new_id("att"),
+                "url": f"https://content.airtable.test/{payload['filename']}",
+                "filename": payload["filename"],
+                "size": len(base64.b64decode(payload["file"])),
+                "type": payload["contentType"],
+            }
+            record["fields"].setdefault(field, []).append(attachment)
+            return 200, {
+                "id": record_id,
+                "createdTime": record["createdTime"],
+                "fields": {field: record["fields"][field]},
+            }
+
+    def _new_record(self, fields: dict) -> dict:
+        return {
+            "id": self._new_id("rec"),
+            "createdTime": datetime.now(UTC).isoformat(),
+            "fields": dict(fields),
+        }
+
+
+class FakeAsana(FakeService):
+    """Stateful stand-in for the Asana project and its events feed."""
+
+    def __init__(
+        self,
+        task_count: int = 500,
+        project_id: str = config.ASANA_PROJECT_ID,
+        latency: float = 0.0,
+        rate_limit: int | None = None,
+        seed: int | None = None,
+    ):
+        super().__init__(latency=latency, rate_limit=rate_limit, seed=seed)
+        self.project_id = project_id
+        self.tasks: dict[str, dict] = {}
+        self.events: list[dict] = []
+        self._next_gid = 1200000000000000
+        self._next_bpipd = 1
+
+        statuses = list(config.ASANA_STATUS_ENUM_VALUES.values())
+        for i in range(task_count):
+            self._create_task(
+                {
+                    "name": f"Synthetic cohort study {i}",
+                    "custom_fields": {
+                        config.ASANA_CUSTOM_FIELD_IDS["Status"]: self._rng.choice(
+                            statuses
+                        ),
+                    },
+                },
+                record=False,
+            )
+
+    def add_event(self, task_gid: str, action: str = "changed") -> None:
+        with self._lock:
+            self.events.append(
+                {
+                    "action": action,
+                    "resource": {"gid": task_gid, "resource_type": "task"},
+                    "created_at": datetime.now(UTC).isoformat(),
+                }
+            )
+
+    def handle(self, method, path, query, body):
+        parts = path.strip("/").split("/")
+        if parts[:2] == ["api", "1.0"]:
+            parts = parts[2:]
+        payload = json.loads(body) if body else {}
+
+        if parts == ["projects", self.project_id, "tasks"] and method == "GET":
+            self._begin("tasks.list")
+            return 200, self._list(query)
+        if parts == ["tasks"] and method == "POST":
+            self._begin("tasks.create")
+            return 201, {"data": self._create_task(payload["data"])}
+        if len(parts) == 2 and parts[0] == "tasks" and parts[1] in self.tasks:
+            if method == "GET":
+                self._begin("tasks.get")
+                with self._lock:
+                    return 200, {"data": json.loads(json.dumps(self.tasks[parts[1]]))}
+            if method == "PUT":
+                self._begin("tasks.update")
+                return 200, {"data": self._update_task(parts[1], payload["data"])}
+        if parts == ["events"] and method == "GET":
+            self._begin("events")
+            return self._events(query)
+
+        self._begin("unknown")
+        return 404, {"errors": [{"message": f"Unknown route {path}"}]}
+
+    def _list(self, query: dict[str, list[str]]) -> dict:
+        start = int(query.get("offset", [0])[0])
+        limit = int(query.get("limit", [100])[0])
+        with self._lock:
+            tasks = list(self.tasks.values())[start : start + limit]
+            next_page = None
+            if start + limit < len(self.tasks):
+                next_page = {"offset": str(start + limit)}
+            return {"data": json.loads(json.dumps(tasks)), "next_page": next_page}
+
+    def _events(self, query: dict[str, list[str]]) -> tuple[int, dict]:
+        with self._lock:
+            sync = f"sync-{len(self.events)}"
+            token = query.get("sync", [None])[0]
+            if not token or not token.startswith("sync-"):
+                return 412, {
+                    "sync": sync,
+                    "errors": [{"message": "Sync token invalid or too old."}],
+                }
+            start = int(token.removeprefix("sync-"))
+            return 200, {"data": self.events[start:], "sync": sync, "has_more": False}
+
+    def _create_task(self, data: dict, record: bool = True) -> dict:
+        with self._lock:
+            gid = str(self._next_gid)
+            self._next_gid += 1
+            task = {
+                "gid": gid,
+                "resource_type": "task",
+                "name": data.get("name", ""),
+                "completed": False,
+                "projects": [{"gid": self.project_id, "name": "Bigger Picker"}],
+                "custom_fields": [
+                    self._custom_field(name, field_id)
+                    for name, field_id in config.ASANA_CUSTOM_FIELD_IDS.items()
+                ],
+            }
+            self._set_field(
+                task,
+                config.ASANA_CUSTOM_FIELD_IDS["BPIPD"],
+                f"BPIPD-{self._next_bpipd}",
+            )
+            self._next_bpipd += 1
+            for field_id, value in (data.get("custom_fields") or {}).items():
+                self._set_field(task, field_id, value)
+            self.tasks[gid] = task
+            if record:
+                self.add_event(gid, "added")
+            return json.loads(json.dumps(task))
+
+    def _update_task(self, gid: str, data: dict) -> dict:
+        with self._lock:
+            task = self.tasks[gid]
+            if "name" in data:
+                task["name"] = data["name"]
+            for field_id, value in (data.get("custom_fields") or {}).items():
+                self._set_field(task, field_id, value)
+            self.add_event(gid)
+            return json.loads(json.dumps(task))
+
+    @staticmethod
+    def _custom_field(name: str, field_id: str) -> dict:
+        field_types = {
+            "Status": "enum",
+            "Data Sharing Method": "enum",
+            "Dataset Value": "number",
+            "Searches": "multi_enum",
+        }
+        field = {
+            "gid": field_id,
+            "name": name,
+            "type": field_types.get(name, "text"),
+            "display_value": None,
+        }
+        value_key = {
+            "text": "text_value",
+            "number": "number_value",
+            "enum": "enum_value",
+        }.get(field["type"], "multi_enum_values")
+        field[value_key] = [] if value_key == "multi_enum_values" else None
+        return field
+
+    @staticmethod
+    def _set_field(task: dict, field_id: str, value) -> None:
+        options = {
+            gid: name
+            for values in (
+                config.ASANA_STATUS_ENUM_VALUES,
+                config.ASANA_SEARCHES_ENUM_VALUES,
+            )
+            for name, gid in values.items()
+        }
+        for field in task["custom_fields"]:
+            if field["gid"] != field_id:
+                continue
+            if field["type"] == "enum":
+                field["enum_value"] = (
+                    None if value is None else {"gid": value, "name": options[value]}
+                )
+                field["display_value"] = options.get(value)
+            elif field["type"] == "multi_enum":
+                field["multi_enum_values"] = [
+                    {"gid": gid, "name": options[gid], "enabled": True}
+                    for gid in value or []
+                    if gid in options
+                ]
+                field["display_value"] = ", ".join(
+                    option["name"] for option in field["multi_enum_values"]
+                )
+            else:
+                field[f"{field['type']}_value"] = value
+                field["display_value"] = None if value is None else str(value)
+
+
+class _RequestsTransport(BaseAdapter):
+    def __init__(self, service: FakeService):
+        super().__init__()
+        self.service = service
+
+    def send(self, request, **kwargs):
+        url = urlsplit(request.url)
+        body = request.body
+        if isinstance(body, str):
+            body = body.encode()
+        status_code, payload = self.service.handle(
+            request.method,
+            url.path,
+            parse_qs(url.query, keep_blank_values=True),
+            body,
+        )
+
+        response = requests.Response()
+        response.status_code = status_code
+        response.reason = HTTPStatus(status_code).phrase
+        response.url = request.url
+        response.request = request
+        response.encoding = "utf-8"
+        if isinstance(payload, bytes):
+            response._content = payload
+            content_type = "application/pdf"
+        else:
+            response._content = json.dumps(payload).encode()
+            content_type = "application/json; charset=utf-8"
+        response.headers = CaseInsensitiveDict({"Content-Type": content_type})
+        return response
+
+    def close(self):
+        pass
+
+
+class _Urllib3Response:
+    def __init__(self, status: int, data: bytes):
+        self.status = status
+        self.reason = HTTPStatus(status).phrase
+        self.data = data
+        self.headers = HTTPHeaderDict({"Content-Type": "application/json"})
+
+
+class _Urllib3Transport:
+    def __init__(self, service: FakeService):
+        self.service = service
+
+    def request(self, method, url, fields=None, body=None, headers=None, **kwargs):
+        split = urlsplit(url)
+        query = parse_qs(split.query, keep_blank_values=True)
+        if fields:
+            items = fields.items() if isinstance(fields, dict) else fields
+            for key, value in items:
+                query.setdefault(key, []).append(str(value))
+        if isinstance(body, str):
+            body = body.encode()
+        status_code, payload = self.service.handle(method, split.path, query, body)
+        return _Urllib3Response(status_code, json.dumps(payload).encode())
+
+    def clear(self):
+        pass
@@ -1,11 +1,22 @@
 import json
 import logging
+import threading
 import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from contextlib import contextmanager
 from datetime import datetime
-from functools import wraps
+from functools import partial, wraps
 from itertools import batched
 from pathlib import Path
 
+from openai.types import Batch
 from pyairtable.api.types import RecordDict
 from rich.console import Console
 from rich.live import Live
@@ -15,9 +26,15 @@ import bigger_picker.utils as utils
 from bigger_picker.airtable import AirtableManager
 from bigger_picker.asana import AsanaManager
 from bigger_picker.batchtracker import BatchTracker
+from bigger_picker.batchwriter import BatchWriter
 from bigger_picker.datamodels import Article, ArticleLLMExtract
+from bigger_picker.decisionstore import DecisionStore
+from bigger_picker.duplicateindex import DuplicateIndex
 from bigger_picker.openai import OpenAIManager
+from bigger_picker.pdftext import PdfTextCache
+from bigger_picker.prescreen import AbstractPrescreen, prescreen_text
 from bigger_picker.rayyan import RayyanManager
+from bigger_picker.screeningcache import ScreeningCache
 
 
 def requires_services(*required_services):
@@ -49,17 +66,46 @@ class IntegrationManager:
         airtable_manager: AirtableManager | None = None,
         openai_manager: OpenAIManager | None = None,
         batch_tracker: BatchTracker | None = None,
+        duplicate_index: DuplicateIndex | None = None,
+        pdf_text: PdfTextCache | None = None,
+        prescreen: AbstractPrescreen | None = None,
+        screening_cache: ScreeningCache | None = None,
+        decisions: DecisionStore | None = None,
         console: Console | None = None,
         debug: bool = False,
+        extraction_workers: int = config.EXTRACTION_WORKERS,
+        service_concurrency: dict[str, int] | None = None,
+        batch_queue_tokens: int | None = None,
     ):
         self.asana = asana_manager
         self.rayyan = rayyan_manager
         self.airtable = airtable_manager
         self.openai = openai_manager
         self.tracker = batch_tracker
+        self.duplicate_index = duplicate_index
+        self.pdf_text = pdf_text
+        self.prescreen = prescreen
+        self.screening_cache = screening_cache
+        self.decisions = decisions
+        # Prompt version of each batch, looked up once from the tracker
+        self._batch_versions: dict[str, str | None] = {}
         self.console = console or Console()
         self.debug = debug
         self.logger = logging.getLogger("bigger_picker")
+        self.extraction_workers = max(1, extraction_workers)
+        # Input tokens allowed in unfinished batches at once, or None for no cap
+        self.batch_queue_tokens = batch_queue_tokens
+        self._service_limits = {
+            service: max(1, limit)
+            for service, limit in {
+                **config.SERVICE_CONCURRENCY,
+                **(service_concurrency or {}),
+            }.items()
+        }
+        self._service_slots = {
+            service: threading.BoundedSemaphore(limit)
+            for service, limit in self._service_limits.items()
+        }
 
     @requires_services("asana", "airtable")
     def sync_airtable_and_asana(
@@ -285,8 +331,13 @@ class IntegrationManager:
         llm_extraction: ArticleLLMExtract,
         article_metadata: dict,
         pdf_path: str | None = None,
+        applied: dict | None = None,
+        record: Callable[..., None] | None = None,
     ) -> RecordDict:
+        """Creates the Article, its children and Dataset, skipping `applied` steps."""
         assert self.airtable
+        applied = applied or {}
+        record = record or (lambda **steps: None)
 
         def _convert_to_title_case(value):
             if isinstance(value, str):
@@ -313,31 +364,48 @@ class IntegrationManager:
         outcomes = article_dict.pop("outcomes", [])
         dataset_name = article_dict.pop("Dataset Name", None)
 
-        article_record = self.airtable.create_record("Articles", article_dict)
-        article_record_id = article_record["id"]
+        article_record_id = applied.get("article_record_id")
+        if article_record_id is None:
+            article_record = self.airtable.create_record("Articles", article_dict)
+            article_record_id = article_record["id"]
+            record(article_record_id=article_record_id)
 
-        if pdf_path is not None:
+        if pdf_path is not None and not applied.get("attachment"):
             self.airtable.upload_attachment(
                 "Articles", article_record_id, "Fulltext", pdf_path
             )
-
-        for population in populations:
-            population["Rayyan ID"] = [article_record_id]
-            self.airtable.create_record("Populations", population)
-
-        for screen_time_measure in screen_time_measures:
-            for key in screen_time_measure.keys():
-                screen_time_measure[key] = _convert_to_title_case(
-                    screen_time_measure[key]
-                )
-            screen_time_measure["Rayyan ID"] = [article_record_id]
-            self.airtable.create_record("Screen Time Measures", screen_time_measure)
-
-        for outcome in outcomes:
-            for key in outcome.keys():
-                outcome[key] = _convert_to_title_case(outcome[key])
-            outcome["Rayyan ID"] = [article_record_id]
-            self.airtable.create_record("Outcomes", outcome)
+            record(attachment=True)
+
+        # Build every child payload up front, then write each table in bulk
+        child_payloads = {
+            "Populations": [
+                {**population, "Rayyan ID": [article_record_id]}
+                for population in populations
+            ],
+            "Screen Time Measures": [
+                {
+                    **{k: _convert_to_title_case(v) for k, v in measure.items()},
+                    "Rayyan ID": [article_record_id],
+                }
+                for measure in screen_time_measures
+            ],
+            "Outcomes": [
+                {
+                    **{k: _convert_to_title_case(v) for k, v in outcome.items()},
+                    "Rayyan ID": [article_record_id],
+                }
+                for outcome in outcomes
+            ],
+        }
+        # Children are created one request at a time, counting how many of
+        # each table exist so a retry continues after the last request
+        children = dict(applied.get("children", {}))
+        for table_name, payloads in child_payloads.items():
+            remaining = payloads[children.get(table_name, 0) :]
+            for chunk in batched(remaining, config.AIRTABLE_BATCH_SIZE):
+                self.airtable.batch_create_records(table_name, list(chunk))
+                children[table_name] = children.get(table_name, 0) + len(chunk)
+                record(children=dict(children))
 
         # Create the dataset and sync to Airtable
         if dataset_name is None:
@@ -428,12 +496,14 @@ class IntegrationManager:
         return updated_any_datasets
 
     @requires_services("airtable")
-    def mark_duplicates(self, threshold=0.51):
+    def mark_duplicates(self, threshold=0.51, indexing="auto"):
         assert self.airtable
 
         self._log("Marking duplicates...")
         datasets = self.airtable.tables["Datasets"].all()
-        duplicates = utils.identify_duplicate_datasets(datasets, threshold=threshold)
+        duplicates = utils.identify_duplicate_datasets(
+            datasets, threshold=threshold, indexing=indexing
+        )
 
         for dataset in datasets:
             dataset_id = dataset["id"]
@@ -450,8 +520,30 @@ class IntegrationManager:
                 payload = {"Possible Duplicates": dataset_duplicates}
                 self.airtable.update_record("Datasets", dataset_id, payload)
 
+    @requires_services("airtable", "duplicate_index")
+    def mark_new_duplicates(self, threshold=0.51):
+        """Like `mark_duplicates`, but only compares new or changed datasets."""
+        assert self.airtable and self.duplicate_index
+
+        self._log("Marking new duplicates...")
+        datasets = self.airtable.tables["Datasets"].all()
+        duplicates = self.duplicate_index.update(datasets, threshold=threshold)
+        self._log(f"Duplicate groups changed for {len(duplicates)} datasets")
+
+        # The index returns whole groups, so they replace the stored links,
+        # clearing any left over from a group that shrank or dissolved
+        for dataset in datasets:
+            group = duplicates.get(dataset["id"])
+            if group is None:
+                continue
+            if set(dataset["fields"].get("Possible Duplicates", [])) == set(group):
+                continue
+            payload = {"Possible Duplicates": group}
+            self.airtable.update_record("Datasets", dataset["id"], payload)
+
     @requires_services("openai", "rayyan")
-    def screen_abstract(self, article: dict):
+    def screen_abstract(self, article: dict, rescreen: bool = False):
+        """With `rescreen`, replaces the labels of the last abstract decision."""
         assert self.openai and self.rayyan
 
         abstracts = article.get("abstracts", [])
@@ -464,31 +556,206 @@ class IntegrationManager:
         if not abstract_text:
             return
 
-        decision = self.openai.screen_record_abstract(abstract_text)
-        if decision is None:
-            # Something with the LLM failed
+        if self.prescreen and not self.prescreen_abstracts([article]):
             return
 
-        decision_dict = decision.model_dump()
-
-        self._action_screening_decision(decision_dict, article["id"], is_abstract=True)
+        key = utils.abstract_key(
+            abstract_text, self.openai.prompt_versions["abstract_screen"]
+        )
+        decision_dict = self.screening_cache.get(key) if self.screening_cache else None
+        if decision_dict is None:
+            decision = self.openai.screen_record_abstract(abstract_text)
+            if decision is None:
+                # Something with the LLM failed
+                return
+            decision_dict = decision.model_dump()
+            if self.screening_cache:
+                self.screening_cache.put(key, decision_dict)
+
+        self._record_decision(article["id"], "abstract_screen", decision_dict)
+        with self._service_slot("rayyan"):
+            self._action_screening_decision(
+                decision_dict, article["id"], is_abstract=True, rescreen=rescreen
+            )
 
     @requires_services("openai", "rayyan")
-    def screen_fulltext(self, article: dict):
+    def screen_fulltext(self, article: dict, rescreen: bool = False):
+        """With `rescreen`, replaces the labels of the last fulltext decision."""
         assert self.openai and self.rayyan
 
-        pdf_path = self.rayyan.download_pdf(article)
+        with self._service_slot("rayyan"):
+            pdf_path = self.rayyan.download_pdf(article)
         if pdf_path is None:
             # This shouldn't happen, but you never know
             return
-        decision = self.openai.screen_record_fulltext(pdf_path)
+        text = self.pdf_text.get_text(pdf_path) if self.pdf_text else None
+        if text:
+            decision = self.openai.screen_record_fulltext_text(text)
+        else:
+            decision = self.openai.screen_record_fulltext(pdf_path)
         if decision is None:
             # Something with the LLM failed
             return
 
         decision_dict = decision.model_dump()
 
-        self._action_screening_decision(decision_dict, article["id"], is_abstract=False)
+        self._record_decision(article["id"], "fulltext_screen", decision_dict)
+        with self._service_slot("rayyan"):
+            self._action_screening_decision(
+                decision_dict, article["id"], is_abstract=False, rescreen=rescreen
+            )
+
+    def screen_concurrently(
+        self,
+        screen: Callable[[dict], object],
+        articles: list[dict],
+        concurrency: int = 1,
+        on_done: Callable[[], object] | None = None,
+    ) -> int:
+        """Runs `screen` over the articles on a thread pool; returns the failures."""
+        failed = 0
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            futures = {pool.submit(screen, article): article for article in articles}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    failed += 1
+                    self._log(
+                        f"Failed to screen article {futures[future]['id']}: {e}",
+                        "error",
+                    )
+                if on_done is not None:
+                    on_done()
+        return failed
+
+    @requires_services("rayyan")
+    def tag_search(
+        self, ris_paths: list[str], label: str, refresh_index: bool = True
+    ) -> tuple[list[int], set[str]]:
+        """Labels articles by DOI from RIS exports; returns them and unmatched DOIs."""
+        assert self.rayyan
+
+        dois = set()
+        for ris_path in ris_paths:
+            dois |= utils.read_ris_dois(ris_path)
+        self._log(f"Loaded {len(dois)} DOIs from {len(ris_paths)} RIS file(s)")
+
+        if refresh_index:
+            self._log("Refreshing Rayyan DOI index...")
+            self.rayyan.refresh_doi_index()
+
+        matches = self.rayyan.find_articles_by_doi(dois)
+        unmatched = dois - set(matches)
+        article_ids = sorted({a_id for ids in matches.values() for a_id in ids})
+        self._log(
+            f"Matched {len(matches)} DOIs to {len(article_ids)} articles, "
+            f"{len(unmatched)} unmatched"
+        )
+
+        self._apply_labels((article_id, {label: 1}) for article_id in article_ids)
+
+        return article_ids, unmatched
+
+    @requires_services("airtable", "rayyan")
+    def skip_extracted_articles(self, articles: list[dict]) -> list[dict]:
+        """Drops candidates already in Airtable and labels them extracted in Rayyan."""
+        assert self.airtable and self.rayyan
+
+        records = self.airtable.tables["Articles"].all(
+            fields=["DOI", "Article Title", "Year"]
+        )
+        index = utils.index_articles(records)
+
+        remaining = []
+        labels = []
+        seen = set()
+        deferred = 0
+        for article in articles:
+            keys = utils.article_match_keys(
+                article.get("doi"), article.get("title"), article.get("year")
+            )
+            record_id = next((index[key] for key in keys if key in index), None)
+            if record_id is not None:
+                url = self.airtable.make_url(
+                    record_id, table_id=config.AIRTABLE_TABLE_IDS["Articles"]
+                )
+                try:
+                    self.rayyan.create_article_note(
+                        article["id"], f"Already extracted in Airtable: {url}"
+                    )
+                except Exception as e:
+                    self._log(f"Failed to add note for {article['id']}: {e}")
+                plan = {
+                    self.rayyan.unextracted_label: -1,
+                    self.rayyan.extracted_label: 1,
+                }
+                labels.append((article["id"], plan))
+                continue
+            if seen.intersection(keys):
+                deferred += 1
+                continue
+            seen.update(keys)
+            remaining.append(article)
+
+        self._apply_labels(labels)
+        self._log(
+            f"Linked {len(labels)} already extracted articles, "
+            f"deferred {deferred} duplicates"
+        )
+        return remaining
+
+    @requires_services("rayyan", "prescreen")
+    def prescreen_abstracts(self, articles: list[dict]) -> list[dict]:
+        """Excludes abstracts the local rules are sure about and returns the rest."""
+        assert self.rayyan and self.prescreen
+
+        with_text = [
+            article
+            for article in articles
+            if article.get("abstracts") and article["abstracts"][0].get("content")
+        ]
+        rules = self.prescreen.screen(prescreen_text(a) for a in with_text)
+        excluded = {}
+        labels = []
+        # Only the abstract stage label: the __EXR__ reasons belong to fulltext
+        # decisions, and the note already gives the rule's reason
+        plan = {config.RAYYAN_LABELS["abstract_excluded"]: 1}
+        for article, rule in zip(with_text, rules, strict=True):
+            if rule is None:
+                continue
+            excluded[article["id"]] = rule
+            try:
+                self.rayyan.create_article_note(
+                    article["id"], f"Local pre-screen: {rule['reason']}"
+                )
+            except Exception as e:
+                self._log(f"Failed to create note for article {article['id']}: {e}")
+            labels.append((article["id"], plan))
+
+        self._apply_labels(labels)
+        self._log(f"Pre-screen excluded {len(excluded)} of {len(with_text)} abstracts")
+        return [article for article in articles if article["id"] not in excluded]
+
+    @requires_services("openai", "rayyan", "decisions")
+    def outdated_articles(
+        self, stage: str, max_articles: int | None = None
+    ) -> list[dict]:
+        """Rayyan articles whose decision at `stage` used an older prompt."""
+        assert self.openai and self.rayyan and self.decisions
+
+        article_ids = self.decisions.outdated(stage, self.openai.prompt_versions[stage])
+        self._log(f"Found {len(article_ids)} {stage} decisions from older prompts")
+        if max_articles is not None:
+            article_ids = article_ids[:max_articles]
+
+        articles = []
+        for article_id in article_ids:
+            try:
+                articles.append(self.rayyan.get_article_by_id(article_id))
+            except Exception as e:
+                self._log(f"Failed to fetch article {article_id}: {e}")
+        return articles
 
     @requires_services("asana", "airtable")
     def sync(self):
@@ -501,96 +768,238 @@ class IntegrationManager:
             self._log("No datasets updated, skipping second sync.")
 
     @requires_services("openai", "rayyan", "tracker")
-    def create_abstract_screening_batch(self, articles: list[dict]):
+    def create_abstract_screening_batch(self, articles: list[dict]) -> int:
         assert self.openai and self.rayyan and self.tracker
 
-        self._log(f"Preparing abstract screening batch for {len(articles)} articles...")
-        requests = []
+        budget = self._batch_token_budget()
+        if budget is not None and budget <= 0:
+            self._log("Batch queue token budget used up, waiting for batches.")
+            return len(articles)
 
-        for article in articles:
-            abstracts = article.get("abstracts", [])
-            if not abstracts:
-                plan = {config.RAYYAN_LABELS["abstract_missing"]: 1}
-                self._log(f"No abstract found for {article['id']}, updating labels")
-                self.rayyan.update_article_labels(article["id"], plan)
-                continue
+        if self.prescreen:
+            articles = self.prescreen_abstracts(articles)
 
-            abstract_text = abstracts[0].get("content", "")
-            if not abstract_text:
-                plan = {config.RAYYAN_LABELS["abstract_missing"]: 1}
-                self._log(f"No abstract text for {article['id']}, updating labels")
-                self.rayyan.update_article_labels(article["id"], plan)
-                continue
+        self._log(f"Preparing abstract screening batch for {len(articles)} articles...")
+        with BatchWriter(
+            "abstract_screen", serialize=self.openai.serialize_batch_row
+        ) as writer:
+            labels = []
+            # Abstracts already screened under the current prompt reuse the
+            # cached decision; repeats within this batch wait for its result
+            pending_keys: dict[int, str] = {}
+            sent_keys: set[str] = set()
+            reused = 0
+            deferred = 0
+            held = 0
+
+            for article in articles:
+                abstracts = article.get("abstracts", [])
+                if not abstracts:
+                    plan = {config.RAYYAN_LABELS["abstract_missing"]: 1}
+                    self._log(f"No abstract found for {article['id']}, updating labels")
+                    labels.append((article["id"], plan))
+                    continue
 
-            custom_id = f"abstract-{article['id']}"
-            body = self.openai.prepare_abstract_body(abstract_text)
-            request = self.openai.create_batch_row(custom_id, body)
-            requests.append(request)
-            plan = {config.RAYYAN_LABELS["batch_pending"]: 1}
-            self.rayyan.update_article_labels(article["id"], plan)
+                abstract_text = abstracts[0].get("content", "")
+                if not abstract_text:
+                    plan = {config.RAYYAN_LABELS["abstract_missing"]: 1}
+                    self._log(f"No abstract text for {article['id']}, updating labels")
+                    labels.append((article["id"], plan))
+                    continue
 
-        if requests:
-            self._submit_batch(requests, "abstract_screen")
-        else:
-            self._log("No requests to submit for abstract screening batch.")
+                if self.screening_cache:
+                    key = utils.abstract_key(
+                        abstract_text, self.openai.prompt_versions["abstract_screen"]
+                    )
+                    cached = self.screening_cache.get(key)
+                    if cached is not None:
+                        self._record_decision(article["id"], "abstract_screen", cached)
+                        plan = self._action_screening_decision(
+                            cached, article["id"], is_abstract=True, apply=False
+                        )
+                        if plan:
+                            labels.append((article["id"], plan))
+                        reused += 1
+                        continue
+                    # Repeats wait for the result of the copy already sent,
+                    # in this batch or in one still running
+                    if key in sent_keys or self.screening_cache.is_pending(key):
+                        deferred += 1
+                        continue
+
+                body = self.openai.prepare_abstract_body(abstract_text)
+                tokens = self.openai.estimate_body_tokens(body)
+                if budget is not None:
+                    if tokens > budget:
+                        # Left unlabelled, so it is picked up again next cycle
+                        held += 1
+                        continue
+                    budget -= tokens
+
+                if self.screening_cache:
+                    sent_keys.add(key)
+                    pending_keys[article["id"]] = key
+
+                custom_id = f"abstract-{article['id']}"
+                request = self.openai.create_batch_row(custom_id, body)
+                writer.add(
+                    request,
+                    {
+                        "custom_id": custom_id,
+                        "article_id": article["id"],
+                        "tokens": tokens,
+                    },
+                )
+                plan = {config.RAYYAN_LABELS["batch_pending"]: 1}
+                labels.append((article["id"], plan))
+
+            self._apply_labels(labels)
+            if self.screening_cache:
+                self._log(
+                    f"Reused {reused} cached abstract decisions, "
+                    f"deferred {deferred} repeated abstracts"
+                )
+            if writer.rows:
+                if self.screening_cache:
+                    self.screening_cache.expect(pending_keys)
+                self._submit_batch(writer, "abstract_screen")
+            else:
+                self._log("No requests to submit for abstract screening batch.")
+        self._log_held(held)
+        return held
 
     @requires_services("openai", "rayyan", "tracker")
-    def create_fulltext_screening_batch(self, articles: list[dict]):
+    def create_fulltext_screening_batch(self, articles: list[dict]) -> int:
         assert self.openai and self.rayyan and self.tracker
 
-        self._log(f"Preparing fulltext screening batch for {len(articles)} articles...")
-        requests = []
+        # Checked before any PDF is downloaded, which is the slow part
+        budget = self._batch_token_budget()
+        if budget is not None and budget <= 0:
+            self._log("Batch queue token budget used up, waiting for batches.")
+            return len(articles)
 
-        for article in articles:
-            pdf_path = self.rayyan.download_pdf(article)
-            if not pdf_path:
-                self._log(f"No PDF found for {article['id']}, skipping.")
-                continue
-
-            try:
-                file = self.openai.upload_file(pdf_path)
-            except Exception as e:
-                self._log(f"Failed to upload PDF for {article['id']}: {e}")
-                continue
+        held = 0
+        self._log(f"Preparing fulltext screening batch for {len(articles)} articles...")
+        with BatchWriter(
+            "fulltext_screen", serialize=self.openai.serialize_batch_row
+        ) as writer:
+            labels = []
 
-            # 3. Prepare Request
-            custom_id = f"fulltext-{article['id']}"
-            body = self.openai.prepare_fulltext_body(file.id)
-            request = self.openai.create_batch_row(custom_id, body)
-            requests.append(request)
-            plan = {config.RAYYAN_LABELS["batch_pending"]: 1}
-            self.rayyan.update_article_labels(article["id"], plan)
+            pdf_paths = {}
+            for article in articles:
+                pdf_path = self.rayyan.download_pdf(article)
+                if not pdf_path:
+                    self._log(f"No PDF found for {article['id']}, skipping.")
+                    continue
+                pdf_paths[article["id"]] = pdf_path
+
+            # Text for every PDF is extracted in parallel before any upload
+            texts = {}
+            if self.pdf_text and pdf_paths:
+                texts = self.pdf_text.get_texts(list(pdf_paths.values()))
+
+            for article_id, pdf_path in pdf_paths.items():
+                custom_id = f"fulltext-{article_id}"
+                file_id = None
+                text = texts.get(pdf_path)
+                if text:
+                    body = self.openai.prepare_fulltext_text_body(text)
+                    tokens = self.openai.estimate_body_tokens(body)
+                else:
+                    # Estimated from the page count before the PDF is uploaded
+                    tokens = self.openai.estimate_body_tokens(
+                        self.openai.prepare_fulltext_body(""), pdf_path
+                    )
+                if budget is not None:
+                    if tokens > budget:
+                        held += 1
+                        continue
+                    budget -= tokens
+
+                if not text:
+                    try:
+                        file = self.openai.upload_file(pdf_path)
+                    except Exception as e:
+                        self._log(f"Failed to upload PDF for {article_id}: {e}")
+                        continue
+                    file_id = file.id
+                    body = self.openai.prepare_fulltext_body(file.id)
+
+                request = self.openai.create_batch_row(custom_id, body)
+                writer.add(
+                    request,
+                    {
+                        "custom_id": custom_id,
+                        "article_id": article_id,
+                        "file_id": file_id,
+                        "tokens": tokens,
+                    },
+                )
+                plan = {config.RAYYAN_LABELS["batch_pending"]: 1}
+                labels.append((article_id, plan))
 
-        if requests:
-            self._submit_batch(requests, "fulltext_screen")
+            self._apply_labels(labels)
+            if writer.rows:
+                self._submit_batch(writer, "fulltext_screen")
+        self._log_held(held)
+        return held
 
     @requires_services("openai", "rayyan", "tracker")
-    def create_extraction_batch(self, articles: list[dict]):
+    def create_extraction_batch(self, articles: list[dict]) -> int:
         assert self.openai and self.rayyan and self.tracker
 
+        budget = self._batch_token_budget()
+        if budget is not None and budget <= 0:
+            self._log("Batch queue token budget used up, waiting for batches.")
+            return len(articles)
+
+        held = 0
         self._log(f"Preparing extraction batch for {len(articles)} articles...")
-        requests = []
+        with BatchWriter(
+            "extraction", serialize=self.openai.serialize_batch_row
+        ) as writer:
+            labels = []
 
-        for article in articles:
-            pdf_path = self.rayyan.download_pdf(article)
-            if not pdf_path:
-                continue
+            for article in articles:
+                pdf_path = self.rayyan.download_pdf(article)
+                if not pdf_path:
+                    continue
 
-            try:
-                file = self.openai.upload_file(pdf_path)
-            except Exception as e:
-                self._log(f"Failed to upload PDF for {article['id']}: {e}")
-                continue
+                tokens = self.openai.estimate_body_tokens(
+                    self.openai.prepare_extraction_body(""), pdf_path
+                )
+                if budget is not None:
+                    if tokens > budget:
+                        held += 1
+                        continue
+                    budget -= tokens
+
+                try:
+                    file = self.openai.upload_file(pdf_path)
+                except Exception as e:
+                    self._log(f"Failed to upload PDF for {article['id']}: {e}")
+                    continue
 
-            custom_id = f"extraction-{article['id']}"
-            body = self.openai.prepare_extraction_body(file.id)
-            request = self.openai.create_batch_row(custom_id, body)
-            requests.append(request)
-            plan = {config.RAYYAN_LABELS["batch_pending"]: 1}
-            self.rayyan.update_article_labels(article["id"], plan)
+                custom_id = f"extraction-{article['id']}"
+                body = self.openai.prepare_extraction_body(file.id)
+                request = self.openai.create_batch_row(custom_id, body)
+                writer.add(
+                    request,
+                    {
+                        "custom_id": custom_id,
+                        "article_id": article["id"],
+                        "file_id": file.id,
+                        "tokens": tokens,
+                    },
+                )
+                plan = {config.RAYYAN_LABELS["batch_pending"]: 1}
+                labels.append((article["id"], plan))
 
-        if requests:
-            self._submit_batch(requests, "extraction")
+            self._apply_labels(labels)
+            if writer.rows:
+                self._submit_batch(writer, "extraction")
+        self._log_held(held)
+        return held
 
     @requires_services("openai")
     def process_pending_batches(self, pending: dict):
@@ -618,6 +1027,7 @@ class IntegrationManager:
 
             elif batch.status in ["failed", "expired", "cancelled"]:
                 self._log(f"Batch {batch_id} ended with status: {batch.status}")
+                self._release_failed_batch(batch)
             else:
                 self._log(f"Batch {batch_id} is {batch.status}")
 
@@ -714,8 +1124,10 @@ class IntegrationManager:
         max_batch_size_abs: int = 1000,
         max_batch_size_ft: int = 100,
         max_batch_size_ext: int = 100,
-        max_num_batches_per_type: int = 3,
+        max_num_batches_per_type: int | None = 3,
     ):
+        """Submits up to `max_num_batches_per_type` batches per stage."""
+        assert self.tracker
         try:
             if unscreened_abstracts:
                 stats["status"] = (
@@ -727,13 +1139,18 @@ class IntegrationManager:
                 )
                 batch_count = 0
                 for batch in batched(unscreened_abstracts, max_batch_size_abs):
-                    if batch_count >= max_num_batches_per_type:
+                    if (
+                        max_num_batches_per_type is not None
+                        and batch_count >= max_num_batches_per_type
+                    ):
                         self._log("Reached max number of batches for this cycle.")
                         break
-                    self.create_abstract_screening_batch(list(batch))
+                    held = self.create_abstract_screening_batch(list(batch))
                     stats["pending_batches"]["abstract_screen"] += 1
                     live.update(utils.create_stats_table(stats))
                     batch_count += 1
+                    if held:
+                        break
             if unscreened_fulltexts:
                 stats["status"] = (
                     "[yellow]Creating fulltext screening batches...[/yellow]"
@@ -744,13 +1161,29 @@ class IntegrationManager:
                 )
                 batch_count = 0
                 for batch in batched(unscreened_fulltexts, max_batch_size_ft):
-                    if batch_count >= max_num_batches_per_type:
+                    if (
+                        max_num_batches_per_type is not None
+                        and batch_count >= max_num_batches_per_type
+                    ):
                         self._log("Reached max number of batches for this cycle.")
                         break
-                    self.create_fulltext_screening_batch(list(batch))
+                    held = self.create_fulltext_screening_batch(list(batch))
                     stats["pending_batches"]["fulltext_screen"] += 1
                     live.update(utils.create_stats_table(stats))
                     batch_count += 1
+                    if held:
+                        break
+            if unextracted_articles:
+                # Unextracted articles keep their label while a batch is pending,
+                # so skip any that are already waiting on an extraction batch.
+                pending_ids = self.tracker.get_pending_article_ids("extraction")
+                unextracted_articles = [
+                    a for a in unextracted_articles if a["id"] not in pending_ids
+                ]
+            if unextracted_articles and self.airtable and self.rayyan:
+                unextracted_articles = self.skip_extracted_articles(
+                    unextracted_articles
+                )
             if unextracted_articles:
                 stats["status"] = "[yellow]Creating extraction batches...[/yellow]"
                 live.update(utils.create_stats_table(stats))
@@ -759,13 +1192,18 @@ class IntegrationManager:
                 )
                 batch_count = 0
                 for batch in batched(unextracted_articles, max_batch_size_ext):
-                    if batch_count >= max_num_batches_per_type:
+                    if (
+                        max_num_batches_per_type is not None
+                        and batch_count >= max_num_batches_per_type
+                    ):
                         self._log("Reached max number of batches for this cycle.")
                         break
-                    self.create_extraction_batch(list(batch))
+                    held = self.create_extraction_batch(list(batch))
                     stats["pending_batches"]["extraction"] += 1
                     live.update(utils.create_stats_table(stats))
                     batch_count += 1
+                    if held:
+                        break
             stats["consecutive_errors"]["openai"] = 0
 
         except Exception as e:
@@ -809,9 +1247,19 @@ class IntegrationManager:
                         "%Y-%m-%d %H:%M:%S"
                     )
                     live.update(utils.create_stats_table(stats))
-                    self._handle_completed_batch(
+                    summary = self._handle_completed_batch(
                         batch.output_file_id, info["type"], batch_id
                     )
+                    if "throughput" in stats and summary["seconds"] > 0:
+                        rate = summary["processed"] / summary["seconds"]
+                        stats["throughput"][info["type"]] = (
+                            f"{rate:.2f}/s ({summary['processed']} in "
+                            f"{summary['seconds']:.0f}s)"
+                        )
+                    if "prompt_cache" in stats and summary.get("input_tokens"):
+                        stats["prompt_cache"][info["type"]] = utils.format_cache_ratio(
+                            summary["input_tokens"], summary["cached_tokens"]
+                        )
                     stats["pending_batches"][info["type"]] -= 1
                     stats["last_sync"]["openai"] = datetime.now().strftime(
                         "%Y-%m-%d %H:%M:%S"
@@ -826,6 +1274,7 @@ class IntegrationManager:
 
             elif batch.status in ["failed", "expired", "cancelled"]:
                 self._log(f"Batch {batch_id} ended with status: {batch.status}")
+                self._release_failed_batch(batch)
             else:
                 self._log(f"Batch {batch_id} is {batch.status}")
 
@@ -848,37 +1297,173 @@ class IntegrationManager:
 
     @requires_services("openai", "tracker")
     def _handle_completed_batch(
-        self, output_file_id: str, batch_type: str, batch_id: str
-    ):
+        self,
+        output_file_id: str,
+        batch_type: str,
+        batch_id: str,
+        checkpoint_every: int = 100,
+    ) -> dict:
         assert self.openai and self.tracker
-        file_response = self.openai.client.files.content(output_file_id)
-        content = file_response.text
 
-        results = []
-        for line in content.split("\n"):
-            if line.strip():
-                results.append(json.loads(line))
+        processors = {
+            "abstract_screen": self._process_abstract_result,
+            "fulltext_screen": self._process_fulltext_result,
+            "extraction": self._process_extraction_result,
+        }
+        process_result = processors.get(batch_type)
+        if process_result is None:
+            self._log(f"Unknown batch type {batch_type} for batch {batch_id}")
+            return {
+                "processed": 0,
+                "failed": 0,
+                "seconds": 0.0,
+                "input_tokens": 0,
+                "cached_tokens": 0,
+            }
 
-        self._log(f"Processing {len(results)} results for {batch_type}...")
+        # Screening results only change labels, so their label updates are
+        # queued and sent in bulk before each checkpoint instead of one Rayyan
+        # call per result.
+        queued: list[tuple[str, int, dict, str, str | None]] = []
+        if batch_type != "extraction":
+            process_result = partial(process_result, labels=queued)
 
-        if batch_type == "abstract_screen":
-            self._process_abstract_results(results)
-        elif batch_type == "fulltext_screen":
-            self._process_fulltext_results(results)
-        elif batch_type == "extraction":
-            self._process_extraction_results(results)
+        # Extractions make ~15 round trips per item, so they are spread over a
+        # worker pool. Screening results stay serial.
+        workers = self.extraction_workers if batch_type == "extraction" else 1
 
+        start = self.tracker.get_checkpoint(batch_id)
+        if start:
+            self._log(f"Resuming {batch_type} batch {batch_id} from line {start}...")
+        else:
+            self._log(f"Processing results for {batch_type}...")
+
+        # Results are read and applied one line at a time, so memory stays flat
+        # regardless of the output file size. The checkpoint only advances past
+        # lines whose result has been applied, so a crash resumes at the next
+        # unprocessed line even when results finish out of order.
+        started_at = time.monotonic()
+        in_flight: dict[Future, tuple[int, str]] = {}
+        finished_lines: set[int] = set()
+        statuses: dict[str, str] = {}
+        watermark = start
+        line_no = 0
+        processed = 0
+        failed = 0
+        last_saved = 0
+        input_tokens = 0
+        cached_tokens = 0
+
+        def flush_labels():
+            nonlocal failed
+            if not queued:
+                return
+            # Posted notes are recorded before the labels are sent, so a crash
+            # in between does not post them twice on resume
+            self._record_results(
+                batch_id,
+                {
+                    custom_id: {"note": True}
+                    for custom_id, article_id, _, _, note in queued
+                    if self._post_note(article_id, note)
+                },
+            )
+            failures = self._apply_labels(
+                (article_id, plan) for _, article_id, plan, _, _ in queued
+            )
+            applied = {}
+            for custom_id, article_id, _, status, _ in queued:
+                if article_id in failures:
+                    status = "failed"
+                else:
+                    applied[custom_id] = {"status": status}
+                statuses[custom_id] = status
+                failed += status != "applied"
+            self._record_results(batch_id, applied)
+            queued.clear()
+
+        def collect(futures):
+            nonlocal watermark, processed, failed, last_saved, statuses
+            for future in futures:
+                done_line, custom_id = in_flight.pop(future)
+                try:
+                    status = future.result()
+                except Exception as e:
+                    self._log(f"Failed to process {custom_id}: {e}", "error")
+                    status = "failed"
+                if status != "queued":
+                    statuses[custom_id] = status
+                    failed += status != "applied"
+                processed += 1
+                finished_lines.add(done_line)
+
+            while watermark + 1 in finished_lines:
+                watermark += 1
+                finished_lines.remove(watermark)
+
+            if processed - last_saved >= checkpoint_every:
+                flush_labels()
+                self.tracker.save_progress(batch_id, watermark, statuses)
+                statuses = {}
+                last_saved = processed
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for line_no, line in enumerate(
+                self.openai.iter_file_lines(output_file_id), start=1
+            ):
+                if line_no <= start:
+                    continue
+                if not line.strip():
+                    finished_lines.add(line_no)
+                    continue
+
+                item = json.loads(line)
+                item_input, item_cached = utils.extract_token_usage(item)
+                input_tokens += item_input
+                cached_tokens += item_cached
+                future = pool.submit(process_result, item, batch_id)
+                in_flight[future] = (line_no, item.get("custom_id", ""))
+
+                if len(in_flight) >= workers:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
+
+            collect(wait(in_flight).done)
+
+        flush_labels()
+        self.tracker.save_progress(batch_id, max(line_no, start), statuses)
+        seconds = time.monotonic() - started_at
+        self._log(
+            f"Processed {processed} results for {batch_type} in {seconds:.1f}s "
+            f"({failed} not applied). Prompt cache hits: "
+            f"{utils.format_cache_ratio(input_tokens, cached_tokens)} input tokens."
+        )
         self.tracker.mark_completed(batch_id)
 
+        return {
+            "processed": processed,
+            "failed": failed,
+            "seconds": seconds,
+            "input_tokens": input_tokens,
+            "cached_tokens": cached_tokens,
+        }
+
     @requires_services("rayyan")
     def _action_screening_decision(
-        self, decision: dict, article_id: int, is_abstract: bool, is_batch: bool = False
-    ):
+        self,
+        decision: dict,
+        article_id: int,
+        is_abstract: bool,
+        is_batch: bool = False,
+        apply: bool = True,
+        rescreen: bool = False,
+        post_note: bool = True,
+    ) -> dict | None:
         assert self.rayyan
 
         if decision["vote"] not in ["include", "exclude"]:
             # Invalid vote, skip
-            return
+            return None
 
         if decision["vote"] == "exclude":
             if is_abstract:
@@ -893,16 +1478,8 @@ class IntegrationManager:
                     excl_reason_idx = decision["failed_inclusion"][0]
                     excl_label = config.RAYYAN_EXCLUSION_LABELS[excl_reason_idx - 1]
                     plan[excl_label] = 1
-            rationale = decision["rationale"]
-            rationale = utils.sanitize_text(rationale)
-            if len(rationale) > 1000:
-                rationale = rationale[:981] + "..."
-            try:
-                self.rayyan.create_article_note(
-                    article_id, f"LLM Reasoning: {rationale}"
-                )
-            except Exception as e:
-                self._log(f"Failed to create note for article {article_id}: {e}")
+            if post_note:
+                self._post_note(article_id, self._screening_note(decision))
         else:
             if is_abstract:
                 plan = {config.RAYYAN_LABELS["abstract_included"]: 1}
@@ -912,130 +1489,377 @@ class IntegrationManager:
                     config.RAYYAN_LABELS["unextracted"]: 1,
                 }
 
+        if rescreen:
+            # Clear whatever the previous decision at this stage labelled
+            cleared = self._decision_labels(is_abstract)
+            if not is_abstract:
+                if self._was_extracted(article_id):
+                    # Already in Airtable, so it must not be extracted again
+                    plan.pop(config.RAYYAN_LABELS["unextracted"], None)
+                else:
+                    cleared.append(config.RAYYAN_LABELS["extracted"])
+                cleared.append(config.RAYYAN_LABELS["unextracted"])
+            plan = {**dict.fromkeys(cleared, -1), **plan}
+
         if is_batch:
             plan[config.RAYYAN_LABELS["batch_pending"]] = -1
 
-        self.rayyan.update_article_labels(article_id, plan)
+        if apply:
+            self.rayyan.update_article_labels(article_id, plan)
+        return plan
 
     @requires_services("rayyan", "openai")
-    def _process_abstract_results(self, results: list):
+    def _process_abstract_result(
+        self, item: dict, batch_id: str | None = None, labels: list | None = None
+    ) -> str:
         assert self.rayyan and self.openai
-        for item in results:
-            try:
-                article_id = int(item["custom_id"].split("-")[-1])
-                response_body = item["response"]["body"]
-
-                if item["response"]["status_code"] != 200:
-                    self._log(
-                        f"Error in batch result for {article_id}: {response_body}"
-                    )
-                    plan = {config.RAYYAN_LABELS["batch_pending"]: -1}
-                    self.rayyan.update_article_labels(article_id, plan)
-                    continue
+        try:
+            applied = self._get_result(batch_id, item["custom_id"])
+            if "status" in applied:
+                return applied["status"]
+
+            article_id = int(item["custom_id"].split("-")[-1])
+            response_body = item["response"]["body"]
+
+            if item["response"]["status_code"] != 200:
+                self._log(f"Error in batch result for {article_id}: {response_body}")
+                if self.screening_cache:
+                    self.screening_cache.release(article_id)
+                plan = {config.RAYYAN_LABELS["batch_pending"]: -1}
+                return self._settle_screening_result(
+                    batch_id, item["custom_id"], article_id, plan, "error", labels
+                )
 
-                content_str = response_body["output"][0]["content"][0]["text"]
-                decision = self.openai.parse_screening_decision(content_str)
-                decision_dict = decision.model_dump()
+            content_str = response_body["output"][0]["content"][0]["text"]
+            decision = self.openai.parse_screening_decision(content_str)
+            decision_dict = decision.model_dump()
+            if self.screening_cache:
+                self.screening_cache.resolve(article_id, decision_dict)
+            self._record_decision(
+                article_id, "abstract_screen", decision_dict, batch_id
+            )
 
-                self._action_screening_decision(
-                    decision_dict, article_id, is_abstract=True, is_batch=True
-                )
+            plan = self._action_screening_decision(
+                decision_dict,
+                article_id,
+                is_abstract=True,
+                is_batch=True,
+                apply=False,
+                post_note=False,
+            )
+            # The note is posted with the labels, unless a previous attempt
+            # already posted it
+            note = None if applied.get("note") else self._screening_note(decision_dict)
+            return self._settle_screening_result(
+                batch_id, item["custom_id"], article_id, plan, "applied", labels, note
+            )
 
-            except Exception as e:
-                self._log(f"Failed to process abstract result: {e}")
+        except Exception as e:
+            self._log(f"Failed to process abstract result: {e}")
+            return "failed"
 
     @requires_services("rayyan", "openai")
-    def _process_fulltext_results(self, results: list):
+    def _process_fulltext_result(
+        self, item: dict, batch_id: str | None = None, labels: list | None = None
+    ) -> str:
         assert self.rayyan and self.openai
-        for item in results:
-            try:
-                article_id = int(item["custom_id"].split("-")[-1])
-                response_body = item["response"]["body"]
-
-                if item["response"]["status_code"] != 200:
-                    self._log(
-                        f"Error in batch result for {article_id}: {response_body}"
-                    )
-                    plan = {config.RAYYAN_LABELS["batch_pending"]: -1}
-                    self.rayyan.update_article_labels(article_id, plan)
-                    continue
+        try:
+            applied = self._get_result(batch_id, item["custom_id"])
+            if "status" in applied:
+                return applied["status"]
+
+            article_id = int(item["custom_id"].split("-")[-1])
+            response_body = item["response"]["body"]
+
+            if item["response"]["status_code"] != 200:
+                self._log(f"Error in batch result for {article_id}: {response_body}")
+                plan = {config.RAYYAN_LABELS["batch_pending"]: -1}
+                return self._settle_screening_result(
+                    batch_id, item["custom_id"], article_id, plan, "error", labels
+                )
 
-                content_str = response_body["output"][0]["content"][0]["text"]
-                decision = self.openai.parse_screening_decision(content_str)
-                decision_dict = decision.model_dump()
+            content_str = response_body["output"][0]["content"][0]["text"]
+            decision = self.openai.parse_screening_decision(content_str)
+            decision_dict = decision.model_dump()
+            self._record_decision(
+                article_id, "fulltext_screen", decision_dict, batch_id
+            )
 
-                self._action_screening_decision(
-                    decision_dict, article_id, is_abstract=False, is_batch=True
-                )
+            plan = self._action_screening_decision(
+                decision_dict,
+                article_id,
+                is_abstract=False,
+                is_batch=True,
+                apply=False,
+                post_note=False,
+            )
+            # The note is posted with the labels, unless a previous attempt
+            # already posted it
+            note = None if applied.get("note") else self._screening_note(decision_dict)
+            return self._settle_screening_result(
+                batch_id, item["custom_id"], article_id, plan, "applied", labels, note
+            )
 
-            except Exception as e:
-                self._log(f"Failed to process fulltext result: {e}")
+        except Exception as e:
+            self._log(f"Failed to process fulltext result: {e}")
+            return "failed"
 
     @requires_services("rayyan", "airtable", "asana", "openai")
-    def _process_extraction_results(self, results: list):
+    def _process_extraction_result(
+        self, item: dict, batch_id: str | None = None
+    ) -> str:
         assert self.rayyan and self.airtable and self.asana and self.openai
+        try:
+            applied = self._get_result(batch_id, item["custom_id"])
+            if "status" in applied:
+                return applied["status"]
 
-        for item in results:
-            try:
-                article_id = int(item["custom_id"].split("-")[-1])
-                response_body = item["response"]["body"]
+            article_id = int(item["custom_id"].split("-")[-1])
+            response_body = item["response"]["body"]
 
-                if item["response"]["status_code"] != 200:
-                    self._log(
-                        f"Error in batch result for {article_id}: {response_body}"
+            if item["response"]["status_code"] != 200:
+                self._log(f"Error in batch result for {article_id}: {response_body}")
+                plan = {config.RAYYAN_LABELS["batch_pending"]: -1}
+                self.rayyan.update_article_labels(article_id, plan)
+                self._record_result(batch_id, item["custom_id"], status="error")
+                return "error"
+
+            content_str = response_body["output"][0]["content"][0]["text"]
+            llm_extraction = self.openai.parse_extraction_result(content_str)
+
+            # Each side effect is recorded as it lands, so a retry picks up
+            # after the last step that completed rather than duplicating it.
+            dataset = applied.get("dataset")
+            if dataset is None:
+                with self._service_slot("rayyan"):
+                    article = self.rayyan.get_article_by_id(article_id)
+                    article_metadata = self.rayyan.extract_article_metadata(article)
+                    pdf_path = self.rayyan.download_pdf(article)
+
+                with self._service_slot("airtable"):
+                    dataset = self.upload_extraction_to_airtable(
+                        llm_extraction,
+                        article_metadata,
+                        pdf_path=pdf_path,
+                        applied=applied,
+                        record=partial(
+                            self._record_result, batch_id, item["custom_id"]
+                        ),
                     )
-                    plan = {config.RAYYAN_LABELS["batch_pending"]: -1}
-                    self.rayyan.update_article_labels(article_id, plan)
-                    continue
+                self._record_result(batch_id, item["custom_id"], dataset=dataset)
 
-                content_str = response_body["output"][0]["content"][0]["text"]
-                llm_extraction = self.openai.parse_extraction_result(content_str)
+            if "task_gid" not in applied:
+                with self._service_slot("asana"):
+                    task = self.create_task_from_dataset(dataset)
+                self._record_result(
+                    batch_id, item["custom_id"], task_gid=task.get("gid")
+                )
 
-                article = self.rayyan.get_article_by_id(article_id)
-                article_metadata = self.rayyan.extract_article_metadata(article)
-                pdf_path = self.rayyan.download_pdf(article)
+            plan = {
+                self.rayyan.unextracted_label: -1,
+                self.rayyan.extracted_label: 1,
+                config.RAYYAN_LABELS["batch_pending"]: -1,
+            }
+            with self._service_slot("rayyan"):
+                self.rayyan.update_article_labels(article_id, plan)
+            self._record_result(batch_id, item["custom_id"], status="applied")
+            self._record_decision(article_id, "extraction", None, batch_id)
+            self._log(f"Successfully processed extraction for {article_id}")
+            return "applied"
+
+        except Exception as e:
+            self._log(f"Failed to process extraction result: {e}")
+            return "failed"
+
+    @staticmethod
+    def _screening_note(decision: dict) -> str | None:
+        """The Rayyan note explaining an exclude, or None for other votes."""
+        if decision["vote"] != "exclude":
+            return None
+        rationale = utils.sanitize_text(decision["rationale"])
+        if len(rationale) > 1000:
+            rationale = rationale[:981] + "..."
+        return f"LLM Reasoning: {rationale}"
+
+    def _post_note(self, article_id: int, note: str | None) -> bool:
+        assert self.rayyan
+        if note is None:
+            return False
+        try:
+            self.rayyan.create_article_note(article_id, note)
+        except Exception as e:
+            self._log(f"Failed to create note for article {article_id}: {e}")
+            return False
+        return True
+
+    @staticmethod
+    def _decision_labels(is_abstract: bool) -> list[str]:
+        """Labels a screening decision at the abstract or fulltext stage sets."""
+        if is_abstract:
+            return [
+                config.RAYYAN_LABELS["abstract_included"],
+                config.RAYYAN_LABELS["abstract_excluded"],
+            ]
+        return [
+            config.RAYYAN_LABELS["included"],
+            config.RAYYAN_LABELS["excluded"],
+            *config.RAYYAN_EXCLUSION_LABELS,
+        ]
+
+    def _was_extracted(self, article_id: int) -> bool:
+        # Without a decision store the extraction history is unknown, so the
+        # article is assumed to have been uploaded
+        if self.decisions is None:
+            return True
+        return self.decisions.get(article_id, "extraction") is not None
+
+    def _record_decision(
+        self,
+        article_id: int,
+        stage: str,
+        decision: dict | None,
+        batch_id: str | None = None,
+    ) -> None:
+        if self.decisions is None:
+            return
+        version = self._prompt_version(stage, batch_id)
+        self.decisions.record(article_id, stage, version, decision)
 
-                dataset = self.upload_extraction_to_airtable(
-                    llm_extraction, article_metadata, pdf_path=pdf_path
+    def _prompt_version(self, stage: str, batch_id: str | None = None) -> str:
+        """The prompt version of a batch, or the current one if none was recorded."""
+        assert self.openai
+        if batch_id is not None and self.tracker is not None:
+            if batch_id not in self._batch_versions:
+                self._batch_versions[batch_id] = self.tracker.get_prompt_version(
+                    batch_id
                 )
+            if self._batch_versions[batch_id]:
+                return self._batch_versions[batch_id]  # type: ignore
+        return self.openai.prompt_versions[stage]
 
-                self.create_task_from_dataset(dataset)
+    def _settle_screening_result(
+        self,
+        batch_id: str | None,
+        custom_id: str,
+        article_id: int,
+        plan: dict | None,
+        status: str,
+        labels: list | None,
+        note: str | None = None,
+    ) -> str:
+        """Applies, or queues in `labels`, a result's note, labels and ledger entry."""
+        assert self.rayyan
+        if plan and labels is not None:
+            labels.append((custom_id, article_id, plan, status, note))
+            return "queued"
+        if self._post_note(article_id, note):
+            self._record_result(batch_id, custom_id, note=True)
+        if plan:
+            self.rayyan.update_article_labels(article_id, plan)
+        self._record_result(batch_id, custom_id, status=status)
+        return status
+
+    def _batch_token_budget(self) -> int | None:
+        """Input tokens left in the batch queue, or None when uncapped."""
+        if self.batch_queue_tokens is None or self.tracker is None:
+            return None
+        return self.batch_queue_tokens - self.tracker.get_enqueued_tokens()
+
+    def _log_held(self, held: int) -> None:
+        if held:
+            self._log(
+                f"Held back {held} requests over the batch queue token budget "
+                "until running batches finish."
+            )
 
-                plan = {
-                    self.rayyan.unextracted_label: -1,
-                    self.rayyan.extracted_label: 1,
-                    config.RAYYAN_LABELS["batch_pending"]: -1,
-                }
-                self.rayyan.update_article_labels(article_id, plan)
-                self._log(f"Successfully processed extraction for {article_id}")
+    @requires_services("rayyan", "tracker")
+    def _release_failed_batch(self, batch: Batch) -> None:
+        """Stops tracking a failed batch so its articles are sent again."""
+        assert self.tracker
+        errors = getattr(batch.errors, "data", None) or []
+        for code in sorted({error.code for error in errors if error.code}):
+            self._log(f"Batch {batch.id} failed with {code}", "warning")
+
+        rows = self.tracker.get_requests(batch_id=batch.id)
+        if self.screening_cache:
+            for row in rows:
+                if row["stage"] == "abstract_screen":
+                    self.screening_cache.release(row["article_id"])
+
+        pending_label = config.RAYYAN_LABELS["batch_pending"]
+        self._apply_labels((row["article_id"], {pending_label: -1}) for row in rows)
+        self.tracker.mark_failed(batch.id)
+
+    def _apply_labels(
+        self, updates: Iterable[tuple[int, dict]]
+    ) -> dict[int, Exception]:
+        """Sends label plans through Rayyan's bulk path, logging any failures."""
+        assert self.rayyan
+        updates = list(updates)
+        if not updates:
+            return {}
+        failures = self.rayyan.bulk_update_article_labels(
+            updates, max_workers=self._service_limits.get("rayyan", 1)
+        )
+        for article_id, error in failures.items():
+            self._log(f"Failed to update labels for {article_id}: {error}", "error")
+        return failures
+
+    @contextmanager
+    def _service_slot(self, service: str):
+        """Holds one of the service's concurrency slots for the duration."""
+        slot = self._service_slots.get(service)
+        if slot is None:
+            yield
+            return
+        with slot:
+            yield
 
-            except Exception as e:
-                self._log(f"Failed to process extraction result: {e}")
+    def _get_result(self, batch_id: str | None, custom_id: str) -> dict:
+        if batch_id is None or self.tracker is None:
+            return {}
+        return self.tracker.get_result(batch_id, custom_id)
 
-    @requires_services("openai", "tracker")
-    def _submit_batch(self, requests: list, batch_type: str):
-        """Internal helper to write JSONL, upload, and create batch."""
-        assert self.openai and self.tracker
+    def _record_result(self, batch_id: str | None, custom_id: str, **steps):
+        if batch_id is None or self.tracker is None:
+            return
+        self.tracker.record_result(batch_id, custom_id, **steps)
 
-        timestamp = int(time.time())
-        filename = f"batch_input_{batch_type}_{timestamp}.jsonl"
+    def _record_results(self, batch_id: str | None, steps_by_id: dict[str, dict]):
+        if batch_id is None or self.tracker is None or not steps_by_id:
+            return
+        self.tracker.record_results(batch_id, steps_by_id)
 
-        self._log(f"Writing {len(requests)} requests to {filename}...")
-        with open(filename, "w") as f:
-            for req in requests:
-                f.write(json.dumps(req) + "\n")
+    @requires_services("openai", "tracker")
+    def _submit_batch(self, writer: BatchWriter, batch_type: str):
+        """Upload each of the writer's JSONL files and create a batch for it."""
+        assert self.openai and self.tracker
 
-        try:
-            self._log("Creating batch job...")
-            batch_job = self.openai.create_batch(filename, batch_type)
-            self.tracker.add_batch(batch_job.id, batch_type)
-            self._log(f"Batch {batch_job.id} submitted successfully.")
+        batch_files = writer.close()
+        for batch_file in batch_files:
+            filename = Path(batch_file["path"]).name
+            self._log(
+                f"Uploading {batch_file['rows']} requests "
+                f"({batch_file['bytes'] / 1e6:.1f} MB) from {filename}..."
+            )
+            try:
+                self._log("Creating batch job...")
+                batch_job = self.openai.create_batch(batch_file["path"], batch_type)
+                self.tracker.add_batch(
+                    batch_job.id,
+                    batch_type,
+                    requests=batch_file["tracked"] or None,
+                    prompt_version=self.openai.prompt_versions.get(batch_type),
+                    estimated_tokens=sum(
+                        row.get("tokens", 0) for row in batch_file["tracked"]
+                    ),
+                )
+                self._log(f"Batch {batch_job.id} submitted successfully.")
 
-        except Exception as e:
-            self._log(f"Error submitting batch: {e}")
-        finally:
-            if Path(filename).exists():
-                Path(filename).unlink()
+            except Exception as e:
+                self._log(f"Error submitting batch: {e}")
+            finally:
+                Path(batch_file["path"]).unlink(missing_ok=True)
 
     def _log(self, message: str | object, level: str = "info", **kwargs):
         msg_str = str(message)
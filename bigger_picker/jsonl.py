@@ -0,0 +1,24 @@
+import json
+import os
+from collections.abc import Iterable, Iterator
+
+
+def append_jsonl(path: str, entries: Iterable[dict]) -> None:
+    """Appends entries to a JSON lines file with a single fsync."""
+    with open(path, "a") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def read_jsonl(path: str) -> Iterator[dict]:
+    """Entries of a JSON lines file, skipping a partial trailing line."""
+    if not os.path.exists(path):
+        return
+    with open(path) as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
@@ -0,0 +1,126 @@
+import re
+import unicodedata
+import zlib
+from functools import cache
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+from recordlinkage.base import BaseIndexAlgorithm
+
+import bigger_picker.config as config
+
+# Modulus of the permutations. Shingle hashes (crc32) and multipliers both stay
+# below 2**32, so their product fits in uint64 and is reduced before adding b
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_MULTIPLIER = 1 << 32
+# Records hashed per chunk, to bound the (shingles x hashes) work array
+_CHUNK_ROWS = 1000
+
+
+class MinHashIndex(BaseIndexAlgorithm):
+    """recordlinkage indexer pairing records with similar shingles via MinHash LSH."""
+
+    def __init__(
+        self,
+        left_on: str,
+        shingle_size: int = 3,
+        bands: int = config.DUPLICATE_MINHASH_BANDS,
+        rows: int = config.DUPLICATE_MINHASH_ROWS,
+        max_bucket_size: int = 500,
+        seed: int = 0,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.left_on = left_on
+        self.shingle_size = shingle_size
+        self.bands = bands
+        self.rows = rows
+        self.max_bucket_size = max_bucket_size
+
+        rng = np.random.default_rng(seed)
+        num_perm = bands * rows
+        self._a = rng.integers(1, _MAX_MULTIPLIER, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_MERSENNE_PRIME), num_perm, dtype=np.uint64)
+
+    def __repr__(self):
+        return f"<MinHashIndex {self.left_on!r} bands={self.bands} rows={self.rows}>"
+
+    def threshold(self) -> float:
+        """Jaccard similarity at which a pair is found half of the time."""
+        return (1 / self.bands) ** (1 / self.rows)
+
+    def signatures(self, values: pd.Series) -> np.ndarray:
+        """MinHash signatures, the max hash for values without shingles."""
+        shingle_sets = [self._shingles(value) for value in values]
+        lengths = np.array([len(s) for s in shingle_sets], dtype=np.int64)
+        hashes = np.fromiter(
+            chain.from_iterable(shingle_sets), dtype=np.uint64, count=lengths.sum()
+        )
+        signatures = np.full(
+            (len(shingle_sets), len(self._a)), np.iinfo(np.uint64).max, np.uint64
+        )
+
+        rows = np.flatnonzero(lengths)
+        ends = np.cumsum(lengths[rows])
+        starts = ends - lengths[rows]
+        for chunk in range(0, len(rows), _CHUNK_ROWS):
+            chunk_rows = rows[chunk : chunk + _CHUNK_ROWS]
+            first, last = starts[chunk], ends[chunk : chunk + _CHUNK_ROWS][-1]
+            # In place, so the (shingles x hashes) array is only allocated once
+            permuted = hashes[first:last, None] * self._a
+            permuted %= _MERSENNE_PRIME
+            permuted += self._b
+            permuted %= _MERSENNE_PRIME
+            offsets = starts[chunk : chunk + _CHUNK_ROWS] - first
+            signatures[chunk_rows] = np.minimum.reduceat(permuted, offsets, axis=0)
+
+        return signatures
+
+    def _shingles(self, value) -> set[int]:
+        if not isinstance(value, str):
+            return set()
+        text = unicodedata.normalize("NFKD", value).encode("ascii", "ignore")
+        text = " ".join(re.findall(r"[a-z0-9]+", text.decode().lower()))
+        if not text:
+            return set()
+        if len(text) <= self.shingle_size:
+            return {zlib.crc32(text.encode())}
+        return {
+            zlib.crc32(text[i : i + self.shingle_size].encode())
+            for i in range(len(text) - self.shingle_size + 1)
+        }
+
+    def _dedup_index(self, df_a):
+        signatures = self.signatures(df_a[self.left_on])
+        has_shingles = signatures[:, 0] != np.iinfo(np.uint64).max
+
+        # Pairs are collected as later * n + earlier, which keeps them in the
+        # lower triangle recordlinkage uses for dedup and makes them cheap to
+        # deduplicate across bands
+        n = len(signatures)
+        pairs = [np.empty(0, dtype=np.int64)]
+        for band in range(self.bands):
+            keys = signatures[has_shingles, band * self.rows : (band + 1) * self.rows]
+            _, bucket = np.unique(keys, axis=0, return_inverse=True)
+            bucket = bucket.ravel()
+            order = np.flatnonzero(has_shingles)[np.argsort(bucket, kind="stable")]
+            sizes = np.bincount(bucket)
+            starts = np.cumsum(sizes) - sizes
+            for start, size in zip(starts.tolist(), sizes.tolist(), strict=True):
+                if size < 2 or size > self.max_bucket_size:
+                    continue
+                # Positions are ascending within a bucket
+                group = order[start : start + size]
+                earlier, later = _pair_positions(size)
+                pairs.append(group[later].astype(np.int64) * n + group[earlier])
+
+        encoded = np.unique(np.concatenate(pairs))
+        levels = [df_a.index.values, df_a.index.values]
+        codes = [encoded // n, encoded % n]
+        return pd.MultiIndex(levels=levels, codes=codes, verify_integrity=False)
+
+
+@cache
+def _pair_positions(size: int) -> tuple[np.ndarray, np.ndarray]:
+    return np.triu_indices(size, k=1)
@@ -1,41 +1,101 @@
+import hashlib
+import json
+from collections.abc import Iterator
+from functools import cache
+
+import httpx
 from openai import OpenAI
 from openai.types import Batch, FileObject, FilePurpose
 from openai.types.responses.response_input_param import ResponseInputItemParam
+from pydantic import BaseModel
 
+import bigger_picker.sessions as sessions
 from bigger_picker.config import (
     ABSTRACT_SCREENING_INSTRUCTIONS,
     ARTICLE_EXTRACTION_PROMPT,
     EXCLUSION_CRITERIA,
     FULLTEXT_SCREENING_INSTRUCTIONS,
+    HTTP_MAX_RETRIES,
     INCLUSION_CRITERIA,
     INCLUSION_HEADER,
+    OPENAI_CHARS_PER_TOKEN,
+    OPENAI_PDF_TOKENS,
+    OPENAI_PDF_TOKENS_PER_PAGE,
     STUDY_OBJECTIVES,
 )
 from bigger_picker.credentials import load_token
 from bigger_picker.datamodels import ArticleLLMExtract, ScreeningDecision
+from bigger_picker.pdftext import pdf_page_count
+from bigger_picker.ratelimit import RateLimiter
 
 
 class OpenAIManager:
-    def __init__(self, api_key: str | None = None, model: str = "gpt-5.1"):
+    def __init__(
+        self,
+        api_key: str | None = None,
+        model: str = "gpt-5.1",
+        base_url: str | None = None,
+        rate_limiter: RateLimiter | None = None,
+    ):
         if api_key is None:
             api_key = load_token("OPENAI_TOKEN")
 
-        self.client = OpenAI(api_key=api_key)
+        # Paces direct (non-batch) calls when they are made from many threads,
+        # and follows the rate limits reported on every response
+        self.rate_limiter = rate_limiter
+        # base_url points the client at another OpenAI-compatible server, such
+        # as the local FakeOpenAIServer used for offline load tests.
+        self.client = OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=sessions.create_openai_http_client(
+                on_response=self._observe_rate_limits
+            ),
+            max_retries=HTTP_MAX_RETRIES,
+        )
         self.model = model
+        # The criteria prompts never change, so they are built once and sent
+        # ahead of any per-article content. Identical prefixes let the
+        # provider's prompt cache serve them instead of reprocessing them.
+        self._abstract_prompt = self._build_screening_prompt(
+            ABSTRACT_SCREENING_INSTRUCTIONS
+        )
+        self._fulltext_prompt = self._build_screening_prompt(
+            FULLTEXT_SCREENING_INSTRUCTIONS
+        )
+        # Identifies the model, prompt and output schema behind each stage's
+        # results, so decisions made under an older prompt can be found and
+        # are not reused once any of them change
+        self.prompt_versions = {
+            "abstract_screen": self._prompt_version(
+                self._abstract_prompt, ScreeningDecision
+            ),
+            "fulltext_screen": self._prompt_version(
+                self._fulltext_prompt, ScreeningDecision
+            ),
+            "extraction": self._prompt_version(
+                ARTICLE_EXTRACTION_PROMPT, ArticleLLMExtract
+            ),
+        }
+        # Serialized batch bodies minus their input, keyed by everything else
+        self._row_templates: dict[tuple, str] = {}
 
     def extract_article_info(self, pdf_path: str):
         file = self.upload_file(pdf_path)
 
+        inputs: list[ResponseInputItemParam] = [
+            {"role": "system", "content": ARTICLE_EXTRACTION_PROMPT},
+            {
+                "role": "user",
+                "content": [{"type": "input_file", "file_id": file.id}],
+            },
+        ]
+        self._wait_for_budget(inputs, pdf_path)
         response = self.client.responses.parse(
             model=self.model,
-            input=[
-                {"role": "system", "content": ARTICLE_EXTRACTION_PROMPT},
-                {
-                    "role": "user",
-                    "content": [{"type": "input_file", "file_id": file.id}],
-                },
-            ],
+            input=inputs,
             text_format=ArticleLLMExtract,
+            prompt_cache_key="extraction",
         )
 
         return response.output_parsed
@@ -43,10 +103,12 @@ class OpenAIManager:
     def screen_record_abstract(self, abstract: str):
         inputs = self._build_abstract_prompt(abstract)
 
+        self._wait_for_budget(inputs)
         response = self.client.responses.parse(
             model=self.model,
             input=inputs,
             text_format=ScreeningDecision,
+            prompt_cache_key="abstract_screen",
         )
         return response.output_parsed
 
@@ -55,10 +117,25 @@ class OpenAIManager:
 
         inputs = self._build_fulltext_prompt(file.id)
 
+        self._wait_for_budget(inputs, pdf_path)
         response = self.client.responses.parse(
             model=self.model,
             input=inputs,
             text_format=ScreeningDecision,
+            prompt_cache_key="fulltext_screen",
+        )
+
+        return response.output_parsed
+
+    def screen_record_fulltext_text(self, text: str):
+        inputs = self._build_fulltext_text_prompt(text)
+
+        self._wait_for_budget(inputs)
+        response = self.client.responses.parse(
+            model=self.model,
+            input=inputs,
+            text_format=ScreeningDecision,
+            prompt_cache_key="fulltext_screen",
         )
 
         return response.output_parsed
@@ -66,7 +143,9 @@ class OpenAIManager:
     def prepare_abstract_body(self, abstract: str) -> dict:
         """Returns the body for the batch request (messages + schema)."""
         inputs = self._build_abstract_prompt(abstract)
-        return self._build_structured_payload(inputs, ScreeningDecision)
+        return self._build_structured_payload(
+            inputs, ScreeningDecision, "abstract_screen"
+        )
 
     def prepare_fulltext_body(self, file_id: str) -> dict:
         """
@@ -74,7 +153,16 @@ class OpenAIManager:
         The IntegrationManager must call upload_file first.
         """
         inputs = self._build_fulltext_prompt(file_id)
-        return self._build_structured_payload(inputs, ScreeningDecision)
+        return self._build_structured_payload(
+            inputs, ScreeningDecision, "fulltext_screen"
+        )
+
+    def prepare_fulltext_text_body(self, text: str) -> dict:
+        """Like `prepare_fulltext_body`, with extracted text instead of a PDF."""
+        inputs = self._build_fulltext_text_prompt(text)
+        return self._build_structured_payload(
+            inputs, ScreeningDecision, "fulltext_screen"
+        )
 
     def prepare_extraction_body(self, file_id: str) -> dict:
         """
@@ -88,7 +176,7 @@ class OpenAIManager:
                 "content": [{"type": "input_file", "file_id": file_id}],
             },
         ]
-        return self._build_structured_payload(inputs, ArticleLLMExtract)
+        return self._build_structured_payload(inputs, ArticleLLMExtract, "extraction")
 
     def parse_screening_decision(self, json_content: str) -> ScreeningDecision:
         return ScreeningDecision.model_validate_json(json_content)
@@ -114,6 +202,11 @@ class OpenAIManager:
     def retrieve_batch(self, batch_id: str) -> Batch:
         return self.client.batches.retrieve(batch_id)
 
+    def iter_file_lines(self, file_id: str) -> Iterator[str]:
+        """Streams a file line by line instead of reading the whole body."""
+        with self.client.files.with_streaming_response.content(file_id) as response:
+            yield from response.iter_lines()
+
     def create_batch_row(
         self, custom_id: str, body: dict, url: str = "/v1/responses"
     ) -> dict:
@@ -124,59 +217,131 @@ class OpenAIManager:
             "body": body,
         }
 
-    def _build_structured_payload(self, input: list, pydantic_model) -> dict:
-        return {
+    def serialize_batch_row(self, row: dict) -> str:
+        """JSONL line for a batch row, serializing the shared part of the body once."""
+        body = row["body"]
+        key = (
+            row["method"],
+            row["url"],
+            body["text"]["format"]["name"],
+            tuple((k, v) for k, v in body.items() if k not in ("input", "text")),
+        )
+        template = self._row_templates.get(key)
+        if template is None:
+            shared = {k: v for k, v in body.items() if k != "input"}
+            # Drop the braces so the input can be appended inside the object
+            template = json.dumps(shared)[1:-1]
+            self._row_templates[key] = template
+
+        return (
+            f'{{"custom_id": {json.dumps(row["custom_id"])}, '
+            f'"method": {json.dumps(row["method"])}, '
+            f'"url": {json.dumps(row["url"])}, '
+            f'"body": {{{template}, "input": {json.dumps(body["input"])}}}}}'
+        )
+
+    def _build_structured_payload(
+        self, input: list, pydantic_model, cache_key: str | None = None
+    ) -> dict:
+        payload = {
             "model": self.model,
             "input": input,
-            "text": {
-                "format": {
-                    "type": "json_schema",
-                    "name": pydantic_model.__name__,
-                    "schema": pydantic_model.model_json_schema(),
-                    "strict": True,
-                }
-            },
+            "text": self._text_format(pydantic_model),
         }
+        if cache_key is not None:
+            # Routes requests sharing a prompt prefix to the same cache
+            payload["prompt_cache_key"] = cache_key
+        return payload
 
     def _build_abstract_prompt(self, abstract: str) -> list[ResponseInputItemParam]:
-        prompt = (
-            STUDY_OBJECTIVES
-            + "\n"
-            + INCLUSION_HEADER
-            + "\n"
-            + "Inclusion criteria (all must be met):\n"
-            + self._number_criteria(INCLUSION_CRITERIA)
-            + "\n"
-            + "Exclusion criteria (any triggers exclusion):\n"
-            + self._number_criteria(EXCLUSION_CRITERIA)
-            + "\n"
-            + ABSTRACT_SCREENING_INSTRUCTIONS
-        )
         return [
-            {"role": "system", "content": prompt},
+            {"role": "system", "content": self._abstract_prompt},
             {"role": "user", "content": f"Abstract:\n{abstract}"},
         ]
 
     def _build_fulltext_prompt(self, file_id: str) -> list[ResponseInputItemParam]:
-        prompt = (
-            STUDY_OBJECTIVES
-            + "\n"
-            + INCLUSION_HEADER
-            + "\n"
-            + "Inclusion criteria (all must be met):\n"
-            + self._number_criteria(INCLUSION_CRITERIA)
-            + "\n"
-            + "Exclusion criteria (any triggers exclusion):\n"
-            + self._number_criteria(EXCLUSION_CRITERIA)
-            + "\n"
-            + FULLTEXT_SCREENING_INSTRUCTIONS
-        )
         return [
-            {"role": "system", "content": prompt},
+            {"role": "system", "content": self._fulltext_prompt},
             {"role": "user", "content": [{"type": "input_file", "file_id": file_id}]},
-            {"role": "system", "content": prompt},
         ]
 
+    def _build_fulltext_text_prompt(self, text: str) -> list[ResponseInputItemParam]:
+        return [
+            {"role": "system", "content": self._fulltext_prompt},
+            {"role": "user", "content": f"Fulltext (selected sections):\n{text}"},
+        ]
+
+    @staticmethod
+    def estimate_pdf_tokens(pdf_path: str | None) -> int:
+        """Rough input tokens of a PDF attachment, from its page count."""
+        pages = pdf_page_count(pdf_path) if pdf_path else None
+        if not pages:
+            return OPENAI_PDF_TOKENS
+        return pages * OPENAI_PDF_TOKENS_PER_PAGE
+
+    @classmethod
+    def estimate_tokens(cls, inputs: list, pdf_path: str | None = None) -> int:
+        """Rough input tokens of a prompt, counting files as the PDF at `pdf_path`."""
+        chars = 0
+        files = 0
+        for message in inputs:
+            content = message["content"]
+            if isinstance(content, str):
+                chars += len(content)
+                continue
+            for part in content:
+                if part.get("type") == "input_file":
+                    files += 1
+                else:
+                    chars += len(part.get("text", ""))
+        pdf_tokens = cls.estimate_pdf_tokens(pdf_path) if files else 0
+        return chars // OPENAI_CHARS_PER_TOKEN + files * pdf_tokens
+
+    def estimate_body_tokens(self, body: dict, pdf_path: str | None = None) -> int:
+        """Rough input token count of a prepared batch request body."""
+        return self.estimate_tokens(body["input"], pdf_path)
+
+    def _wait_for_budget(self, inputs: list, pdf_path: str | None = None) -> None:
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(self.estimate_tokens(inputs, pdf_path))
+
+    def _observe_rate_limits(self, response: httpx.Response) -> None:
+        # Only the Responses API limits apply to the calls that are paced
+        if self.rate_limiter is not None and response.url.path.endswith("/responses"):
+            self.rate_limiter.observe(response.headers)
+
+    def _prompt_version(self, prompt: str, pydantic_model: type[BaseModel]) -> str:
+        schema = json.dumps(self._text_format(pydantic_model), sort_keys=True)
+        digest = hashlib.sha256(f"{self.model}\n{prompt}\n{schema}".encode())
+        return digest.hexdigest()[:12]
+
+    @staticmethod
+    @cache
+    def _text_format(pydantic_model: type[BaseModel]) -> dict:
+        """Structured output settings for a model class, built once; do not mutate."""
+        return {
+            "format": {
+                "type": "json_schema",
+                "name": pydantic_model.__name__,
+                "schema": pydantic_model.model_json_schema(),
+                "strict": True,
+            }
+        }
+
+    @classmethod
+    def _build_screening_prompt(cls, instructions: str) -> str:
+        return "\n".join(
+            [
+                STUDY_OBJECTIVES,
+                INCLUSION_HEADER,
+                "Inclusion criteria (all must be met):",
+                cls._number_criteria(INCLUSION_CRITERIA),
+                "Exclusion criteria (any triggers exclusion):",
+                cls._number_criteria(EXCLUSION_CRITERIA),
+                instructions,
+            ]
+        )
+
     @staticmethod
     def _number_criteria(criteria: list[str]) -> str:
         return "\n".join(f"{i + 1}. {c}" for i, c in enumerate(criteria))
@@ -0,0 +1,146 @@
+import hashlib
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import bigger_picker.config as config
+
+
+def extract_pdf_text(pdf_path: str) -> str:
+    """Plain text of every page of a PDF, pages separated by blank lines."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(pdf_path)
+    return "\n\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def pdf_page_count(pdf_path: str) -> int | None:
+    """Number of pages in a PDF, or None without pypdf or for unreadable files."""
+    try:
+        from pypdf import PdfReader
+
+        return len(PdfReader(pdf_path).pages)
+    except Exception:
+        return None
+
+
+def trim_sections(
+    text: str,
+    sections: list[str] | None = None,
+    max_chars: int = config.FULLTEXT_MAX_CHARS,
+) -> str | None:
+    """Keeps the named sections of a paper's text, or None if none are found."""
+    if sections is None:
+        sections = config.FULLTEXT_SECTIONS
+
+    kept = []
+    current = None
+    for line in text.splitlines():
+        heading = _heading(line)
+        if heading is not None:
+            current = heading
+        if current in sections:
+            kept.append(line)
+
+    trimmed = "\n".join(kept).strip()
+    return trimmed[:max_chars] or None
+
+
+def _heading(line: str) -> str | None:
+    """The section a heading line starts, or "other" for headings not kept."""
+    line = line.strip()
+    if not line or len(line) > 60:
+        return None
+    # Drop numbering such as "2.", "2.1" or "II." and a trailing colon
+    line = re.sub(r"^(\d+(\.\d+)*\.?|[IVX]+\.)\s*", "", line).rstrip(":").strip()
+    for section, pattern in config.FULLTEXT_SECTION_HEADINGS.items():
+        if re.fullmatch(pattern, line, flags=re.IGNORECASE):
+            return section
+    return None
+
+
+class PdfTextCache:
+    """Extracts PDF text in a process pool and caches it on disk by content hash."""
+
+    def __init__(
+        self,
+        directory: str = "pdf_text_cache",
+        max_workers: int = config.FULLTEXT_TEXT_WORKERS,
+        sections: list[str] | None = None,
+    ):
+        _require_pypdf()
+        self.directory = directory
+        self.max_workers = max(1, max_workers)
+        self.sections = sections
+        os.makedirs(directory, exist_ok=True)
+
+    def get_texts(self, pdf_paths: list[str]) -> dict[str, str | None]:
+        """Trimmed text for each PDF, or None where none could be used."""
+        hashes = {path: self._hash_file(path) for path in pdf_paths}
+        texts = {path: self._load(file_hash) for path, file_hash in hashes.items()}
+
+        missing = [path for path, text in texts.items() if text is None]
+        workers = min(self.max_workers, len(missing))
+        if workers > 1:
+            # Parsing is CPU bound, so it runs in processes rather than threads
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                texts.update(
+                    zip(missing, executor.map(_safe_extract, missing), strict=True)
+                )
+        else:
+            texts.update((path, _safe_extract(path)) for path in missing)
+
+        for path in missing:
+            if texts[path] is not None:
+                self._save(hashes[path], texts[path])
+
+        return {
+            path: None if text is None else trim_sections(text, self.sections)
+            for path, text in texts.items()
+        }
+
+    def get_text(self, pdf_path: str) -> str | None:
+        return self.get_texts([pdf_path])[pdf_path]
+
+    @staticmethod
+    def _hash_file(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _path(self, file_hash: str) -> str:
+        return os.path.join(self.directory, f"{file_hash}.txt")
+
+    def _load(self, file_hash: str) -> str | None:
+        path = self._path(file_hash)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+    def _save(self, file_hash: str, text: str) -> None:
+        path = self._path(file_hash)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+
+def _require_pypdf() -> None:
+    try:
+        import pypdf  # noqa: F401
+    except ImportError as e:
+        raise RuntimeError(
+            "Local fulltext extraction needs pypdf: pip install 'bigger_picker[pdf]'"
+        ) from e
+
+
+def _safe_extract(pdf_path: str) -> str | None:
+    # Runs in worker processes, so failures come back as None rather than
+    # breaking the whole map
+    try:
+        return extract_pdf_text(pdf_path)
+    except Exception:
+        return None
@@ -0,0 +1,32 @@
+from collections.abc import Iterable
+
+import pandas as pd
+
+import bigger_picker.config as config
+
+
+class AbstractPrescreen:
+    """Keyword pre-screen that excludes abstracts before they reach the model."""
+
+    def __init__(self, rules: list[dict] | None = None):
+        self.rules = config.ABSTRACT_PRESCREEN_RULES if rules is None else rules
+
+    def screen(self, texts: Iterable[str | None]) -> list[dict | None]:
+        """The first rule that excludes each text, or None."""
+        series = pd.Series(list(texts), dtype=object).fillna("").astype(str)
+        matched = pd.Series(-1, index=series.index)
+        for i, rule in enumerate(self.rules):
+            undecided = series[matched < 0]
+            if undecided.empty:
+                break
+            hits = undecided.str.contains(rule["exclude"], case=False, regex=True)
+            if rule.get("keep"):
+                hits &= ~undecided.str.contains(rule["keep"], case=False, regex=True)
+            matched[hits[hits].index] = i
+        return [None if i < 0 else self.rules[i] for i in matched.tolist()]
+
+
+def prescreen_text(article: dict) -> str:
+    """Title and first abstract of a Rayyan article, as pre-screened."""
+    abstracts = article.get("abstracts") or [{}]
+    return f"{article.get('title') or ''}\n{abstracts[0].get('content') or ''}"
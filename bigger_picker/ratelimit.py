@@ -0,0 +1,132 @@
+import re
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Mapping
+
+
+class RateLimiter:
+    """Thread-safe sliding-window budget of requests and tokens per minute."""
+
+    WINDOW = 60.0
+
+    def __init__(
+        self,
+        requests_per_minute: int | None = None,
+        tokens_per_minute: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._request_cap = requests_per_minute
+        self._token_cap = tokens_per_minute
+        self._paused_until = 0.0
+        self._last_tokens = 0
+        self._clock = clock
+        self._sleep = sleep
+        self._calls: deque[tuple[float, int]] = deque()
+        self._tokens = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 0) -> float:
+        """Waits for room for one call of `tokens` and returns the wait."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._expire(now)
+                delay = self._delay(now, tokens)
+                if delay <= 0:
+                    self._calls.append((now, tokens))
+                    self._tokens += tokens
+                    self._last_tokens = tokens
+                    return waited
+            self._sleep(delay)
+            waited += delay
+
+    def observe(self, headers: Mapping[str, str]) -> None:
+        """Updates the budgets from a response's x-ratelimit-* headers."""
+        limits = {
+            kind: _header_int(headers, f"x-ratelimit-limit-{kind}")
+            for kind in ("requests", "tokens")
+        }
+        remaining = {
+            kind: _header_int(headers, f"x-ratelimit-remaining-{kind}")
+            for kind in ("requests", "tokens")
+        }
+        with self._lock:
+            # A limit of 0 means nothing is allowed until the reset, which the
+            # pause below covers; adopting it as a budget would stall forever
+            if limits["requests"]:
+                self.requests_per_minute = _lowest(
+                    self._request_cap, limits["requests"]
+                )
+            if limits["tokens"]:
+                self.tokens_per_minute = _lowest(self._token_cap, limits["tokens"])
+
+            exhausted = {
+                "requests": limits["requests"] == 0
+                or (remaining["requests"] is not None and remaining["requests"] <= 0),
+                "tokens": limits["tokens"] == 0
+                or (
+                    remaining["tokens"] is not None
+                    and remaining["tokens"] < max(1, self._last_tokens)
+                ),
+            }
+            for kind, used_up in exhausted.items():
+                reset = parse_reset(headers.get(f"x-ratelimit-reset-{kind}"))
+                if used_up and reset:
+                    self._paused_until = max(self._paused_until, self._clock() + reset)
+
+    def _expire(self, now: float) -> None:
+        while self._calls and self._calls[0][0] <= now - self.WINDOW:
+            _, tokens = self._calls.popleft()
+            self._tokens -= tokens
+
+    def _delay(self, now: float, tokens: int) -> float:
+        """Seconds until the oldest calls expire enough to fit this one."""
+        if self._paused_until > now:
+            return self._paused_until - now
+        if not self._calls:
+            return 0.0
+        if (
+            self.requests_per_minute is not None
+            and len(self._calls) >= self.requests_per_minute
+        ):
+            excess = len(self._calls) - self.requests_per_minute
+            return self._calls[excess][0] + self.WINDOW - now
+        if (
+            self.tokens_per_minute is not None
+            and self._tokens + tokens > self.tokens_per_minute
+        ):
+            freed = self._tokens + tokens - self.tokens_per_minute
+            for started, call_tokens in self._calls:
+                freed -= call_tokens
+                if freed <= 0:
+                    return started + self.WINDOW - now
+            # Larger than the whole budget: wait for an empty window
+            return self._calls[-1][0] + self.WINDOW - now
+        return 0.0
+
+
+def parse_reset(value: str | None) -> float | None:
+    """Seconds in an OpenAI reset header such as "1s", "6m0s" or "20ms"."""
+    if not value:
+        return None
+    units = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value)
+    if not parts:
+        return None
+    return sum(float(number) * units[unit] for number, unit in parts)
+
+
+def _header_int(headers: Mapping[str, str], name: str) -> int | None:
+    try:
+        return int(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _lowest(cap: int | None, reported: int) -> int:
+    return reported if cap is None else min(cap, reported)
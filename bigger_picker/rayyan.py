@@ -1,6 +1,12 @@
 import json
 import os
+import random
 import tempfile
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from functools import partial
 from itertools import batched
 
@@ -10,8 +16,13 @@ from rayyan.notes import Notes
 from rayyan.review import Review
 
 import bigger_picker.config as config
+import bigger_picker.sessions as sessions
+import bigger_picker.utils as utils
 from bigger_picker.credentials import load_rayyan_credentials
 
+# Server-side and rate-limit errors that are worth retrying after a pause
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
 
 class RayyanManager:
     def __init__(
@@ -20,17 +31,35 @@ class RayyanManager:
         review_id: int = config.RAYYAN_REVIEW_ID,
         unextracted_label: str = config.RAYYAN_LABELS["unextracted"],
         extracted_label: str = config.RAYYAN_LABELS["extracted"],
+        doi_index_path: str = "rayyan_doi_index.json",
+        transport: requests.adapters.BaseAdapter | None = None,
     ):
         if rayyan_creds_path is None:
             rayyan_creds_path = load_rayyan_credentials()
 
         self._rayyan_creds_path = rayyan_creds_path
-        self.rayyan_instance = Rayyan(rayyan_creds_path)
+        # One pooled session serves the SDK, token refreshes and PDF downloads,
+        # and survives token refreshes. Retries are left to
+        # _retry_on_auth_error so they are not compounded.
+        self.session = sessions.create_session(max_retries=0)
+        if transport is not None:
+            # e.g. a FakeRayyan transport for offline benchmarks
+            sessions.mount_transport(self.session, transport)
+        self.rayyan_instance = self._create_rayyan(rayyan_creds_path)
         self.review = Review(self.rayyan_instance)
         self.review_id = review_id
         self.notes_instance = Notes(self.rayyan_instance)
         self.unextracted_label = unextracted_label
         self.extracted_label = extracted_label
+        self.doi_index_path = doi_index_path
+        self._doi_index: dict | None = None
+
+        # Shared by every thread using this manager so only one refresh runs
+        # at a time, and callers that saw a 401 from a token that has already
+        # been replaced do not refresh again.
+        self._token_lock = threading.Lock()
+        self._token_generation = 0
+        self._token_expires_at = self._read_token_expiry(rayyan_creds_path)
 
     def get_unextracted_articles(self) -> list[dict]:
         results_params = {"extra[user_labels][]": self.unextracted_label}
@@ -170,11 +199,72 @@ class RayyanManager:
             lambda: self.review.customize(self.review_id, article_id, plan)
         )
 
+    def bulk_update_article_labels(
+        self,
+        updates: Iterable[tuple[int, dict]],
+        max_workers: int = config.SERVICE_CONCURRENCY["rayyan"],
+        chunk_size: int = 500,
+    ) -> dict[int, Exception]:
+        """Applies many label plans, adding labels in bulk; returns the failures."""
+        merged: dict[int, dict] = {}
+        for article_id, plan in updates:
+            merged.setdefault(article_id, {}).update(plan)
+
+        additions: dict[tuple[str, int], list[int]] = {}
+        removals: dict[int, dict] = {}
+        for article_id, plan in merged.items():
+            for label, value in plan.items():
+                if value == -1:
+                    removals.setdefault(article_id, {})[label] = value
+                else:
+                    additions.setdefault((label, value), []).append(article_id)
+
+        # Operations look up self.review when they run, so a token refresh
+        # during a retry is picked up.
+        calls = []
+        for (label, value), article_ids in additions.items():
+            for chunk in batched(article_ids, chunk_size):
+                calls.append(
+                    (
+                        chunk,
+                        lambda ids=chunk, label=label, value=value: (
+                            self.review.bulk_customizations(
+                                self.review_id, label, value, list(ids)
+                            )
+                        ),
+                    )
+                )
+        for article_id, plan in removals.items():
+            calls.append(
+                (
+                    (article_id,),
+                    lambda article_id=article_id, plan=plan: self.review.customize(
+                        self.review_id, article_id, plan
+                    ),
+                )
+            )
+
+        def run(call):
+            article_ids, operation = call
+            try:
+                self._retry_on_auth_error(operation)
+            except Exception as e:
+                return dict.fromkeys(article_ids, e)
+            return {}
+
+        failures = {}
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            for failed in pool.map(run, calls):
+                failures.update(failed)
+        return failures
+
     def create_article_note(self, article_id: int, note_content: str) -> None:
+        # Not idempotent: a timeout may come after the note was saved
         self._retry_on_auth_error(
             lambda: self.notes_instance.create_note(
                 self.review_id, article_id, note_content
-            )
+            ),
+            idempotent=False,
         )
 
     def download_pdf(self, article: dict) -> str:
@@ -197,7 +287,7 @@ class RayyanManager:
         filename = f"{article['id']}.pdf"
 
         file_path = os.path.join(temp_dir, filename)
-        response = requests.get(str(fulltext_url))
+        response = self.session.get(str(fulltext_url))
         response.raise_for_status()
 
         with open(file_path, "wb") as f:
@@ -205,18 +295,163 @@ class RayyanManager:
 
         return file_path
 
-    def _retry_on_auth_error(self, operation, max_retries=3):
-        for attempt in range(max_retries):
+    def refresh_doi_index(
+        self, batch_size: int = 1000, full: bool = False
+    ) -> dict[str, list[int]]:
+        """Adds the records imported since the last refresh to the local DOI index."""
+        index = self._load_doi_index()
+        if full or index.get("review_id") != self.review_id:
+            index = {}
+
+        start = index.get("records_indexed", 0)
+        results_params = {"start": max(start - 1, 0), "length": 1}
+        results = self._retry_on_auth_error(
+            lambda: self.review.results(self.review_id, results_params)  # type: ignore
+        )
+        total_articles = results["recordsTotal"]  # type: ignore
+
+        if start:
+            # The last indexed record has moved, so the offsets no longer line up
+            watermark = [article["id"] for article in results["data"]]  # type: ignore
+            if watermark != [index.get("last_record_id")]:
+                index = {}
+                start = 0
+
+        dois = index.get("dois", {})
+
+        for batch in batched(range(start, total_articles), batch_size):
+            results_params = {"start": batch[0], "length": len(batch)}
+            results = self._retry_on_auth_error(
+                partial(self.review.results, self.review_id, results_params)  # type: ignore
+            )
+
+            for article in results["data"]:  # type: ignore
+                doi = utils.normalize_doi(article.get("doi"))  # type: ignore
+                if doi is None:
+                    continue
+                article_ids = dois.setdefault(doi, [])
+                if article["id"] not in article_ids:  # type: ignore
+                    article_ids.append(article["id"])  # type: ignore
+
+            # Save after every page so an interrupted refresh picks up here
+            self._save_doi_index(
+                {
+                    "review_id": self.review_id,
+                    "records_indexed": batch[-1] + 1,
+                    "last_record_id": results["data"][-1]["id"],  # type: ignore
+                    "updated_at": datetime.now().isoformat(),
+                    "dois": dois,
+                }
+            )
+
+        return dois
+
+    def find_articles_by_doi(self, dois: Iterable[str]) -> dict[str, list[int]]:
+        """Matches DOIs against the local index without calling Rayyan."""
+        index = self._load_doi_index().get("dois", {})
+        matches = {}
+        for doi in dois:
+            normalized = utils.normalize_doi(doi)
+            if normalized in index:
+                matches[normalized] = index[normalized]
+        return matches
+
+    def _load_doi_index(self) -> dict:
+        if self._doi_index is None:
+            if os.path.exists(self.doi_index_path):
+                with open(self.doi_index_path) as f:
+                    self._doi_index = json.load(f)
+            else:
+                self._doi_index = {}
+        return self._doi_index
+
+    def _save_doi_index(self, index: dict) -> None:
+        tmp_path = f"{self.doi_index_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.doi_index_path)
+        self._doi_index = index
+
+    def _create_rayyan(self, creds_path: str) -> Rayyan:
+        rayyan_instance = Rayyan(creds_path)
+        rayyan_instance.request.session = self.session
+
+        # The SDK refreshes the token itself on a 401; track that token too
+        sdk_refresh = rayyan_instance.request._refresh_credentials
+
+        def refresh_credentials():
+            sdk_refresh()
+            with self._token_lock:
+                self._token_expires_at = self._read_token_expiry(creds_path)
+                self._token_generation += 1
+
+        rayyan_instance.request._refresh_credentials = refresh_credentials
+        return rayyan_instance
+
+    def _retry_on_auth_error(self, operation, max_retries=3, idempotent=True):
+        """Runs a Rayyan call, refreshing the token and retrying idempotent calls."""
+        attempt = 1
+        while True:
+            self._ensure_fresh_token()
+            generation = self._token_generation
             try:
                 return operation()
             except requests.HTTPError as e:
-                if e.response.status_code == 401:
-                    # If we get a 401 error, refresh the tokens and retry
-                    self._refresh_tokens()
+                status_code = getattr(e.response, "status_code", None)
+                if attempt >= max_retries:
+                    raise
+                if status_code == 401:
+                    self._refresh_tokens_after_auth_error(generation)
+                elif idempotent and status_code in RETRYABLE_STATUS_CODES:
+                    self._backoff(attempt)
+                else:
+                    raise
+            except (requests.Timeout, requests.ConnectionError):
+                if not idempotent or attempt >= max_retries:
+                    raise
+                self._backoff(attempt)
+            attempt += 1
+
+    def _ensure_fresh_token(self) -> None:
+        if not self._token_expiring():
+            return
+        with self._token_lock:
+            # Another thread may have refreshed while we waited for the lock
+            if self._token_expiring():
+                self._refresh_tokens()
+
+    def _refresh_tokens_after_auth_error(self, generation: int) -> None:
+        with self._token_lock:
+            if self._token_generation == generation:
+                self._refresh_tokens()
+
+    def _token_expiring(self) -> bool:
+        if self._token_expires_at is None:
+            return False
+        margin = config.RAYYAN_TOKEN_REFRESH_MARGIN
+        return time.time() >= self._token_expires_at - margin
+
+    @staticmethod
+    def _backoff(attempt: int) -> None:
+        delay = min(
+            config.RAYYAN_RETRY_MAX_BACKOFF,
+            config.RAYYAN_RETRY_BACKOFF * 2 ** (attempt - 1),
+        )
+        time.sleep(random.uniform(0, delay))
 
-                # If this was the last attempt, raise the error
-                if attempt == max_retries - 1:
-                    raise e
+    @staticmethod
+    def _read_token_expiry(creds_path: str) -> float | None:
+        """Expiry time of the stored access token, or None if unknown."""
+        try:
+            with open(creds_path) as f:
+                api_tokens = json.load(f)
+            issued_at = api_tokens.get("created_at") or os.path.getmtime(creds_path)
+        except (OSError, ValueError):
+            return None
+        expires_in = api_tokens.get("expires_in")
+        if expires_in is None:
+            return None
+        return float(issued_at) + float(expires_in)
 
     def _refresh_tokens(self, update_local: bool = True):
         with open(self._rayyan_creds_path) as f:
@@ -229,25 +464,28 @@ class RayyanManager:
             "client_id": "rayyan.ai",
         }
 
-        response = requests.post(url, data=payload)
+        response = self.session.post(url, data=payload)
         if not response.ok:
             raise Exception(f"Token refresh failed: {response.text}")
 
         api_tokens_fresh = response.json()
 
         if update_local:
-            with open(self._rayyan_creds_path, "w") as f:
-                json.dump(api_tokens_fresh, f, indent=2)
-            self.rayyan_instance = Rayyan(self._rayyan_creds_path)
+            creds_path = self._rayyan_creds_path
         else:
-            temp_creds_path = tempfile.NamedTemporaryFile(
+            creds_path = tempfile.NamedTemporaryFile(
                 mode="w+", delete=False, suffix=".json"
-            )
-            with open(temp_creds_path.name, "w") as f:
-                json.dump(api_tokens_fresh, f, indent=2)
-            self.rayyan_instance = Rayyan(temp_creds_path.name)
+            ).name
+        with open(creds_path, "w") as f:
+            json.dump(api_tokens_fresh, f, indent=2)
+        self.rayyan_instance = self._create_rayyan(creds_path)
 
         self.review = Review(self.rayyan_instance)
+        self.notes_instance = Notes(self.rayyan_instance)
+
+        # Only publish the new token once the clients using it are in place
+        self._token_expires_at = self._read_token_expiry(creds_path)
+        self._token_generation += 1
 
     @staticmethod
     def extract_article_metadata(rayyan_article: dict) -> dict:
@@ -0,0 +1,93 @@
+import threading
+
+from bigger_picker.jsonl import append_jsonl, read_jsonl
+
+
+class ScreeningCache:
+    """Screening decisions keyed by abstract content and prompt version."""
+
+    def __init__(self, filepath="screening_cache.jsonl"):
+        self.filepath = filepath
+        self._decisions: dict[str, dict] | None = None
+        self._pending: dict[int, str] = {}
+        # Number of pending articles per key
+        self._pending_keys: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> dict | None:
+        """The cached decision for a key, or None."""
+        with self._lock:
+            return self._load().get(key)
+
+    def put(self, key: str, decision: dict) -> None:
+        with self._lock:
+            self._load()
+            self._append([{"key": key, "decision": decision}])
+
+    def expect(self, pending: dict[int, str]) -> None:
+        """Remember the keys of articles just sent for screening."""
+        with self._lock:
+            self._load()
+            self._append(
+                [
+                    {"key": key, "article_id": article_id}
+                    for article_id, key in pending.items()
+                ]
+            )
+
+    def is_pending(self, key: str) -> bool:
+        """Whether an abstract with this key is waiting on a batch."""
+        with self._lock:
+            self._load()
+            return key in self._pending_keys
+
+    def resolve(self, article_id: int, decision: dict | None) -> None:
+        """Stores a batch result under its article's key; None only releases it."""
+        with self._lock:
+            self._load()
+            key = self._pending.get(article_id)
+            if key is not None:
+                self._append(
+                    [{"key": key, "article_id": article_id, "decision": decision}]
+                )
+
+    def release(self, article_id: int) -> None:
+        """Forgets an article whose batch request produced no decision."""
+        self.resolve(article_id, None)
+
+    def _load(self) -> dict[str, dict]:
+        if self._decisions is not None:
+            return self._decisions
+
+        self._decisions = {}
+        for entry in read_jsonl(self.filepath):
+            self._apply(entry)
+        return self._decisions
+
+    def _append(self, entries: list[dict]) -> None:
+        if not entries:
+            return
+        append_jsonl(self.filepath, entries)
+        for entry in entries:
+            self._apply(entry)
+
+    def _apply(self, entry: dict) -> None:
+        assert self._decisions is not None
+        if "decision" not in entry:
+            self._set_pending(entry["article_id"], entry["key"])
+            return
+        decision = entry["decision"]
+        if decision is not None and decision.get("vote") in ("include", "exclude"):
+            self._decisions[entry["key"]] = decision
+        if "article_id" in entry:
+            self._set_pending(entry["article_id"], None)
+
+    def _set_pending(self, article_id: int, key: str | None) -> None:
+        previous = self._pending.pop(article_id, None)
+        if previous is not None:
+            self._pending_keys[previous] -= 1
+            if not self._pending_keys[previous]:
+                del self._pending_keys[previous]
+        if key is not None:
+            self._pending[article_id] = key
+            self._pending_keys[key] = self._pending_keys.get(key, 0) + 1
@@ -0,0 +1,134 @@
+from collections.abc import Callable
+
+import httpx
+import openai
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import bigger_picker.config as config
+
+# Responses that mean the request was not processed, so retrying is safe even
+# for POST and PATCH.
+RETRYABLE_STATUS_CODES = (429, 503)
+
+
+def retry_strategy(max_retries: int = config.HTTP_MAX_RETRIES) -> Retry:
+    """Retries failed connections, 429s and 503s with backoff, but never read errors."""
+    return Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=0,
+        status=max_retries,
+        status_forcelist=RETRYABLE_STATUS_CODES,
+        allowed_methods=None,
+        backoff_factor=config.HTTP_RETRY_BACKOFF,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default timeout to requests without one."""
+
+    def __init__(self, *args, timeout: tuple[float, float], **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def configure_session(
+    session: requests.Session,
+    pool_size: int = config.HTTP_POOL_SIZE,
+    max_retries: int = config.HTTP_MAX_RETRIES,
+    timeout: tuple[float, float] = (
+        config.HTTP_CONNECT_TIMEOUT,
+        config.HTTP_READ_TIMEOUT,
+    ),
+) -> requests.Session:
+    """Mounts a pooled, retrying adapter with default timeouts on a session."""
+    adapter = TimeoutHTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=retry_strategy(max_retries),
+        timeout=timeout,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def mount_transport(
+    session: requests.Session, transport: requests.adapters.BaseAdapter
+) -> requests.Session:
+    """Sends every request on the session through `transport` instead."""
+    session.mount("https://", transport)
+    session.mount("http://", transport)
+    return session
+
+
+def create_session(
+    pool_size: int = config.HTTP_POOL_SIZE,
+    max_retries: int = config.HTTP_MAX_RETRIES,
+) -> requests.Session:
+    return configure_session(
+        requests.Session(), pool_size=pool_size, max_retries=max_retries
+    )
+
+
+def create_openai_http_client(
+    pool_size: int = config.HTTP_POOL_SIZE,
+    on_response: Callable[[httpx.Response], None] | None = None,
+) -> httpx.Client:
+    """httpx client for the OpenAI SDK; `on_response` sees every response."""
+    return openai.DefaultHttpxClient(
+        event_hooks={"response": [on_response]} if on_response else None,
+        limits=httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=openai.Timeout(
+            config.HTTP_READ_TIMEOUT, connect=config.HTTP_CONNECT_TIMEOUT
+        ),
+    )
+
+
+def configure_asana(
+    configuration,
+    pool_size: int = config.HTTP_POOL_SIZE,
+    max_retries: int = config.HTTP_MAX_RETRIES,
+):
+    """Applies the shared pool size and retry strategy to an asana.Configuration."""
+    configuration.connection_pool_maxsize = pool_size
+    configuration.retry_strategy = retry_strategy(max_retries)
+    return configuration
+
+
+class TimeoutPoolManager(urllib3.PoolManager):
+    """PoolManager that applies the pools' default timeout to calls without one."""
+
+    def urlopen(self, method, url, redirect=True, **kw):
+        # The Asana client passes timeout=None, which urllib3 reads as no timeout
+        if kw.get("timeout") is None:
+            kw.pop("timeout", None)
+        return super().urlopen(method, url, redirect=redirect, **kw)
+
+
+def configure_asana_client(
+    client,
+    timeout: tuple[float, float] = (
+        config.HTTP_CONNECT_TIMEOUT,
+        config.HTTP_READ_TIMEOUT,
+    ),
+):
+    """Gives an asana.ApiClient the shared default timeouts."""
+    pool_kw = dict(client.rest_client.pool_manager.connection_pool_kw)
+    pool_kw["timeout"] = urllib3.Timeout(connect=timeout[0], read=timeout[1])
+    client.rest_client.pool_manager = TimeoutPoolManager(**pool_kw)
+    return client
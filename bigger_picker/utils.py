@@ -1,8 +1,12 @@
+import hashlib
 import logging
 import math
+import re
 import unicodedata
 from collections import defaultdict
+from collections.abc import Iterable
 from datetime import datetime
+from itertools import combinations
 from logging.handlers import RotatingFileHandler
 
 import pandas as pd
@@ -10,6 +14,19 @@ import recordlinkage
 from pyairtable.api.types import RecordDict
 from rich.table import Table
 
+from bigger_picker.minhash import MinHashIndex
+
+_DUPLICATE_FIELDS = (
+    "Dataset Name",
+    "Dataset Contact Name",
+    "Dataset Contact Email",
+)
+# Bounds the number of blocking keys a long dataset name produces
+_MAX_BLOCKING_TOKENS = 8
+# Candidate pair strategies for duplicate detection. "auto" compares every
+# pair below 1000 datasets and uses sortedneighbourhood above that.
+DUPLICATE_INDEXING = ("auto", "full", "sortedneighbourhood", "minhash")
+
 
 def setup_logger(
     name: str = "bigger_picker", log_file: str = "bigger_picker.log"
@@ -50,6 +67,70 @@ def sanitize_text(text: str | None) -> str:
     return " ".join(text.split())
 
 
+def normalize_doi(doi: str | None) -> str | None:
+    if not doi or not isinstance(doi, str):
+        return None
+    doi = doi.strip().lower()
+    for prefix in (
+        "https://doi.org/",
+        "http://doi.org/",
+        "https://dx.doi.org/",
+        "doi:",
+    ):
+        doi = doi.removeprefix(prefix)
+    doi = doi.strip()
+    return doi or None
+
+
+def article_match_keys(
+    doi: str | None, title: str | None, year: int | str | None
+) -> list[str]:
+    """Normalized DOI and title-and-year keys of a paper."""
+    keys = []
+    normalized_doi = normalize_doi(doi)
+    if normalized_doi:
+        keys.append(f"doi:{normalized_doi}")
+    if title and isinstance(title, str) and year:
+        title = unicodedata.normalize("NFKD", title).encode("ascii", "ignore")
+        words = re.findall(r"[a-z0-9]+", title.decode().lower())
+        if words:
+            keys.append(f"title:{' '.join(words)}|{year}")
+    return keys
+
+
+def index_articles(records: Iterable[RecordDict]) -> dict[str, str]:
+    """Maps the match keys of Airtable Articles records to their record IDs."""
+    index = {}
+    for record in records:
+        fields = record["fields"]
+        for key in article_match_keys(
+            fields.get("DOI"), fields.get("Article Title"), fields.get("Year")
+        ):
+            index.setdefault(key, record["id"])
+    return index
+
+
+def abstract_key(abstract: str, prompt_version: str) -> str:
+    """Screening cache key: the prompt version and a hash of the normalized text."""
+    text = unicodedata.normalize("NFKD", abstract).encode("ascii", "ignore")
+    words = re.findall(r"[a-z0-9]+", text.decode().lower())
+    digest = hashlib.sha256(" ".join(words).encode()).hexdigest()
+    return f"{prompt_version}:{digest}"
+
+
+def read_ris_dois(path: str) -> set[str]:
+    """Collects the normalized DOIs (the `DO` tag) from a RIS export."""
+    dois = set()
+    with open(path, encoding="utf-8-sig") as f:
+        for line in f:
+            if not line.startswith("DO  -"):
+                continue
+            doi = normalize_doi(line[len("DO  -") :])
+            if doi:
+                dois.add(doi)
+    return dois
+
+
 def fix_age(dataset: RecordDict) -> RecordDict:
     fields = dataset["fields"]
 
@@ -247,12 +328,104 @@ def compute_dataset_value(
 
 
 def identify_duplicate_datasets(
-    datasets: list[RecordDict], threshold: float = 0.5
+    datasets: list[RecordDict], threshold: float = 0.5, indexing: str = "auto"
 ) -> dict[str, list[str]]:
+    """Groups datasets whose name, contact and email score at least `threshold`."""
+    df_clean = _prepare_datasets(datasets)
+    candidate_pairs = _candidate_pairs(df_clean, indexing)
+    return group_duplicates(
+        _match_candidate_pairs(df_clean, candidate_pairs, threshold, len(df_clean))
+    )
+
+
+def duplicate_candidate_pairs(
+    datasets: list[RecordDict], indexing: str = "auto"
+) -> list[tuple[str, str]]:
+    """Record id pairs that an indexing strategy would send to scoring."""
+    df_clean = _prepare_datasets(datasets)
+    pairs = _candidate_pairs(df_clean, indexing)
+    ids = df_clean["id"].to_numpy()
+    first = ids[df_clean.index.get_indexer(pairs.get_level_values(0))]
+    second = ids[df_clean.index.get_indexer(pairs.get_level_values(1))]
+    return list(zip(first.tolist(), second.tolist(), strict=True))
+
+
+def _candidate_pairs(df_clean: pd.DataFrame, indexing: str) -> pd.MultiIndex:
+    if indexing not in DUPLICATE_INDEXING:
+        raise ValueError(
+            f"Unknown indexing strategy {indexing!r}, "
+            f"expected one of {', '.join(DUPLICATE_INDEXING)}"
+        )
+
+    n_rows = len(df_clean)
+    if indexing == "auto":
+        # Choose indexing strategy based on size
+        indexing = "full" if n_rows < 1000 else "sortedneighbourhood"
+
+    indexer = recordlinkage.Index()
+
+    if indexing == "full":
+        # Small dataset: compare everything
+        indexer.full()
+        return indexer.index(df_clean)
+
+    if indexing == "minhash":
+        # Shingle similarity catches reordered and partly rewritten names
+        indexer.add(MinHashIndex("fields.Dataset Name"))
+    else:
+        # Medium dataset: multiple loose blocking
+        window_size = 9 if n_rows < 3000 else 5
+        indexer.sortedneighbourhood("fields.Dataset Name", window=window_size)
+
+    # Add email blocking
+    indexer_email = recordlinkage.Index()
+    indexer_email.block("fields.Dataset Contact Email")
+
+    # Combine pairs
+    pairs1 = indexer.index(df_clean)
+    pairs2 = indexer_email.index(df_clean)
+    if pairs1 is not None and pairs2 is not None:
+        return pairs1.union(pairs2)
+    elif pairs1 is not None:
+        return pairs1
+    elif pairs2 is not None:
+        return pairs2
+    return pd.MultiIndex.from_tuples([], names=["rec_id_1", "rec_id_2"])
+
+
+def match_dataset_pairs(
+    datasets: list[RecordDict],
+    pairs: Iterable[tuple[str, str]],
+    threshold: float = 0.5,
+    n_rows: int | None = None,
+) -> list[tuple[str, str]]:
+    """Scores pairs like `identify_duplicate_datasets` and returns the matches."""
+    pairs = list(pairs)
+    if not pairs:
+        return []
+
+    df_clean = _prepare_datasets(datasets)
+    positions = {record_id: i for i, record_id in enumerate(df_clean["id"])}
+    candidate_pairs = pd.MultiIndex.from_tuples(
+        [(positions[first], positions[second]) for first, second in pairs],
+        names=["rec_id_1", "rec_id_2"],
+    )
+    return _match_candidate_pairs(
+        df_clean,
+        candidate_pairs,
+        threshold,
+        len(df_clean) if n_rows is None else n_rows,
+    )
+
+
+def _prepare_datasets(datasets: list[RecordDict]) -> pd.DataFrame:
     logging.getLogger("recordlinkage").setLevel(logging.ERROR)
     df = pd.json_normalize(datasets)  # type: ignore
 
     df_clean = df.copy()
+    for column in _DUPLICATE_FIELDS:
+        if f"fields.{column}" not in df_clean:
+            df_clean[f"fields.{column}"] = None
     df_clean["fields.Dataset Name"] = (
         df_clean["fields.Dataset Name"].fillna("").str.strip()
     )
@@ -262,39 +435,15 @@ def identify_duplicate_datasets(
     df_clean["fields.Dataset Contact Email"] = (
         df_clean["fields.Dataset Contact Email"].str.strip().mask(lambda x: x == "")
     )
-    # Choose indexing strategy based on size
-    indexer = recordlinkage.Index()
-
-    n_rows = len(df_clean)
-
-    if n_rows < 1000:
-        # Small dataset: compare everything
-        indexer.full()
-        candidate_pairs = indexer.index(df_clean)
-
-    else:
-        # Medium dataset: multiple loose blocking
-        window_size = 9 if n_rows < 3000 else 5
-        indexer.sortedneighbourhood("fields.Dataset Name", window=window_size)
+    return df_clean
 
-        # Add email blocking
-        indexer_email = recordlinkage.Index()
-        indexer_email.block("fields.Dataset Contact Email")
-
-        # Combine pairs
-        pairs1 = indexer.index(df_clean)
-        pairs2 = indexer_email.index(df_clean)
-        if pairs1 is not None and pairs2 is not None:
-            candidate_pairs = pairs1.union(pairs2)
-        elif pairs1 is not None:
-            candidate_pairs = pairs1
-        elif pairs2 is not None:
-            candidate_pairs = pairs2
-        else:
-            candidate_pairs = pd.MultiIndex.from_tuples(
-                [], names=["rec_id_1", "rec_id_2"]
-            )
 
+def _match_candidate_pairs(
+    df_clean: pd.DataFrame,
+    candidate_pairs: pd.MultiIndex,
+    threshold: float,
+    n_rows: int,
+) -> list[tuple[str, str]]:
     compare = recordlinkage.Compare()
 
     # String comparisons - adjust thresholds based on dataset size
@@ -331,15 +480,84 @@ def identify_duplicate_datasets(
         + comparison_vectors["email_exact"] * 0.2  # Same weight
     )
 
-    results = defaultdict(list)
-    for idx1, idx2 in comparison_vectors.index:
-        score = scores.loc[(idx1, idx2)]
+    # Threshold and map row labels to record ids on whole arrays at once
+    matched = scores.to_numpy() >= threshold
+    ids = df_clean["id"].to_numpy()
+    pairs = comparison_vectors.index[matched]
+    first = ids[df_clean.index.get_indexer(pairs.get_level_values(0))]
+    second = ids[df_clean.index.get_indexer(pairs.get_level_values(1))]
 
-        if score >= threshold:
-            results[df_clean.loc[idx1, "id"]].append(df_clean.loc[idx2, "id"])
-            results[df_clean.loc[idx2, "id"]].append(df_clean.loc[idx1, "id"])
+    return list(zip(first.tolist(), second.tolist(), strict=True))
 
-    return results
+
+def duplicate_match_fields(dataset: RecordDict) -> list[str]:
+    """The stripped field values duplicate detection compares for a dataset."""
+    return [
+        str(dataset["fields"].get(field) or "").strip() for field in _DUPLICATE_FIELDS
+    ]
+
+
+def duplicate_blocking_keys(dataset: RecordDict) -> list[str]:
+    """Every normalized name token and pair of tokens, plus the contact email."""
+    name, _, email = duplicate_match_fields(dataset)
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    # The leading tokens of a long name are kept, in order
+    tokens = list(
+        dict.fromkeys(
+            token for token in re.findall(r"[a-z0-9]+", name.lower()) if len(token) >= 3
+        )
+    )[:_MAX_BLOCKING_TOKENS]
+    keys = [f"name:{token}" for token in tokens]
+    keys += ["name:{}+{}".format(*sorted(pair)) for pair in combinations(tokens, 2)]
+    if email:
+        keys.append(f"email:{email.lower()}")
+    return keys
+
+
+def group_duplicates(pairs: Iterable[tuple[str, str]]) -> dict[str, list[str]]:
+    """Merges matched pairs into groups, mapping each id to the rest of its group."""
+    return {
+        record_id: [other for other in members if other != record_id]
+        for members in connected_groups(pairs)
+        for record_id in members
+    }
+
+
+def connected_groups(pairs: Iterable[tuple[str, str]]) -> list[list[str]]:
+    """Record ids linked directly or transitively by `pairs`, via union-find."""
+    parent: dict[str, str] = {}
+
+    def find(record_id: str) -> str:
+        root = parent.setdefault(record_id, record_id)
+        while root != parent[root]:
+            # Path halving keeps the trees shallow
+            parent[root] = parent[parent[root]]
+            root = parent[root]
+        return root
+
+    for first, second in pairs:
+        root_first, root_second = find(first), find(second)
+        if root_first != root_second:
+            parent[root_second] = root_first
+
+    groups = defaultdict(list)
+    for record_id in parent:
+        groups[find(record_id)].append(record_id)
+    return list(groups.values())
+
+
+def extract_token_usage(batch_item: dict) -> tuple[int, int]:
+    """(input_tokens, cached_tokens) reported for one batch output line."""
+    body = (batch_item.get("response") or {}).get("body") or {}
+    usage = body.get("usage") or {}
+    details = usage.get("input_tokens_details") or {}
+    return usage.get("input_tokens", 0), details.get("cached_tokens", 0)
+
+
+def format_cache_ratio(input_tokens: int, cached_tokens: int) -> str:
+    if not input_tokens:
+        return "-"
+    return f"{cached_tokens / input_tokens:.0%} ({cached_tokens}/{input_tokens})"
 
 
 def create_stats_table(stats: dict) -> Table:
@@ -382,5 +600,25 @@ def create_stats_table(stats: dict) -> Table:
         stats["pending_batches"],
     )
     table.add_row("Pending Batches", pending_batches_table)
+    if "throughput" in stats:
+        throughput_table = make_subtable(
+            {
+                "abstract_screen": "Abstracts",
+                "fulltext_screen": "Fulltexts",
+                "extraction": "Extractions",
+            },
+            stats["throughput"],
+        )
+        table.add_row("Throughput", throughput_table)
+    if "prompt_cache" in stats:
+        prompt_cache_table = make_subtable(
+            {
+                "abstract_screen": "Abstracts",
+                "fulltext_screen": "Fulltexts",
+                "extraction": "Extractions",
+            },
+            stats["prompt_cache"],
+        )
+        table.add_row("Prompt Cache", prompt_cache_table)
 
     return table
@@ -3,6 +3,7 @@ from pyairtable.testing import MockAirtable
 
 import bigger_picker.config as config
 from bigger_picker.airtable import AirtableManager
+from bigger_picker.sessions import TimeoutHTTPAdapter
 
 
 @pytest.fixture(autouse=True)
@@ -57,3 +58,22 @@ def test_create_and_update_record(manager):
         )
         assert updated["fields"]["Dataset Name"] == "New Test Dataset"
         assert table.all()[0]["fields"]["Dataset Name"] == "New Test Dataset"
+
+
+def test_batch_create_records(manager):
+    table = manager.get_table("Articles")
+    with MockAirtable():
+        payloads = [{"Article Title": f"Article {i}"} for i in range(23)]
+        records = manager.batch_create_records("Articles", payloads)
+
+        assert len(records) == 23
+        assert len(table.all()) == 23
+
+
+def test_batch_create_records_empty(manager):
+    assert manager.batch_create_records("Articles", []) == []
+
+
+def test_api_session_uses_shared_adapter(manager):
+    adapter = manager.api.session.get_adapter("https://api.airtable.com")
+    assert isinstance(adapter, TimeoutHTTPAdapter)
@@ -117,3 +117,9 @@ def test_fetch_timeout_returns_none(manager, monkeypatch):
         "1", "nonexistent", max_attempts=2, delay=0
     )
     assert result is None
+
+
+def test_client_uses_shared_pool_settings(manager):
+    configuration = manager.client.configuration
+    assert configuration.connection_pool_maxsize == config.HTTP_POOL_SIZE
+    assert configuration.retry_strategy.total == config.HTTP_MAX_RETRIES
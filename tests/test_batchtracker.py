@@ -68,6 +68,14 @@ class TestAddBatch:
         parsed = datetime.fromisoformat(created_at)
         assert isinstance(parsed, datetime)
 
+    def test_add_batch_stores_prompt_version(self, tracker):
+        tracker.add_batch("batch_1", "abstract", prompt_version="abc123")
+        tracker.add_batch("batch_2", "abstract")
+
+        assert tracker.get_prompt_version("batch_1") == "abc123"
+        assert tracker.get_prompt_version("batch_2") is None
+        assert tracker.get_prompt_version("missing") is None
+
     def test_add_batch_overwrites_existing(self, tracker):
         tracker.add_batch("batch_dup", "abstract")
         tracker.add_batch("batch_dup", "fulltext")
@@ -107,6 +115,30 @@ class TestGetPendingBatches:
         pending = tracker.get_pending_batches()
         assert pending == {}
 
+    def test_excludes_failed_batches(self, tracker):
+        tracker.add_batch(
+            "batch_1",
+            "abstract",
+            requests=[{"custom_id": "abstract-1", "article_id": 1}],
+        )
+        tracker.mark_failed("batch_1")
+
+        assert tracker.get_pending_batches() == {}
+        assert tracker.get_pending_article_ids() == set()
+        assert tracker._load()["batch_1"]["status"] == "failed"
+
+
+class TestEnqueuedTokens:
+    def test_sums_unfinished_batches(self, tracker):
+        tracker.add_batch("batch_1", "abstract", estimated_tokens=1000)
+        tracker.add_batch("batch_2", "fulltext", estimated_tokens=500)
+        tracker.add_batch("batch_3", "fulltext", estimated_tokens=200)
+        tracker.add_batch("batch_4", "extraction")
+        tracker.mark_completed("batch_2")
+        tracker.mark_failed("batch_3")
+
+        assert tracker.get_enqueued_tokens() == 1000
+
 
 class TestMarkCompleted:
     def test_marks_batch_as_completed(self, tracker):
@@ -148,3 +180,176 @@ class TestLoadSave:
 
         loaded = tracker._load()
         assert loaded == test_data
+
+
+class TestRequestTracking:
+    def test_add_batch_records_request_rows(self, tracker):
+        requests = [
+            {"custom_id": "fulltext-1", "article_id": 1, "file_id": "file_1"},
+            {"custom_id": "fulltext-2", "article_id": 2, "file_id": "file_2"},
+        ]
+        tracker.add_batch("batch_1", "fulltext_screen", requests=requests)
+
+        rows = tracker._load()["batch_1"]["requests"]
+        assert rows["fulltext-1"] == {
+            "article_id": 1,
+            "stage": "fulltext_screen",
+            "file_id": "file_1",
+            "attempt": 1,
+            "status": "pending",
+        }
+        assert rows["fulltext-2"]["file_id"] == "file_2"
+
+    def test_add_batch_without_requests_has_no_rows(self, tracker):
+        tracker.add_batch("batch_1", "abstract_screen")
+
+        assert "requests" not in tracker._load()["batch_1"]
+
+    def test_attempts_increment_per_stage(self, tracker):
+        row = {"custom_id": "extraction-1", "article_id": 1}
+        tracker.add_batch("batch_1", "extraction", requests=[row])
+        tracker.add_batch("batch_2", "extraction", requests=[row])
+        tracker.add_batch("batch_3", "abstract_screen", requests=[row])
+
+        assert tracker.get_requests(batch_id="batch_2")[0]["attempt"] == 2
+        assert tracker.get_requests(batch_id="batch_3")[0]["attempt"] == 1
+
+    def test_get_requests_filters(self, tracker):
+        tracker.add_batch(
+            "batch_1",
+            "abstract_screen",
+            requests=[
+                {"custom_id": "abstract-1", "article_id": 1},
+                {"custom_id": "abstract-2", "article_id": 2},
+            ],
+        )
+        tracker.add_batch(
+            "batch_2",
+            "extraction",
+            requests=[{"custom_id": "extraction-1", "article_id": 1}],
+        )
+        tracker.save_progress("batch_1", 0, {"abstract-2": "failed"})
+
+        assert len(tracker.get_requests()) == 3
+        assert len(tracker.get_requests(article_id=1)) == 2
+        assert len(tracker.get_requests(stage="extraction")) == 1
+        failed = tracker.get_requests(status="failed")
+        assert failed == [
+            {
+                "batch_id": "batch_1",
+                "custom_id": "abstract-2",
+                "article_id": 2,
+                "stage": "abstract_screen",
+                "file_id": None,
+                "attempt": 1,
+                "status": "failed",
+            }
+        ]
+
+    def test_get_pending_article_ids(self, tracker):
+        tracker.add_batch(
+            "batch_1",
+            "extraction",
+            requests=[{"custom_id": "extraction-1", "article_id": 1}],
+        )
+        tracker.add_batch(
+            "batch_2",
+            "extraction",
+            requests=[{"custom_id": "extraction-2", "article_id": 2}],
+        )
+        tracker.add_batch(
+            "batch_3",
+            "abstract_screen",
+            requests=[{"custom_id": "abstract-3", "article_id": 3}],
+        )
+        tracker.mark_completed("batch_2")
+
+        assert tracker.get_pending_article_ids() == {1, 3}
+        assert tracker.get_pending_article_ids("extraction") == {1}
+
+
+class TestCheckpoint:
+    def test_defaults_to_zero(self, tracker):
+        tracker.add_batch("batch_1", "abstract_screen")
+
+        assert tracker.get_checkpoint("batch_1") == 0
+        assert tracker.get_checkpoint("missing") == 0
+
+    def test_save_progress_stores_checkpoint_and_statuses(self, tracker):
+        tracker.add_batch(
+            "batch_1",
+            "abstract_screen",
+            requests=[{"custom_id": "abstract-1", "article_id": 1}],
+        )
+
+        tracker.save_progress("batch_1", 42, {"abstract-1": "applied"})
+
+        assert tracker.get_checkpoint("batch_1") == 42
+        assert tracker.get_requests(batch_id="batch_1")[0]["status"] == "applied"
+
+    def test_save_progress_ignores_unknown_batch(self, tracker):
+        tracker.save_progress("missing", 10, {})
+
+        assert tracker._load() == {}
+
+    def test_save_leaves_no_temp_file(self, tracker, tmp_path):
+        tracker.add_batch("batch_1", "abstract_screen")
+
+        assert [p.name for p in tmp_path.iterdir()] == ["batches.json"]
+
+
+class TestResultLedger:
+    def test_ledger_path_defaults_next_to_tracker(self, tmp_path):
+        tracker = BatchTracker(filepath=str(tmp_path / "batches.json"))
+
+        assert tracker.ledger_path == str(tmp_path / "batches.ledger.jsonl")
+
+    def test_get_result_empty_when_not_recorded(self, tracker):
+        assert tracker.get_result("batch_1", "abstract-1") == {}
+
+    def test_record_results_writes_many_entries(self, tracker):
+        tracker.record_results(
+            "batch_1",
+            {"abstract-1": {"status": "applied"}, "abstract-2": {"status": "error"}},
+        )
+
+        with open(tracker.ledger_path) as f:
+            assert len(f.readlines()) == 2
+        assert tracker.get_result("batch_1", "abstract-2") == {"status": "error"}
+
+    def test_record_result_merges_steps(self, tracker):
+        tracker.record_result("batch_1", "extraction-1", dataset={"id": "rec_1"})
+        tracker.record_result("batch_1", "extraction-1", status="applied")
+
+        assert tracker.get_result("batch_1", "extraction-1") == {
+            "dataset": {"id": "rec_1"},
+            "status": "applied",
+        }
+        assert tracker.get_result("batch_2", "extraction-1") == {}
+
+    def test_ledger_persists_across_instances(self, tracker):
+        tracker.record_result("batch_1", "abstract-1", status="applied")
+
+        reopened = BatchTracker(filepath=tracker.filepath)
+
+        assert reopened.get_result("batch_1", "abstract-1") == {"status": "applied"}
+
+    def test_ignores_partial_trailing_line(self, tracker):
+        tracker.record_result("batch_1", "abstract-1", status="applied")
+        with open(tracker.ledger_path, "a") as f:
+            f.write('{"batch_id": "batch_1", "custom_id": "abs')
+
+        reopened = BatchTracker(filepath=tracker.filepath)
+
+        assert reopened.get_result("batch_1", "abstract-1") == {"status": "applied"}
+
+    def test_mark_completed_discards_batch_entries(self, tracker):
+        tracker.add_batch("batch_1", "abstract_screen")
+        tracker.record_result("batch_1", "abstract-1", status="applied")
+        tracker.record_result("batch_2", "abstract-2", status="applied")
+
+        tracker.mark_completed("batch_1")
+
+        reopened = BatchTracker(filepath=tracker.filepath)
+        assert reopened.get_result("batch_1", "abstract-1") == {}
+        assert reopened.get_result("batch_2", "abstract-2") == {"status": "applied"}
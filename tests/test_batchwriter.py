@@ -0,0 +1,78 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from bigger_picker.batchwriter import BatchWriter
+
+
+def read_rows(path):
+    return [json.loads(line) for line in Path(path).read_text().splitlines()]
+
+
+class TestBatchWriter:
+    def test_streams_rows_to_a_single_file(self, tmp_path):
+        writer = BatchWriter("abstract_screen", directory=str(tmp_path))
+        writer.add({"custom_id": "a-1"}, {"custom_id": "a-1", "article_id": 1})
+        writer.add({"custom_id": "a-2"})
+
+        files = writer.close()
+
+        assert len(files) == 1
+        assert writer.rows == 2
+        assert read_rows(files[0]["path"]) == [
+            {"custom_id": "a-1"},
+            {"custom_id": "a-2"},
+        ]
+        assert files[0]["bytes"] == Path(files[0]["path"]).stat().st_size
+        assert files[0]["tracked"] == [{"custom_id": "a-1", "article_id": 1}]
+
+    def test_rolls_over_on_row_count(self, tmp_path):
+        writer = BatchWriter("extraction", max_rows=2, directory=str(tmp_path))
+        for i in range(5):
+            writer.add({"custom_id": f"e-{i}"})
+
+        files = writer.close()
+
+        assert [f["rows"] for f in files] == [2, 2, 1]
+        assert len({f["path"] for f in files}) == 3
+
+    def test_rolls_over_before_byte_limit(self, tmp_path):
+        row = {"custom_id": "x", "body": "y" * 40}
+        line_size = len(json.dumps(row)) + 1
+        writer = BatchWriter(
+            "extraction", max_bytes=line_size * 2 + 1, directory=str(tmp_path)
+        )
+        for _ in range(3):
+            writer.add(row)
+
+        files = writer.close()
+
+        assert [f["rows"] for f in files] == [2, 1]
+        assert all(f["bytes"] <= writer.max_bytes for f in files)
+
+    def test_rejects_rows_over_the_byte_limit(self, tmp_path):
+        writer = BatchWriter("extraction", max_bytes=10, directory=str(tmp_path))
+
+        with pytest.raises(ValueError, match="byte batch file limit"):
+            writer.add({"custom_id": "too-big"})
+
+    def test_uses_custom_serializer(self, tmp_path):
+        writer = BatchWriter(
+            "abstract_screen",
+            serialize=lambda row: json.dumps({"wrapped": row}),
+            directory=str(tmp_path),
+        )
+        writer.add({"custom_id": "a-1"})
+
+        files = writer.close()
+
+        assert read_rows(files[0]["path"]) == [{"wrapped": {"custom_id": "a-1"}}]
+
+    def test_temp_dir_is_removed_on_exit(self):
+        with BatchWriter("abstract_screen") as writer:
+            writer.add({"custom_id": "a-1"})
+            directory = Path(writer.directory)
+            assert directory.exists()
+
+        assert not directory.exists()
@@ -0,0 +1,81 @@
+import pytest
+
+import bigger_picker.benchmarks as benchmarks
+
+
+def _result(seconds=1.0, peak_mb=10.0, calls=5, name="sync", scale=1000):
+    return {
+        "benchmark": name,
+        "scale": scale,
+        "seconds": seconds,
+        "peak_mb": peak_mb,
+        "api_calls": {"airtable": calls},
+    }
+
+
+class TestRunBenchmark:
+    @pytest.mark.parametrize("name", list(benchmarks.BENCHMARKS))
+    def test_reports_metrics(self, name):
+        result = benchmarks.run_benchmark(name, 30, repeat=1)
+
+        assert result["benchmark"] == name
+        assert result["scale"] == 30
+        assert result["seconds"] >= 0
+        assert result["peak_mb"] >= 0
+
+    def test_counts_api_calls(self):
+        result = benchmarks.run_benchmark("sync", 30, repeat=1, memory=False)
+
+        # One page of datasets and tasks in each of the two passes
+        assert result["api_calls"]["airtable"] >= 2
+        assert result["api_calls"]["asana"] >= 2
+        assert result["peak_mb"] is None
+
+
+class TestBaselines:
+    def test_save_and_load(self, tmp_path):
+        path = str(tmp_path / "baseline.json")
+
+        benchmarks.save_results(path, [_result()])
+
+        assert benchmarks.load_results(path) == [_result()]
+
+    def test_within_tolerance_is_not_a_regression(self):
+        [row] = benchmarks.compare_results([_result(seconds=1.1)], [_result()])
+
+        assert row["time_ratio"] == pytest.approx(1.1)
+        assert not row["regressed"]
+
+    @pytest.mark.parametrize(
+        "current",
+        [_result(seconds=1.5), _result(peak_mb=20.0), _result(calls=6)],
+    )
+    def test_flags_regressions(self, current):
+        [row] = benchmarks.compare_results([current], [_result()])
+
+        assert row["regressed"]
+
+    def test_missing_baseline_is_not_compared(self):
+        [row] = benchmarks.compare_results([_result(scale=10000)], [_result()])
+
+        assert row["baseline"] is None
+        assert not row["regressed"]
+
+
+class TestBlockers:
+    def test_labelled_duplicates_have_known_pairs(self):
+        records, truth = benchmarks.labelled_duplicates(200, seed=1)
+
+        ids = {record["id"] for record in records}
+        assert len(records) == 200
+        assert truth
+        assert all(pair <= ids and len(pair) == 2 for pair in truth)
+
+    def test_compare_blockers_reports_each_strategy(self):
+        rows = benchmarks.compare_blockers(200, seed=1)
+
+        assert [row["indexing"] for row in rows] == ["sortedneighbourhood", "minhash"]
+        for row in rows:
+            assert row["scale"] == 200
+            assert row["pairs"] > 0
+            assert 0 <= row["recall"] <= 1
@@ -0,0 +1,39 @@
+"""Tests for the local store of versioned decisions."""
+
+from bigger_picker.decisionstore import DecisionStore
+
+
+class TestDecisionStore:
+    def test_keeps_latest_decision_per_stage(self, tmp_path):
+        store = DecisionStore(str(tmp_path / "decisions.jsonl"))
+
+        store.record(1, "abstract_screen", "v1", {"vote": "exclude"})
+        store.record(1, "abstract_screen", "v2", {"vote": "include"})
+        store.record(1, "fulltext_screen", "v1", {"vote": "include"})
+
+        entry = store.get(1, "abstract_screen")
+        assert entry["version"] == "v2"
+        assert entry["decision"] == {"vote": "include"}
+        assert store.get(2, "abstract_screen") is None
+
+    def test_outdated_lists_articles_from_other_versions(self, tmp_path):
+        store = DecisionStore(str(tmp_path / "decisions.jsonl"))
+        store.record(1, "abstract_screen", "v1")
+        store.record(2, "abstract_screen", "v2")
+        store.record(3, "abstract_screen", "v1")
+        store.record(3, "abstract_screen", "v2")
+        store.record(4, "fulltext_screen", "v1")
+
+        assert store.outdated("abstract_screen", "v2") == [1]
+        assert store.outdated("fulltext_screen", "v2") == [4]
+
+    def test_reloads_from_disk(self, tmp_path):
+        path = tmp_path / "decisions.jsonl"
+        DecisionStore(str(path)).record(1, "abstract_screen", "v1")
+        with open(path, "a") as f:
+            f.write('{"article_id": 2, "sta')
+
+        store = DecisionStore(str(path))
+
+        assert store.get(1, "abstract_screen")["version"] == "v1"
+        assert store.outdated("abstract_screen", "v2") == [1]
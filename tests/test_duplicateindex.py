@@ -0,0 +1,155 @@
+"""Tests for DuplicateIndex class."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+from pyairtable.testing import fake_record
+
+import bigger_picker.utils as utils
+from bigger_picker.duplicateindex import DuplicateIndex
+
+
+def dataset(name, contact="Jane Roe", email="jane@example.org", record_id=None):
+    record = fake_record(
+        {
+            "Dataset Name": name,
+            "Dataset Contact Name": contact,
+            "Dataset Contact Email": email,
+        }
+    )
+    if record_id is not None:
+        record["id"] = record_id
+    return record
+
+
+@pytest.fixture
+def index(tmp_path):
+    return DuplicateIndex(filepath=str(tmp_path / "duplicate_index.json"))
+
+
+@pytest.fixture
+def datasets():
+    return [
+        dataset("Generation R Birth Cohort", record_id="rec_a"),
+        dataset("Generation R Birth Cohort Wave 2", record_id="rec_b"),
+        dataset(
+            "Oslo Sleep Trial",
+            contact="Omar Xu",
+            email="omar@example.org",
+            record_id="rec_c",
+        ),
+    ]
+
+
+class TestUpdate:
+    def test_first_run_groups_matching_datasets(self, index, datasets):
+        duplicates = index.update(datasets)
+
+        assert duplicates == {"rec_a": ["rec_b"], "rec_b": ["rec_a"]}
+
+    def test_persists_index(self, index, datasets):
+        index.update(datasets, threshold=0.6)
+
+        with open(index.filepath) as f:
+            data = json.load(f)
+        assert data["threshold"] == 0.6
+        assert set(data["datasets"]) == {"rec_a", "rec_b", "rec_c"}
+        assert data["datasets"]["rec_a"]["matches"] == ["rec_b"]
+
+    def test_unchanged_datasets_are_not_compared(self, index, datasets):
+        index.update(datasets)
+
+        with patch(
+            "bigger_picker.duplicateindex.utils.match_dataset_pairs",
+            return_value=[],
+        ) as mock_match:
+            duplicates = index.update(datasets)
+
+        mock_match.assert_called_once()
+        assert mock_match.call_args.args[1] == []
+        assert duplicates == {}
+
+    def test_new_dataset_compared_only_with_its_block(self, index, datasets):
+        index.update(datasets)
+        new = dataset("Birth Cohort Generation R", record_id="rec_d")
+
+        with patch(
+            "bigger_picker.duplicateindex.utils.match_dataset_pairs",
+            return_value=[("rec_a", "rec_d")],
+        ) as mock_match:
+            duplicates = index.update([*datasets, new])
+
+        assert mock_match.call_args.args[1] == [("rec_a", "rec_d"), ("rec_b", "rec_d")]
+        # Every member of the group it joined is affected
+        assert sorted(duplicates) == ["rec_a", "rec_b", "rec_d"]
+        assert sorted(duplicates["rec_d"]) == ["rec_a", "rec_b"]
+
+    def test_changed_dataset_is_rescored(self, index, datasets):
+        index.update(datasets)
+        datasets[1]["fields"]["Dataset Name"] = "Oslo Sleep Trial Follow Up"
+        datasets[1]["fields"]["Dataset Contact Name"] = "Omar Xu"
+        datasets[1]["fields"]["Dataset Contact Email"] = "omar@example.org"
+
+        duplicates = index.update(datasets)
+
+        assert duplicates == {
+            "rec_a": [],
+            "rec_b": ["rec_c"],
+            "rec_c": ["rec_b"],
+        }
+
+    def test_removed_dataset_leaves_its_group(self, index, datasets):
+        index.update(datasets)
+
+        duplicates = index.update([datasets[0], datasets[2]])
+
+        assert duplicates == {"rec_a": []}
+
+    def test_threshold_change_rebuilds(self, index, datasets):
+        index.update(datasets)
+
+        with patch(
+            "bigger_picker.duplicateindex.utils.match_dataset_pairs",
+            return_value=[],
+        ) as mock_match:
+            duplicates = index.update(datasets, threshold=0.9)
+
+        assert mock_match.call_args.args[1] == [("rec_a", "rec_b")]
+        assert duplicates == {"rec_a": [], "rec_b": []}
+
+    def test_single_token_name_matches_longer_name(self, index):
+        records = [
+            dataset("ABCD", email="jane@a.org", record_id="rec_a"),
+            dataset("ABCD Study", email="jroe@b.org", record_id="rec_b"),
+        ]
+
+        assert index.update(records) == utils.identify_duplicate_datasets(
+            records, threshold=0.51
+        )
+        assert index.update(records) == {}
+
+    def test_rebuilds_keys_from_an_older_index(self, index, datasets):
+        index.update(datasets)
+        with open(index.filepath) as f:
+            data = json.load(f)
+        data["keys_version"] = 1
+        with open(index.filepath, "w") as f:
+            json.dump(data, f)
+
+        with patch(
+            "bigger_picker.duplicateindex.utils.match_dataset_pairs",
+            return_value=[("rec_a", "rec_b")],
+        ) as mock_match:
+            index.update(datasets)
+
+        assert mock_match.call_args.args[1] == [("rec_a", "rec_b")]
+
+    def test_skips_oversized_name_blocks(self, tmp_path):
+        index = DuplicateIndex(str(tmp_path / "index.json"), max_block_size=1)
+        records = [
+            dataset("Birth Cohort", email=f"{i}@example.org", record_id=f"rec_{i}")
+            for i in range(3)
+        ]
+
+        assert index.update(records) == {}
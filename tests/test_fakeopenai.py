@@ -0,0 +1,113 @@
+import json
+import random
+import time
+
+import pytest
+
+from bigger_picker.batchwriter import BatchWriter
+from bigger_picker.datamodels import ArticleLLMExtract, ScreeningDecision
+from bigger_picker.fakeopenai import FakeOpenAIServer, _sample
+from bigger_picker.openai import OpenAIManager
+
+
+@pytest.fixture
+def server():
+    with FakeOpenAIServer(seed=0) as server:
+        yield server
+
+
+@pytest.fixture
+def manager(server):
+    return OpenAIManager(api_key="test", base_url=server.url)
+
+
+def _submit(manager, tmp_path, abstracts):
+    with BatchWriter(
+        "abstract", serialize=manager.serialize_batch_row, directory=tmp_path
+    ) as writer:
+        for i, abstract in enumerate(abstracts):
+            body = manager.prepare_abstract_body(abstract)
+            writer.add(manager.create_batch_row(f"abstract_{i}", body))
+        files = writer.close()
+        return manager.create_batch(files[0]["path"], "abstract")
+
+
+class TestDirectCalls:
+    def test_screen_abstract_returns_decision(self, manager, server):
+        decision = manager.screen_record_abstract("An abstract")
+
+        assert isinstance(decision, ScreeningDecision)
+        assert server.request_counts["responses.create"] == 1
+
+    def test_extract_article_info(self, manager, server, tmp_path):
+        pdf = tmp_path / "article.pdf"
+        pdf.write_bytes(b"%PDF-1.4 dummy")
+
+        result = manager.extract_article_info(str(pdf))
+
+        assert isinstance(result, ArticleLLMExtract)
+        assert server.request_counts["files.create"] == 1
+
+    def test_reports_cached_tokens(self, server):
+        server.cached_ratio = 0.5
+
+        status, body = server.respond({"input": "x" * 400})
+
+        assert status == 200
+        usage = body["usage"]
+        assert usage["input_tokens_details"]["cached_tokens"] == (
+            usage["input_tokens"] // 2
+        )
+
+
+class TestBatches:
+    def test_batch_lifecycle(self, manager, server, tmp_path):
+        batch = _submit(manager, tmp_path, ["first", "second"])
+
+        batch = manager.retrieve_batch(batch.id)
+        assert batch.status == "completed"
+        assert batch.request_counts.completed == 2
+
+        lines = [
+            json.loads(line) for line in manager.iter_file_lines(batch.output_file_id)
+        ]
+        assert [line["custom_id"] for line in lines] == ["abstract_0", "abstract_1"]
+        text = lines[0]["response"]["body"]["output"][0]["content"][0]["text"]
+        assert isinstance(manager.parse_screening_decision(text), ScreeningDecision)
+
+    def test_batch_waits_for_batch_seconds(self, manager, server, tmp_path):
+        server.batch_seconds = 0.2
+        batch = _submit(manager, tmp_path, ["first"])
+
+        assert manager.retrieve_batch(batch.id).status == "in_progress"
+        time.sleep(0.25)
+        assert manager.retrieve_batch(batch.id).status == "completed"
+
+    def test_error_rate_fails_rows(self, manager, server, tmp_path):
+        server.error_rate = 1.0
+        batch = _submit(manager, tmp_path, ["first", "second"])
+
+        batch = manager.retrieve_batch(batch.id)
+        lines = [
+            json.loads(line) for line in manager.iter_file_lines(batch.output_file_id)
+        ]
+
+        assert batch.request_counts.failed == 2
+        assert {line["response"]["status_code"] for line in lines} == {500}
+
+
+class TestSample:
+    def test_sample_follows_refs_and_enums(self):
+        schema = {
+            "type": "object",
+            "properties": {
+                "choice": {"$ref": "#/$defs/Choice"},
+                "maybe": {"anyOf": [{"type": "integer"}, {"type": "null"}]},
+            },
+        }
+        defs = {"Choice": {"enum": ["a", "b"]}}
+
+        value = _sample(schema, defs, random.Random(0))
+
+        assert value["choice"] in ("a", "b")
+        assert isinstance(value["maybe"], int)
@@ -0,0 +1,184 @@
+import os
+from unittest.mock import patch
+
+import pytest
+from rich.console import Console
+
+import bigger_picker.config as config
+from bigger_picker.airtable import AirtableManager
+from bigger_picker.asana import AsanaManager
+from bigger_picker.fakeservices import FakeAirtable, FakeAsana, FakeRayyan
+from bigger_picker.integration import IntegrationManager
+from bigger_picker.rayyan import RayyanManager
+
+BPIPD = config.ASANA_CUSTOM_FIELD_IDS["BPIPD"]
+
+
+@pytest.fixture
+def fake_rayyan():
+    return FakeRayyan(record_count=300, included_ratio=0.2, seed=0)
+
+
+@pytest.fixture
+def rayyan(fake_rayyan, tmp_path):
+    return RayyanManager(
+        fake_rayyan.write_credentials(str(tmp_path / "creds.json")),
+        doi_index_path=str(tmp_path / "doi_index.json"),
+        transport=fake_rayyan.requests_transport(),
+    )
+
+
+@pytest.fixture
+def fake_airtable():
+    return FakeAirtable(dataset_count=120, seed=0)
+
+
+@pytest.fixture
+def airtable(fake_airtable):
+    return AirtableManager("key", transport=fake_airtable.requests_transport())
+
+
+@pytest.fixture
+def fake_asana():
+    return FakeAsana(task_count=120, seed=0)
+
+
+@pytest.fixture
+def asana(fake_asana):
+    return AsanaManager("token", transport=fake_asana.urllib3_transport())
+
+
+class TestFakeRayyan:
+    def test_unscreened_abstracts_are_undecided_records(self, rayyan, fake_rayyan):
+        articles = rayyan.get_unscreened_abstracts(batch_size=100)
+
+        undecided = [a for a, d in fake_rayyan.decisions.items() if d == "undecided"]
+        assert {a["id"] for a in articles} == set(undecided)
+        # One count request, then one request per page
+        assert fake_rayyan.request_counts["results"] == 1 + -(-len(undecided) // 100)
+
+    def test_labels_are_stored(self, rayyan, fake_rayyan):
+        failures = rayyan.bulk_update_article_labels(
+            [(100000, {"BP: Included": 1}), (100001, {"BP: Included": 1})]
+        )
+        rayyan.update_article_labels(100000, {"BP: Included": -1})
+
+        assert failures == {}
+        assert fake_rayyan.request_counts["customize.bulk"] == 1
+        assert (
+            "BP: Included"
+            not in fake_rayyan.articles[100000]["customizations"]["labels"]
+        )
+        assert (
+            fake_rayyan.articles[100001]["customizations"]["labels"]["BP: Included"]
+            == 1
+        )
+
+    def test_download_pdf_and_note(self, rayyan, fake_rayyan):
+        article = rayyan.get_unscreened_fulltexts(max_articles=1)[0]
+
+        path = rayyan.download_pdf(article)
+        rayyan.create_article_note(article["id"], "Checked")
+
+        with open(path, "rb") as f:
+            assert f.read().startswith(b"%PDF")
+        assert fake_rayyan.notes[article["id"]] == ["Checked"]
+
+    def test_token_refresh(self, rayyan, fake_rayyan):
+        rayyan._refresh_tokens()
+
+        assert fake_rayyan.request_counts["token.refresh"] == 1
+        assert rayyan.get_article_by_id(100000)["id"] == 100000
+
+
+class TestFakeAirtable:
+    def test_all_pages_through_records(self, airtable, fake_airtable):
+        datasets = airtable.tables["Datasets"].all()
+
+        assert len(datasets) == 120
+        assert fake_airtable.request_counts["records.list"] == 2
+
+    def test_create_update_and_upload(self, airtable, fake_airtable, tmp_path):
+        created = airtable.batch_create_records(
+            "Articles", [{"Article Title": str(i)} for i in range(12)]
+        )
+        airtable.update_record("Articles", created[0]["id"], {"DOI": "10.1/x"})
+        pdf = tmp_path / "article.pdf"
+        pdf.write_bytes(b"%PDF-1.4")
+        airtable.upload_attachment("Articles", created[0]["id"], "PDF", str(pdf))
+
+        assert fake_airtable.request_counts["records.create"] == 2
+        record = fake_airtable.records("Articles")[0]
+        assert record["fields"]["DOI"] == "10.1/x"
+        assert record["fields"]["PDF"][0]["filename"] == "article.pdf"
+
+
+class TestFakeAsana:
+    def test_tasks_are_paged(self, asana, fake_asana):
+        tasks = list(asana.get_tasks(refresh=True))
+
+        assert len(tasks) == 120
+        assert fake_asana.request_counts["tasks.list"] == 2
+
+    def test_created_task_gets_bpipd(self, asana):
+        task = asana.create_task({"data": {"name": "New", "custom_fields": {}}})
+
+        fetched = asana.fetch_task_with_custom_field(task["gid"], BPIPD, delay=0)
+
+        assert asana.get_custom_field_value(fetched, BPIPD) == "BPIPD-121"
+
+    def test_events_follow_sync_token(self, asana, fake_asana):
+        assert asana.get_events() == []
+
+        task = asana.create_task({"data": {"name": "New"}})
+        fake_asana.add_event(task["gid"])
+
+        assert len(asana.get_events()) == 2
+        assert asana.get_events() == []
+
+
+class TestRateLimit:
+    def test_requests_over_limit_wait(self, fake_asana):
+        fake_asana.rate_limit = 3
+
+        with patch("bigger_picker.fakeservices.time.sleep") as mock_sleep:
+            for _ in range(4):
+                fake_asana._begin("tasks.get")
+
+        assert fake_asana.throttled == 1
+        assert mock_sleep.call_args.args[0] > 0
+
+    def test_latency_is_applied(self, fake_asana):
+        fake_asana.latency = 0.25
+
+        with patch("bigger_picker.fakeservices.time.sleep") as mock_sleep:
+            fake_asana._begin("tasks.get")
+
+        mock_sleep.assert_called_once_with(0.25)
+
+
+class TestEndToEnd:
+    def test_sync_links_datasets_and_tasks(
+        self, rayyan, airtable, asana, fake_airtable, fake_asana
+    ):
+        integration = IntegrationManager(
+            asana_manager=asana,
+            airtable_manager=airtable,
+            rayyan_manager=rayyan,
+            console=Console(file=open(os.devnull, "w")),
+        )
+
+        integration.sync()
+
+        statuses = {
+            r["fields"]["Dataset ID"]: r["fields"]["Status"]
+            for r in fake_airtable.records("Datasets")
+        }
+        for task in fake_asana.tasks.values():
+            status = asana.get_custom_field_value(
+                task, config.ASANA_CUSTOM_FIELD_IDS["Status"]
+            )
+            assert (
+                statuses[asana.get_custom_field_value(task, BPIPD)] == (status["name"])
+            )
+        assert "tasks.create" not in fake_asana.request_counts
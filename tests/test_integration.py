@@ -1,13 +1,22 @@
 """Tests for IntegrationManager class."""
 
-from unittest.mock import MagicMock, patch
+import json
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, call, patch
 
 import pytest
 from rich.console import Console
 
 import bigger_picker.config as config
+import bigger_picker.utils as utils
+from bigger_picker.batchwriter import BatchWriter
 from bigger_picker.datamodels import ArticleLLMExtract, ScreeningDecision
+from bigger_picker.decisionstore import DecisionStore
 from bigger_picker.integration import IntegrationManager, requires_services
+from bigger_picker.prescreen import AbstractPrescreen
+from bigger_picker.screeningcache import ScreeningCache
 
 
 class TestRequiresServicesDecorator:
@@ -108,18 +117,28 @@ def mock_rayyan():
     rayyan = MagicMock()
     rayyan.unextracted_label = "Unextracted"
     rayyan.extracted_label = "Extracted"
+    rayyan.bulk_update_article_labels.return_value = {}
     return rayyan
 
 
 @pytest.fixture
 def mock_openai():
     openai = MagicMock()
+    openai.serialize_batch_row.side_effect = lambda row: json.dumps(row, default=str)
+    openai.prompt_versions = {
+        "abstract_screen": "v1",
+        "fulltext_screen": "v1",
+        "extraction": "v1",
+    }
+    openai.estimate_body_tokens.return_value = 100
     return openai
 
 
 @pytest.fixture
 def mock_tracker():
     tracker = MagicMock()
+    tracker.get_checkpoint.return_value = 0
+    tracker.get_result.return_value = {}
     return tracker
 
 
@@ -333,6 +352,73 @@ class TestUploadExtractionToAirtable:
 
         mock_airtable.upload_attachment.assert_called_once()
 
+    @staticmethod
+    def _extraction_with_outcomes(n):
+        outcome = {
+            "Outcome Group": "Mental Health",
+            "Outcome": "anxiety",
+            "Outcome Measure": "GAD-7",
+        }
+        return ArticleLLMExtract.model_validate(
+            {
+                "Corresponding Author": None,
+                "Corresponding Author Email": None,
+                "Year of Last Data Point": None,
+                "Study Design": None,
+                "Countries of Data": None,
+                "Total Sample Size": None,
+                "Dataset Name": "Smith 2020",
+                "populations": [],
+                "screen_time_measures": [],
+                "outcomes": [outcome] * n,
+            }
+        )
+
+    def test_records_each_write_as_it_lands(self, integration_manager, mock_airtable):
+        mock_airtable.create_record.side_effect = [{"id": "rec_a"}, {"id": "rec_d"}]
+        steps = []
+
+        integration_manager.upload_extraction_to_airtable(
+            self._extraction_with_outcomes(12),
+            {"Rayyan ID": 1, "Authors": "Smith", "Year": 2020},
+            pdf_path="/pdf/1",
+            record=lambda **step: steps.append(step),
+        )
+
+        assert steps == [
+            {"article_record_id": "rec_a"},
+            {"attachment": True},
+            {"children": {"Outcomes": 10}},
+            {"children": {"Outcomes": 12}},
+        ]
+
+    def test_resumes_after_recorded_steps(self, integration_manager, mock_airtable):
+        mock_airtable.create_record.return_value = {"id": "rec_d"}
+
+        integration_manager.upload_extraction_to_airtable(
+            self._extraction_with_outcomes(12),
+            {"Rayyan ID": 1, "Authors": "Smith", "Year": 2020},
+            pdf_path="/pdf/1",
+            applied={
+                "article_record_id": "rec_a",
+                "attachment": True,
+                "children": {"Outcomes": 10},
+            },
+        )
+
+        # Only the Dataset is created; the Article and its first ten
+        # outcomes already exist
+        ((table_name, payload),) = [
+            c.args for c in mock_airtable.create_record.call_args_list
+        ]
+        assert table_name == "Datasets"
+        assert payload["Articles: IDs"] == ["rec_a"]
+        mock_airtable.upload_attachment.assert_not_called()
+        table_name, payloads = mock_airtable.batch_create_records.call_args.args
+        assert mock_airtable.batch_create_records.call_count == 1
+        assert len(payloads) == 2
+        assert payloads[0]["Rayyan ID"] == ["rec_a"]
+
 
 class TestMarkDuplicates:
     def test_marks_duplicates_in_airtable(self, integration_manager, mock_airtable):
@@ -374,6 +460,168 @@ class TestMarkDuplicates:
         mock_airtable.update_record.assert_not_called()
 
 
+class TestMarkNewDuplicates:
+    def test_writes_only_affected_datasets(self, integration_manager, mock_airtable):
+        datasets = [
+            {"id": "rec_1", "fields": {"Dataset Name": "Smith 2020"}},
+            {"id": "rec_2", "fields": {"Dataset Name": "Smith 2020"}},
+            {"id": "rec_3", "fields": {"Dataset Name": "Jones 2019"}},
+        ]
+        mock_airtable.tables["Datasets"].all.return_value = datasets
+        integration_manager.duplicate_index = MagicMock()
+        integration_manager.duplicate_index.update.return_value = {
+            "rec_2": ["rec_1"],
+            "rec_3": [],
+        }
+
+        integration_manager.mark_new_duplicates(threshold=0.6)
+
+        integration_manager.duplicate_index.update.assert_called_once_with(
+            datasets, threshold=0.6
+        )
+        mock_airtable.update_record.assert_called_once_with(
+            "Datasets", "rec_2", {"Possible Duplicates": ["rec_1"]}
+        )
+
+    def test_replaces_links_of_a_shrunk_group(self, integration_manager, mock_airtable):
+        datasets = [
+            {"id": "rec_1", "fields": {"Possible Duplicates": ["rec_2", "rec_3"]}},
+            {"id": "rec_2", "fields": {"Possible Duplicates": ["rec_1", "rec_3"]}},
+            {"id": "rec_3", "fields": {"Possible Duplicates": ["rec_1", "rec_2"]}},
+        ]
+        mock_airtable.tables["Datasets"].all.return_value = datasets
+        integration_manager.duplicate_index = MagicMock()
+        integration_manager.duplicate_index.update.return_value = {
+            "rec_1": ["rec_2"],
+            "rec_2": ["rec_1"],
+            "rec_3": [],
+        }
+
+        integration_manager.mark_new_duplicates()
+
+        assert mock_airtable.update_record.call_args_list == [
+            call("Datasets", "rec_1", {"Possible Duplicates": ["rec_2"]}),
+            call("Datasets", "rec_2", {"Possible Duplicates": ["rec_1"]}),
+            call("Datasets", "rec_3", {"Possible Duplicates": []}),
+        ]
+
+    def test_requires_duplicate_index(self, integration_manager):
+        with pytest.raises(RuntimeError, match="duplicate_index"):
+            integration_manager.mark_new_duplicates()
+
+
+class TestSkipExtractedArticles:
+    @pytest.fixture
+    def extracted(self, mock_airtable):
+        mock_airtable.tables["Articles"].all.return_value = [
+            {
+                "id": "recArticle1",
+                "fields": {
+                    "DOI": "10.1000/ABC",
+                    "Article Title": "Screen time and sleep",
+                    "Year": 2020,
+                },
+            }
+        ]
+        mock_airtable.make_url.return_value = "https://airtable.com/recArticle1"
+
+    def test_links_articles_matched_by_doi_or_title(
+        self, integration_manager, mock_rayyan, extracted
+    ):
+        articles = [
+            {"id": 1, "doi": "https://doi.org/10.1000/abc", "title": "Other"},
+            {"id": 2, "doi": "", "title": "Screen Time and Sleep.", "year": 2020},
+            {"id": 3, "doi": "10.1000/new", "title": "New paper", "year": 2021},
+        ]
+
+        remaining = integration_manager.skip_extracted_articles(articles)
+
+        assert remaining == [articles[2]]
+        assert mock_rayyan.create_article_note.call_count == 2
+        mock_rayyan.create_article_note.assert_any_call(
+            1, "Already extracted in Airtable: https://airtable.com/recArticle1"
+        )
+        plan = {"Unextracted": -1, "Extracted": 1}
+        updates = list(mock_rayyan.bulk_update_article_labels.call_args.args[0])
+        assert updates == [(1, plan), (2, plan)]
+
+    def test_same_title_in_another_year_is_not_linked(
+        self, integration_manager, mock_rayyan, extracted
+    ):
+        articles = [{"id": 1, "title": "Screen time and sleep", "year": 2021}]
+
+        assert integration_manager.skip_extracted_articles(articles) == articles
+        mock_rayyan.create_article_note.assert_not_called()
+
+    def test_defers_duplicate_candidates(
+        self, integration_manager, mock_rayyan, extracted
+    ):
+        articles = [
+            {"id": 1, "doi": "10.1000/new", "title": "New paper", "year": 2021},
+            {"id": 2, "doi": "10.1000/NEW", "title": "Renamed", "year": 2021},
+            {"id": 3, "doi": "", "title": "new paper", "year": 2021},
+        ]
+
+        remaining = integration_manager.skip_extracted_articles(articles)
+
+        assert remaining == [articles[0]]
+        mock_rayyan.bulk_update_article_labels.assert_not_called()
+
+    def test_note_failure_still_relabels(
+        self, integration_manager, mock_rayyan, extracted
+    ):
+        mock_rayyan.create_article_note.side_effect = Exception("Rayyan down")
+
+        remaining = integration_manager.skip_extracted_articles(
+            [{"id": 1, "doi": "10.1000/abc"}]
+        )
+
+        assert remaining == []
+        mock_rayyan.bulk_update_article_labels.assert_called_once()
+
+
+class TestPrescreenAbstracts:
+    @pytest.fixture
+    def articles(self, integration_manager):
+        integration_manager.prescreen = AbstractPrescreen()
+        return [
+            {"id": 1, "abstracts": [{"content": "A systematic review of apps."}]},
+            {"id": 2, "abstracts": [{"content": "Children aged 9 used TikTok."}]},
+            {"id": 3, "abstracts": []},
+        ]
+
+    def test_excludes_confident_matches_with_reason(
+        self, integration_manager, mock_rayyan, articles
+    ):
+        remaining = integration_manager.prescreen_abstracts(articles)
+
+        assert remaining == articles[1:]
+        mock_rayyan.create_article_note.assert_called_once_with(
+            1, "Local pre-screen: Review rather than primary study"
+        )
+        updates = mock_rayyan.bulk_update_article_labels.call_args.args[0]
+        assert updates == [(1, {config.RAYYAN_LABELS["abstract_excluded"]: 1})]
+
+    def test_batch_only_sends_remaining_abstracts(
+        self, integration_manager, mock_openai, mock_rayyan, articles
+    ):
+        mock_openai.prepare_abstract_body.return_value = {"model": "test"}
+
+        with patch.object(integration_manager, "_submit_batch"):
+            integration_manager.create_abstract_screening_batch(articles)
+
+        mock_openai.prepare_abstract_body.assert_called_once_with(
+            "Children aged 9 used TikTok."
+        )
+
+    def test_screen_abstract_skips_model_when_excluded(
+        self, integration_manager, mock_openai, articles
+    ):
+        integration_manager.screen_abstract(articles[0])
+
+        mock_openai.screen_record_abstract.assert_not_called()
+
+
 class TestScreenAbstract:
     def test_screens_and_actions_decision(
         self, integration_manager, mock_openai, mock_rayyan
@@ -436,6 +684,31 @@ class TestScreenFulltext:
 
         mock_openai.screen_record_fulltext.assert_not_called()
 
+    def test_screens_extracted_text_when_configured(
+        self, integration_manager, mock_rayyan, mock_openai
+    ):
+        mock_rayyan.download_pdf.return_value = "/path/to/pdf"
+        integration_manager.pdf_text = MagicMock()
+        integration_manager.pdf_text.get_text.return_value = "Methods\nText"
+        mock_openai.screen_record_fulltext_text.return_value = None
+
+        integration_manager.screen_fulltext({"id": 123})
+
+        mock_openai.screen_record_fulltext_text.assert_called_once_with("Methods\nText")
+        mock_openai.screen_record_fulltext.assert_not_called()
+
+    def test_falls_back_to_pdf_without_text(
+        self, integration_manager, mock_rayyan, mock_openai
+    ):
+        mock_rayyan.download_pdf.return_value = "/path/to/pdf"
+        integration_manager.pdf_text = MagicMock()
+        integration_manager.pdf_text.get_text.return_value = None
+        mock_openai.screen_record_fulltext.return_value = None
+
+        integration_manager.screen_fulltext({"id": 123})
+
+        mock_openai.screen_record_fulltext.assert_called_once_with("/path/to/pdf")
+
 
 class TestActionScreeningDecision:
     def test_include_abstract_decision(self, integration_manager, mock_rayyan):
@@ -507,6 +780,370 @@ class TestCreateAbstractScreeningBatch:
         mock_submit.assert_called_once()
 
 
+class TestBatchQueueBudget:
+    def test_holds_back_requests_over_the_budget(
+        self, integration_manager, mock_openai, mock_rayyan, mock_tracker
+    ):
+        integration_manager.batch_queue_tokens = 1000
+        mock_tracker.get_enqueued_tokens.return_value = 750
+        articles = [
+            {"id": i, "abstracts": [{"content": f"Abstract {i}"}]} for i in (1, 2, 3)
+        ]
+
+        with patch.object(integration_manager, "_submit_batch") as mock_submit:
+            held = integration_manager.create_abstract_screening_batch(articles)
+
+        assert held == 1
+        writer = mock_submit.call_args.args[0]
+        tracked = writer.files[0]["tracked"]
+        assert [row["article_id"] for row in tracked] == [1, 2]
+        assert [row["tokens"] for row in tracked] == [100, 100]
+        # The held-back article is not labelled, so the next cycle retries it
+        (updates,) = mock_rayyan.bulk_update_article_labels.call_args.args
+        assert [article_id for article_id, _ in updates] == [1, 2]
+
+    def test_skips_downloads_when_budget_is_used_up(
+        self, integration_manager, mock_rayyan, mock_tracker
+    ):
+        integration_manager.batch_queue_tokens = 1000
+        mock_tracker.get_enqueued_tokens.return_value = 1000
+
+        held = integration_manager.create_fulltext_screening_batch(
+            [{"id": 1}, {"id": 2}]
+        )
+
+        assert held == 2
+        mock_rayyan.download_pdf.assert_not_called()
+
+    def test_estimates_pdf_before_upload(
+        self, integration_manager, mock_openai, mock_rayyan, mock_tracker
+    ):
+        integration_manager.batch_queue_tokens = 1000
+        mock_tracker.get_enqueued_tokens.return_value = 0
+        mock_rayyan.download_pdf.side_effect = ["/pdf/1", "/pdf/2"]
+        mock_openai.estimate_body_tokens.side_effect = [600, 600]
+        mock_openai.upload_file.return_value = MagicMock(id="file_1")
+
+        with patch.object(integration_manager, "_submit_batch"):
+            held = integration_manager.create_extraction_batch([{"id": 1}, {"id": 2}])
+
+        assert held == 1
+        mock_openai.upload_file.assert_called_once_with("/pdf/1")
+        assert mock_openai.estimate_body_tokens.call_args.args[1] == "/pdf/2"
+
+    def test_submit_records_estimated_tokens(
+        self, integration_manager, mock_openai, mock_tracker, tmp_path
+    ):
+        writer = BatchWriter("abstract_screen", directory=str(tmp_path))
+        for i in (1, 2):
+            writer.add(
+                {"custom_id": f"abstract-{i}", "method": "POST", "body": {}},
+                {"custom_id": f"abstract-{i}", "article_id": i, "tokens": 300},
+            )
+        mock_openai.create_batch.return_value = MagicMock(id="batch_1")
+
+        integration_manager._submit_batch(writer, "abstract_screen")
+
+        kwargs = mock_tracker.add_batch.call_args.kwargs
+        assert kwargs["estimated_tokens"] == 600
+
+    def test_create_batches_stops_once_requests_are_held(self, integration_manager):
+        stats = {
+            "pending_batches": {"abstract_screen": 0},
+            "consecutive_errors": {"openai": 0},
+        }
+        articles = [{"id": i} for i in range(5)]
+
+        with (
+            patch("bigger_picker.integration.utils.create_stats_table"),
+            patch.object(
+                integration_manager,
+                "create_abstract_screening_batch",
+                side_effect=[0, 1, 0],
+            ) as mock_create,
+        ):
+            integration_manager.create_batches(
+                MagicMock(),
+                stats,
+                articles,
+                None,
+                None,
+                max_batch_size_abs=1,
+                max_num_batches_per_type=None,
+            )
+
+        assert mock_create.call_count == 2
+        assert stats["pending_batches"]["abstract_screen"] == 2
+
+
+class TestReuseAbstractDecisions:
+    @pytest.fixture
+    def cache(self, integration_manager, mock_openai, tmp_path):
+        mock_openai.prepare_abstract_body.return_value = {"model": "test"}
+        cache = ScreeningCache(str(tmp_path / "cache.jsonl"))
+        integration_manager.screening_cache = cache
+        return cache
+
+    def test_reuses_cached_decision_instead_of_batching(
+        self, integration_manager, mock_openai, mock_rayyan, cache
+    ):
+        cache.put(
+            utils.abstract_key("Known abstract", "v1"),
+            {"vote": "include", "rationale": "Fits"},
+        )
+        articles = [
+            {"id": 1, "abstracts": [{"content": "Known  ABSTRACT."}]},
+            {"id": 2, "abstracts": [{"content": "New abstract"}]},
+        ]
+
+        with patch.object(integration_manager, "_submit_batch"):
+            integration_manager.create_abstract_screening_batch(articles)
+
+        mock_openai.prepare_abstract_body.assert_called_once_with("New abstract")
+        updates = mock_rayyan.bulk_update_article_labels.call_args.args[0]
+        assert (1, {config.RAYYAN_LABELS["abstract_included"]: 1}) in updates
+
+    def test_sends_repeated_abstracts_once(
+        self, integration_manager, mock_openai, mock_rayyan, cache
+    ):
+        articles = [
+            {"id": 1, "abstracts": [{"content": "Same abstract"}]},
+            {"id": 2, "abstracts": [{"content": "Same abstract."}]},
+        ]
+
+        with patch.object(integration_manager, "_submit_batch"):
+            integration_manager.create_abstract_screening_batch(articles)
+
+        mock_openai.prepare_abstract_body.assert_called_once()
+        updates = mock_rayyan.bulk_update_article_labels.call_args.args[0]
+        assert [article_id for article_id, _ in updates] == [1]
+
+    def test_defers_repeats_of_abstracts_in_running_batches(
+        self, integration_manager, mock_openai, cache
+    ):
+        with patch.object(integration_manager, "_submit_batch"):
+            integration_manager.create_abstract_screening_batch(
+                [{"id": 1, "abstracts": [{"content": "Same abstract"}]}]
+            )
+            integration_manager.create_abstract_screening_batch(
+                [{"id": 2, "abstracts": [{"content": "Same abstract"}]}]
+            )
+
+        mock_openai.prepare_abstract_body.assert_called_once()
+
+    def test_sends_abstracts_with_an_invalid_cached_vote(
+        self, integration_manager, mock_openai, cache
+    ):
+        key = utils.abstract_key("Unclear abstract", "v1")
+        cache.expect({9: key})
+        cache.resolve(9, {"vote": "unsure", "rationale": "?"})
+
+        with patch.object(integration_manager, "_submit_batch"):
+            integration_manager.create_abstract_screening_batch(
+                [{"id": 1, "abstracts": [{"content": "Unclear abstract"}]}]
+            )
+
+        mock_openai.prepare_abstract_body.assert_called_once_with("Unclear abstract")
+
+    def test_stores_batch_results_for_reuse(
+        self, integration_manager, mock_openai, cache
+    ):
+        articles = [{"id": 1, "abstracts": [{"content": "Same abstract"}]}]
+        with patch.object(integration_manager, "_submit_batch"):
+            integration_manager.create_abstract_screening_batch(articles)
+        mock_openai.parse_screening_decision.return_value = ScreeningDecision(
+            vote="include",
+            matched_inclusion=None,
+            failed_inclusion=None,
+            triggered_exclusion=None,
+            exclusion_reasons=None,
+            rationale="Good",
+        )
+        result = {
+            "custom_id": "abstract-1",
+            "response": {
+                "status_code": 200,
+                "body": {"output": [{"content": [{"text": "{}"}]}]},
+            },
+        }
+
+        integration_manager._process_abstract_result(result)
+
+        cached = cache.get(utils.abstract_key("Same abstract", "v1"))
+        assert cached["vote"] == "include"
+
+    def test_screen_abstract_uses_and_fills_cache(
+        self, integration_manager, mock_openai, cache
+    ):
+        mock_openai.screen_record_abstract.return_value = ScreeningDecision(
+            vote="include",
+            matched_inclusion=None,
+            failed_inclusion=None,
+            triggered_exclusion=None,
+            exclusion_reasons=None,
+            rationale="Good",
+        )
+
+        integration_manager.screen_abstract(
+            {"id": 1, "abstracts": [{"content": "Same abstract"}]}
+        )
+        integration_manager.screen_abstract(
+            {"id": 2, "abstracts": [{"content": "same abstract"}]}
+        )
+
+        mock_openai.screen_record_abstract.assert_called_once()
+
+
+class TestDecisionVersions:
+    @pytest.fixture
+    def store(self, integration_manager, tmp_path):
+        store = DecisionStore(str(tmp_path / "decisions.jsonl"))
+        integration_manager.decisions = store
+        return store
+
+    @staticmethod
+    def _decision(vote="include"):
+        return ScreeningDecision(
+            vote=vote,
+            matched_inclusion=None,
+            failed_inclusion=None,
+            triggered_exclusion=None,
+            exclusion_reasons=None,
+            rationale="Reason",
+        )
+
+    def test_records_version_with_direct_decisions(
+        self, integration_manager, mock_openai, store
+    ):
+        mock_openai.screen_record_abstract.return_value = self._decision()
+
+        integration_manager.screen_abstract(
+            {"id": 1, "abstracts": [{"content": "Abstract"}]}
+        )
+
+        entry = store.get(1, "abstract_screen")
+        assert entry["version"] == "v1"
+        assert entry["decision"]["vote"] == "include"
+
+    def test_batch_results_use_the_version_they_were_sent_with(
+        self, integration_manager, mock_openai, mock_tracker, store
+    ):
+        mock_tracker.get_prompt_version.return_value = "v0"
+        mock_openai.parse_screening_decision.return_value = self._decision()
+        item = {
+            "custom_id": "fulltext-7",
+            "response": {
+                "status_code": 200,
+                "body": {"output": [{"content": [{"text": "{}"}]}]},
+            },
+        }
+
+        integration_manager._process_fulltext_result(item, "batch_1")
+
+        assert store.get(7, "fulltext_screen")["version"] == "v0"
+        mock_tracker.get_prompt_version.assert_called_once_with("batch_1")
+
+    def test_outdated_articles_fetches_only_older_versions(
+        self, integration_manager, mock_rayyan, store
+    ):
+        store.record(1, "abstract_screen", "v0")
+        store.record(2, "abstract_screen", "v1")
+        mock_rayyan.get_article_by_id.side_effect = lambda i: {"id": i}
+
+        articles = integration_manager.outdated_articles("abstract_screen")
+
+        assert articles == [{"id": 1}]
+
+    def test_rescreen_replaces_previous_labels(
+        self, integration_manager, mock_openai, mock_rayyan, store
+    ):
+        mock_openai.screen_record_abstract.return_value = self._decision()
+
+        integration_manager.screen_abstract(
+            {"id": 1, "abstracts": [{"content": "Abstract"}]}, rescreen=True
+        )
+
+        mock_rayyan.update_article_labels.assert_called_once_with(
+            1,
+            {
+                config.RAYYAN_LABELS["abstract_included"]: 1,
+                config.RAYYAN_LABELS["abstract_excluded"]: -1,
+            },
+        )
+
+    def test_fulltext_rescreen_to_exclude_clears_unextracted(
+        self, integration_manager, mock_openai, mock_rayyan, store
+    ):
+        mock_rayyan.download_pdf.return_value = "/pdf/1"
+        mock_openai.screen_record_fulltext.return_value = self._decision("exclude")
+
+        integration_manager.screen_fulltext({"id": 1}, rescreen=True)
+
+        (article_id, plan), _ = mock_rayyan.update_article_labels.call_args
+        assert article_id == 1
+        assert plan[config.RAYYAN_LABELS["excluded"]] == 1
+        assert plan[config.RAYYAN_LABELS["included"]] == -1
+        assert plan[config.RAYYAN_LABELS["unextracted"]] == -1
+        # Never uploaded, so a stale extracted label is cleared too
+        assert plan[config.RAYYAN_LABELS["extracted"]] == -1
+
+    def test_fulltext_rescreen_keeps_extracted_articles(
+        self, integration_manager, mock_openai, mock_rayyan, store
+    ):
+        store.record(1, "extraction", "v1")
+        mock_rayyan.download_pdf.return_value = "/pdf/1"
+
+        for vote in ("exclude", "include"):
+            mock_openai.screen_record_fulltext.return_value = self._decision(vote)
+            integration_manager.screen_fulltext({"id": 1}, rescreen=True)
+
+            (_, plan), _ = mock_rayyan.update_article_labels.call_args
+            assert config.RAYYAN_LABELS["extracted"] not in plan
+            assert plan[config.RAYYAN_LABELS["unextracted"]] == -1
+
+
+class TestScreenConcurrently:
+    def test_screens_every_article_and_reports_progress(self, integration_manager):
+        screened = []
+        done = []
+
+        failed = integration_manager.screen_concurrently(
+            lambda article: screened.append(article["id"]),
+            [{"id": i} for i in range(10)],
+            concurrency=4,
+            on_done=lambda: done.append(1),
+        )
+
+        assert failed == 0
+        assert sorted(screened) == list(range(10))
+        assert len(done) == 10
+
+    def test_runs_articles_in_parallel(self, integration_manager):
+        barrier = threading.Barrier(3, timeout=5)
+
+        failed = integration_manager.screen_concurrently(
+            lambda article: barrier.wait(),
+            [{"id": i} for i in range(3)],
+            concurrency=3,
+        )
+
+        assert failed == 0
+
+    def test_failures_do_not_stop_other_articles(self, integration_manager):
+        done = []
+
+        def screen(article):
+            if article["id"] == 1:
+                raise RuntimeError("LLM down")
+
+        failed = integration_manager.screen_concurrently(
+            screen, [{"id": 1}, {"id": 2}], on_done=lambda: done.append(1)
+        )
+
+        assert failed == 1
+        assert len(done) == 2
+
+
 class TestCreateFulltextScreeningBatch:
     def test_prepares_and_submits_batch(
         self, integration_manager, mock_openai, mock_rayyan, mock_tracker, tmp_path
@@ -540,27 +1177,136 @@ class TestCreateFulltextScreeningBatch:
         mock_openai.upload_file.assert_not_called()
         mock_submit.assert_not_called()
 
+    def test_sends_extracted_text_instead_of_uploading(
+        self, integration_manager, mock_openai, mock_rayyan
+    ):
+        articles = [{"id": 1}, {"id": 2}]
+        mock_rayyan.download_pdf.side_effect = ["/pdf/1", "/pdf/2"]
+        integration_manager.pdf_text = MagicMock()
+        integration_manager.pdf_text.get_texts.return_value = {
+            "/pdf/1": "Methods\nText",
+            "/pdf/2": None,
+        }
+        mock_openai.upload_file.return_value = MagicMock(id="file_2")
+        mock_openai.prepare_fulltext_text_body.return_value = {"model": "test"}
+        mock_openai.prepare_fulltext_body.return_value = {"model": "test"}
+
+        with patch.object(integration_manager, "_submit_batch") as mock_submit:
+            integration_manager.create_fulltext_screening_batch(articles)
+
+        integration_manager.pdf_text.get_texts.assert_called_once_with(
+            ["/pdf/1", "/pdf/2"]
+        )
+        mock_openai.prepare_fulltext_text_body.assert_called_once_with("Methods\nText")
+        mock_openai.upload_file.assert_called_once_with("/pdf/2")
+        writer = mock_submit.call_args.args[0]
+        tracked = writer.files[0]["tracked"]
+        assert [row["file_id"] for row in tracked] == [None, "file_2"]
+
+
+class TestSubmitBatch:
+    def test_writes_jsonl_and_creates_batch(
+        self, integration_manager, mock_openai, mock_tracker, tmp_path
+    ):
+        writer = BatchWriter("abstract_screen", directory=str(tmp_path))
+        writer.add({"custom_id": "abstract-1", "method": "POST", "body": {}})
+        writer.add({"custom_id": "abstract-2", "method": "POST", "body": {}})
+
+        uploaded = []
+
+        def create_batch(path, batch_type):
+            uploaded.append(Path(path).read_text().splitlines())
+            return MagicMock(id="batch_123")
+
+        mock_openai.create_batch.side_effect = create_batch
+
+        integration_manager._submit_batch(writer, "abstract_screen")
+
+        assert [json.loads(line)["custom_id"] for line in uploaded[0]] == [
+            "abstract-1",
+            "abstract-2",
+        ]
+        mock_tracker.add_batch.assert_called_once_with(
+            "batch_123",
+            "abstract_screen",
+            requests=None,
+            prompt_version="v1",
+            estimated_tokens=0,
+        )
+        # Uploaded files are removed once submitted
+        assert list(tmp_path.iterdir()) == []
+
+    def test_passes_tracked_requests_to_tracker(
+        self, integration_manager, mock_openai, mock_tracker, tmp_path
+    ):
+        writer = BatchWriter("fulltext_screen", directory=str(tmp_path))
+        tracked = {"custom_id": "fulltext-1", "article_id": 1, "file_id": "file_1"}
+        writer.add({"custom_id": "fulltext-1", "method": "POST", "body": {}}, tracked)
+
+        mock_batch = MagicMock()
+        mock_batch.id = "batch_123"
+        mock_openai.create_batch.return_value = mock_batch
+
+        integration_manager._submit_batch(writer, "fulltext_screen")
+
+        mock_tracker.add_batch.assert_called_once_with(
+            "batch_123",
+            "fulltext_screen",
+            requests=[tracked],
+            prompt_version="v1",
+            estimated_tokens=0,
+        )
+
+    def test_submits_one_batch_per_file(
+        self, integration_manager, mock_openai, mock_tracker, tmp_path
+    ):
+        writer = BatchWriter("abstract_screen", max_rows=2, directory=str(tmp_path))
+        for i in range(5):
+            writer.add(
+                {"custom_id": f"abstract-{i}", "method": "POST", "body": {}},
+                {"custom_id": f"abstract-{i}", "article_id": i},
+            )
+        mock_openai.create_batch.side_effect = [
+            MagicMock(id=f"batch_{i}") for i in range(3)
+        ]
+
+        integration_manager._submit_batch(writer, "abstract_screen")
 
-class TestSubmitBatch:
-    def test_writes_jsonl_and_creates_batch(
-        self, integration_manager, mock_openai, mock_tracker, tmp_path, monkeypatch
+        assert mock_openai.create_batch.call_count == 3
+        submitted = {
+            c.args[0]: [r["article_id"] for r in c.kwargs["requests"]]
+            for c in mock_tracker.add_batch.call_args_list
+        }
+        assert submitted == {"batch_0": [0, 1], "batch_1": [2, 3], "batch_2": [4]}
+
+    def test_builder_streams_rows_to_temp_dir(
+        self,
+        integration_manager,
+        mock_openai,
+        mock_rayyan,
+        mock_tracker,
+        tmp_path,
+        monkeypatch,
     ):
-        # Change to tmp_path for file operations
         monkeypatch.chdir(tmp_path)
+        articles = [{"id": i, "abstracts": [{"content": f"A{i}"}]} for i in range(3)]
+        mock_openai.create_batch_row.side_effect = lambda custom_id, body: {
+            "custom_id": custom_id
+        }
+        paths = []
 
-        requests = [
-            {"custom_id": "abstract-1", "method": "POST", "body": {}},
-            {"custom_id": "abstract-2", "method": "POST", "body": {}},
-        ]
+        def create_batch(path, batch_type):
+            paths.append(path)
+            assert Path(path).exists()
+            return MagicMock(id="batch_1")
 
-        mock_batch = MagicMock()
-        mock_batch.id = "batch_123"
-        mock_openai.create_batch.return_value = mock_batch
+        mock_openai.create_batch.side_effect = create_batch
 
-        integration_manager._submit_batch(requests, "abstract_screen")
+        integration_manager.create_abstract_screening_batch(articles)
 
-        mock_openai.create_batch.assert_called_once()
-        mock_tracker.add_batch.assert_called_once_with("batch_123", "abstract_screen")
+        assert len(paths) == 1
+        assert not Path(paths[0]).parent.exists()
+        assert list(tmp_path.iterdir()) == []
 
 
 class TestProcessPendingBatches:
@@ -589,6 +1335,26 @@ class TestProcessPendingBatches:
         # Should not raise, just log
         integration_manager.process_pending_batches(pending)
 
+    def test_releases_articles_of_failed_batch(
+        self, integration_manager, mock_openai, mock_rayyan, mock_tracker
+    ):
+        pending = {"batch_1": {"type": "abstract_screen"}}
+        mock_batch = MagicMock(id="batch_1", status="failed")
+        mock_batch.errors.data = [MagicMock(code="token_limit_exceeded")]
+        mock_openai.retrieve_batch.return_value = mock_batch
+        mock_tracker.get_requests.return_value = [
+            {"article_id": 1, "custom_id": "abstract-1"},
+            {"article_id": 2, "custom_id": "abstract-2"},
+        ]
+
+        integration_manager.process_pending_batches(pending)
+
+        pending_label = config.RAYYAN_LABELS["batch_pending"]
+        (updates,) = mock_rayyan.bulk_update_article_labels.call_args.args
+        assert updates == [(1, {pending_label: -1}), (2, {pending_label: -1})]
+        mock_tracker.get_requests.assert_called_once_with(batch_id="batch_1")
+        mock_tracker.mark_failed.assert_called_once_with("batch_1")
+
     def test_handles_in_progress_batch(self, integration_manager, mock_openai):
         pending = {"batch_1": {"type": "abstract_screen"}}
 
@@ -613,10 +1379,10 @@ class TestHandleCompletedBatch:
         batch_type = "abstract_screen"
         batch_id = "batch_1"
 
-        # Mock file content response
-        mock_content = MagicMock()
-        mock_content.text = '{"custom_id": "abstract-123", "response": {"status_code": 200, "body": {"choices": [{"message": {"content": "{\\"vote\\": \\"include\\", \\"rationale\\": \\"Good\\"}"}}]}}}'  # noqa: E501
-        mock_openai.client.files.content.return_value = mock_content
+        # Mock streamed file content
+        mock_openai.iter_file_lines.return_value = [
+            '{"custom_id": "abstract-123", "response": {"status_code": 200, "body": {"output": [{"content": [{"text": "{\\"vote\\": \\"include\\", \\"rationale\\": \\"Good\\"}"}]}]}}}'  # noqa: E501
+        ]
 
         decision = ScreeningDecision(
             vote="include",
@@ -633,8 +1399,410 @@ class TestHandleCompletedBatch:
                 output_file_id, batch_type, batch_id
             )
 
+        mock_openai.iter_file_lines.assert_called_once_with(output_file_id)
+        mock_tracker.save_progress.assert_called_once_with(
+            batch_id, 1, {"abstract-123": "applied"}
+        )
         mock_tracker.mark_completed.assert_called_once_with(batch_id)
 
+    def test_resumes_from_checkpoint(
+        self, integration_manager, mock_openai, mock_tracker
+    ):
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": f"abstract-{i}",
+                    "response": {"status_code": 500, "body": {"error": "x"}},
+                }
+            )
+            for i in range(1, 6)
+        ]
+        mock_openai.iter_file_lines.return_value = lines
+        mock_tracker.get_checkpoint.return_value = 3
+
+        with patch.object(
+            integration_manager, "_process_abstract_result", return_value="error"
+        ) as mock_process:
+            integration_manager._handle_completed_batch("out", "abstract_screen", "b1")
+
+        processed = [c.args[0]["custom_id"] for c in mock_process.call_args_list]
+        assert processed == ["abstract-4", "abstract-5"]
+        mock_tracker.save_progress.assert_called_once_with(
+            "b1", 5, {"abstract-4": "error", "abstract-5": "error"}
+        )
+
+    def test_totals_token_usage(self, integration_manager, mock_openai):
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": f"abstract-{i}",
+                    "response": {
+                        "status_code": 200,
+                        "body": {
+                            "usage": {
+                                "input_tokens": 1000,
+                                "input_tokens_details": {"cached_tokens": cached},
+                            }
+                        },
+                    },
+                }
+            )
+            for i, cached in enumerate([0, 896, 896], start=1)
+        ]
+        mock_openai.iter_file_lines.return_value = lines
+
+        with patch.object(
+            integration_manager, "_process_abstract_result", return_value="applied"
+        ):
+            summary = integration_manager._handle_completed_batch(
+                "out", "abstract_screen", "b1"
+            )
+
+        assert summary["input_tokens"] == 3000
+        assert summary["cached_tokens"] == 1792
+
+    def test_checkpoints_periodically(
+        self, integration_manager, mock_openai, mock_tracker
+    ):
+        lines = [json.dumps({"custom_id": f"abstract-{i}"}) for i in range(1, 6)]
+        mock_openai.iter_file_lines.return_value = [*lines, ""]
+
+        with patch.object(
+            integration_manager, "_process_abstract_result", return_value="applied"
+        ):
+            integration_manager._handle_completed_batch(
+                "out", "abstract_screen", "b1", checkpoint_every=2
+            )
+
+        checkpoints = [c.args[1] for c in mock_tracker.save_progress.call_args_list]
+        assert checkpoints == [2, 4, 6]
+        mock_tracker.mark_completed.assert_called_once_with("b1")
+
+
+class TestBulkScreeningLabels:
+    @staticmethod
+    def _line(article_id, vote="include", status_code=200):
+        text = json.dumps({"vote": vote, "rationale": "r"})
+        return json.dumps(
+            {
+                "custom_id": f"abstract-{article_id}",
+                "response": {
+                    "status_code": status_code,
+                    "body": {"output": [{"content": [{"text": text}]}]},
+                },
+            }
+        )
+
+    @pytest.fixture(autouse=True)
+    def decision(self, mock_openai):
+        mock_openai.parse_screening_decision.return_value = ScreeningDecision(
+            vote="include",
+            matched_inclusion=None,
+            failed_inclusion=None,
+            triggered_exclusion=None,
+            exclusion_reasons=None,
+            rationale="r",
+        )
+
+    def test_applies_labels_in_one_bulk_call(
+        self, integration_manager, mock_openai, mock_rayyan, mock_tracker
+    ):
+        mock_openai.iter_file_lines.return_value = [
+            self._line(1),
+            self._line(2),
+            self._line(3, status_code=500),
+        ]
+
+        stats = integration_manager._handle_completed_batch(
+            "out", "abstract_screen", "b1"
+        )
+
+        mock_rayyan.update_article_labels.assert_not_called()
+        mock_rayyan.bulk_update_article_labels.assert_called_once()
+        updates = mock_rayyan.bulk_update_article_labels.call_args.args[0]
+        included = {
+            config.RAYYAN_LABELS["abstract_included"]: 1,
+            config.RAYYAN_LABELS["batch_pending"]: -1,
+        }
+        assert updates == [
+            (1, included),
+            (2, included),
+            (3, {config.RAYYAN_LABELS["batch_pending"]: -1}),
+        ]
+        mock_tracker.save_progress.assert_called_once_with(
+            "b1",
+            3,
+            {"abstract-1": "applied", "abstract-2": "applied", "abstract-3": "error"},
+        )
+        # One ledger write for the whole flush
+        mock_tracker.record_results.assert_called_once_with(
+            "b1",
+            {
+                "abstract-1": {"status": "applied"},
+                "abstract-2": {"status": "applied"},
+                "abstract-3": {"status": "error"},
+            },
+        )
+        assert stats["processed"] == 3
+        assert stats["failed"] == 1
+
+    def test_flushes_labels_before_each_checkpoint(
+        self, integration_manager, mock_openai, mock_rayyan, mock_tracker
+    ):
+        mock_openai.iter_file_lines.return_value = [self._line(i) for i in range(5)]
+
+        integration_manager._handle_completed_batch(
+            "out", "abstract_screen", "b1", checkpoint_every=2
+        )
+
+        batches = [
+            [a_id for a_id, _ in c.args[0]]
+            for c in mock_rayyan.bulk_update_article_labels.call_args_list
+        ]
+        assert batches == [[0, 1], [2, 3], [4]]
+        checkpoints = [c.args[1] for c in mock_tracker.save_progress.call_args_list]
+        assert checkpoints == [2, 4, 5]
+
+    def test_failed_label_updates_are_not_recorded(
+        self, integration_manager, mock_openai, mock_rayyan, mock_tracker
+    ):
+        mock_openai.iter_file_lines.return_value = [self._line(1), self._line(2)]
+        mock_rayyan.bulk_update_article_labels.return_value = {2: RuntimeError("boom")}
+
+        stats = integration_manager._handle_completed_batch(
+            "out", "abstract_screen", "b1"
+        )
+
+        mock_tracker.record_results.assert_called_once_with(
+            "b1", {"abstract-1": {"status": "applied"}}
+        )
+        mock_tracker.save_progress.assert_called_once_with(
+            "b1", 2, {"abstract-1": "applied", "abstract-2": "failed"}
+        )
+        assert stats["failed"] == 1
+
+    def _exclude(self, mock_openai):
+        mock_openai.parse_screening_decision.return_value = ScreeningDecision(
+            vote="exclude",
+            matched_inclusion=None,
+            failed_inclusion=None,
+            triggered_exclusion=None,
+            exclusion_reasons=None,
+            rationale="Adults",
+        )
+
+    def test_records_notes_before_labels(
+        self, integration_manager, mock_openai, mock_rayyan, mock_tracker
+    ):
+        self._exclude(mock_openai)
+        mock_openai.iter_file_lines.return_value = [self._line(1), self._line(2)]
+        calls = MagicMock()
+        calls.attach_mock(mock_rayyan.create_article_note, "note")
+        calls.attach_mock(mock_tracker.record_results, "record")
+        calls.attach_mock(mock_rayyan.bulk_update_article_labels, "labels")
+
+        integration_manager._handle_completed_batch("out", "abstract_screen", "b1")
+
+        assert [c[0] for c in calls.mock_calls] == [
+            "note",
+            "note",
+            "record",
+            "labels",
+            "record",
+        ]
+        assert calls.mock_calls[2].args == (
+            "b1",
+            {"abstract-1": {"note": True}, "abstract-2": {"note": True}},
+        )
+
+    def test_does_not_repost_recorded_notes(
+        self, integration_manager, mock_openai, mock_rayyan, mock_tracker
+    ):
+        self._exclude(mock_openai)
+        mock_openai.iter_file_lines.return_value = [self._line(1)]
+        mock_tracker.get_result.return_value = {"note": True}
+
+        integration_manager._handle_completed_batch("out", "abstract_screen", "b1")
+
+        mock_rayyan.create_article_note.assert_not_called()
+        mock_rayyan.bulk_update_article_labels.assert_called_once()
+
+
+class TestExtractionWorkerPool:
+    def _lines(self, n):
+        return [json.dumps({"custom_id": f"extraction-{i}"}) for i in range(1, n + 1)]
+
+    def test_processes_all_results_concurrently(
+        self, integration_manager, mock_openai, mock_tracker
+    ):
+        integration_manager.extraction_workers = 3
+        mock_openai.iter_file_lines.return_value = self._lines(6)
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def process(item, batch_id):
+            with lock:
+                active.append(item["custom_id"])
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(item["custom_id"])
+            return "applied"
+
+        with patch.object(
+            integration_manager, "_process_extraction_result", side_effect=process
+        ):
+            summary = integration_manager._handle_completed_batch(
+                "out", "extraction", "b1"
+            )
+
+        assert summary["processed"] == 6
+        assert summary["failed"] == 0
+        assert 1 < max(peak) <= 3
+        batch_id, checkpoint, statuses = mock_tracker.save_progress.call_args.args
+        assert checkpoint == 6
+        assert statuses == {f"extraction-{i}": "applied" for i in range(1, 7)}
+
+    def test_checkpoint_waits_for_slow_results(
+        self, integration_manager, mock_openai, mock_tracker
+    ):
+        integration_manager.extraction_workers = 3
+        mock_openai.iter_file_lines.return_value = self._lines(3)
+
+        def process(item, batch_id):
+            if item["custom_id"] == "extraction-1":
+                time.sleep(0.2)
+            return "applied"
+
+        with patch.object(
+            integration_manager, "_process_extraction_result", side_effect=process
+        ):
+            integration_manager._handle_completed_batch(
+                "out", "extraction", "b1", checkpoint_every=1
+            )
+
+        checkpoints = [c.args[1] for c in mock_tracker.save_progress.call_args_list]
+        assert checkpoints[0] == 0
+        assert checkpoints == sorted(checkpoints)
+        assert checkpoints[-1] == 3
+
+    def test_isolates_worker_failures(
+        self, integration_manager, mock_openai, mock_tracker
+    ):
+        mock_openai.iter_file_lines.return_value = self._lines(2)
+
+        def process(item, batch_id):
+            if item["custom_id"] == "extraction-1":
+                raise RuntimeError("boom")
+            return "applied"
+
+        with patch.object(
+            integration_manager, "_process_extraction_result", side_effect=process
+        ):
+            summary = integration_manager._handle_completed_batch(
+                "out", "extraction", "b1"
+            )
+
+        assert summary["failed"] == 1
+        statuses = mock_tracker.save_progress.call_args.args[2]
+        assert statuses == {"extraction-1": "failed", "extraction-2": "applied"}
+        mock_tracker.mark_completed.assert_called_once_with("b1")
+
+    def test_service_slots_limit_concurrency(self, mock_tracker):
+        mgr = IntegrationManager(
+            batch_tracker=mock_tracker, service_concurrency={"airtable": 1}
+        )
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def call():
+            with mgr._service_slot("airtable"):
+                with lock:
+                    active.append(1)
+                    peak.append(len(active))
+                time.sleep(0.02)
+                with lock:
+                    active.pop()
+
+        threads = [threading.Thread(target=call) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert max(peak) == 1
+
+    def test_unknown_service_is_unlimited(self, integration_manager):
+        with integration_manager._service_slot("unknown"):
+            pass
+
+
+class TestProcessPendingBatchesCli:
+    def test_records_throughput(self, integration_manager, mock_openai):
+        mock_batch = MagicMock()
+        mock_batch.status = "completed"
+        mock_batch.output_file_id = "output_123"
+        mock_openai.retrieve_batch.return_value = mock_batch
+        stats = {
+            "status": "",
+            "last_check": {"openai": "Never"},
+            "last_sync": {"openai": "Never"},
+            "total_polls": {"openai": 0},
+            "total_syncs": {"openai": 0},
+            "pending_batches": {"extraction": 1},
+            "throughput": {"extraction": "-"},
+            "prompt_cache": {"extraction": "-"},
+        }
+
+        with (
+            patch("bigger_picker.integration.utils.create_stats_table"),
+            patch.object(
+                integration_manager,
+                "_handle_completed_batch",
+                return_value={
+                    "processed": 10,
+                    "failed": 0,
+                    "seconds": 4.0,
+                    "input_tokens": 4000,
+                    "cached_tokens": 3000,
+                },
+            ),
+        ):
+            integration_manager.process_pending_batches_cli(
+                MagicMock(), stats, {"batch_1": {"type": "extraction"}}
+            )
+
+        assert stats["throughput"]["extraction"] == "2.50/s (10 in 4s)"
+        assert stats["prompt_cache"]["extraction"] == "75% (3000/4000)"
+        assert stats["pending_batches"]["extraction"] == 0
+
+
+class TestTagSearch:
+    def test_labels_matching_articles(self, integration_manager, mock_rayyan, tmp_path):
+        ris = tmp_path / "search.ris"
+        ris.write_text("TY  - JOUR\nDO  - 10.1/a\nER  - \nTY  - JOUR\nDO  - 10.1/z\n")
+        mock_rayyan.find_articles_by_doi.return_value = {"10.1/a": [5, 3]}
+
+        article_ids, unmatched = integration_manager.tag_search([str(ris)], "SDQ")
+
+        mock_rayyan.refresh_doi_index.assert_called_once()
+        assert article_ids == [3, 5]
+        assert unmatched == {"10.1/z"}
+        updates = mock_rayyan.bulk_update_article_labels.call_args.args[0]
+        assert updates == [(3, {"SDQ": 1}), (5, {"SDQ": 1})]
+
+    def test_can_skip_index_refresh(self, integration_manager, mock_rayyan, tmp_path):
+        ris = tmp_path / "search.ris"
+        ris.write_text("TY  - JOUR\nER  - \n")
+        mock_rayyan.find_articles_by_doi.return_value = {}
+
+        integration_manager.tag_search([str(ris)], "SDQ", refresh_index=False)
+
+        mock_rayyan.refresh_doi_index.assert_not_called()
+        mock_rayyan.bulk_update_article_labels.assert_not_called()
+
 
 class TestSync:
     def test_calls_sync_methods(self, integration_manager):
@@ -861,12 +2029,8 @@ class TestUpdatedDatasetsScores:
 
         with (
             patch("bigger_picker.integration.utils.fix_dataset") as mock_fix,
-            patch(
-                "bigger_picker.integration.utils.compute_year_range"
-            ) as mock_year,
-            patch(
-                "bigger_picker.integration.utils.compute_age_cache"
-            ) as mock_cache,
+            patch("bigger_picker.integration.utils.compute_year_range") as mock_year,
+            patch("bigger_picker.integration.utils.compute_age_cache") as mock_cache,
             patch(
                 "bigger_picker.integration.utils.compute_dataset_value"
             ) as mock_value,
@@ -896,12 +2060,8 @@ class TestUpdatedDatasetsScores:
 
         with (
             patch("bigger_picker.integration.utils.fix_dataset") as mock_fix,
-            patch(
-                "bigger_picker.integration.utils.compute_year_range"
-            ) as mock_year,
-            patch(
-                "bigger_picker.integration.utils.compute_age_cache"
-            ) as mock_cache,
+            patch("bigger_picker.integration.utils.compute_year_range") as mock_year,
+            patch("bigger_picker.integration.utils.compute_age_cache") as mock_cache,
             patch(
                 "bigger_picker.integration.utils.compute_dataset_value"
             ) as mock_value,
@@ -1031,8 +2191,13 @@ class TestUploadExtractionWithNestedObjects:
             llm_extraction, article_metadata
         )
 
-        # Should create Article + 1 Population + Dataset
-        assert mock_airtable.create_record.call_count >= 3
+        # Should create Article + Dataset, with the Population in one batch
+        assert mock_airtable.create_record.call_count == 2
+        mock_airtable.batch_create_records.assert_called_once()
+        table_name, payloads = mock_airtable.batch_create_records.call_args.args
+        assert table_name == "Populations"
+        assert payloads[0]["Sample Size: Total N"] == 250
+        assert payloads[0]["Rayyan ID"] == ["rec_1"]
 
     def test_creates_screen_time_measures(self, integration_manager, mock_airtable):
         llm_extraction = ArticleLLMExtract.model_validate(
@@ -1072,8 +2237,13 @@ class TestUploadExtractionWithNestedObjects:
             llm_extraction, article_metadata
         )
 
-        # Verify screen time measure was created
-        assert mock_airtable.create_record.call_count >= 3
+        # Verify screen time measure was created, title-cased
+        mock_airtable.batch_create_records.assert_called_once()
+        table_name, payloads = mock_airtable.batch_create_records.call_args.args
+        assert table_name == "Screen Time Measures"
+        assert payloads[0]["Screen Time Measure: Name"] == "Tv Watching Survey"
+        assert payloads[0]["Types of Screen Time Measured"] == ["Television"]
+        assert payloads[0]["Rayyan ID"] == ["rec_1"]
 
     def test_creates_outcomes(self, integration_manager, mock_airtable):
         llm_extraction = ArticleLLMExtract.model_validate(
@@ -1112,8 +2282,45 @@ class TestUploadExtractionWithNestedObjects:
             llm_extraction, article_metadata
         )
 
-        # Verify outcome was created
-        assert mock_airtable.create_record.call_count >= 3
+        # Verify outcome was created, title-cased
+        mock_airtable.batch_create_records.assert_called_once()
+        table_name, payloads = mock_airtable.batch_create_records.call_args.args
+        assert table_name == "Outcomes"
+        assert payloads[0]["Outcome"] == "Depression"
+        assert payloads[0]["Rayyan ID"] == ["rec_1"]
+
+    def test_batches_many_children_per_table(self, integration_manager, mock_airtable):
+        outcome = {
+            "Outcome Group": "Mental Health",
+            "Outcome": "anxiety",
+            "Outcome Measure": "GAD-7",
+        }
+        llm_extraction = ArticleLLMExtract.model_validate(
+            {
+                "Corresponding Author": None,
+                "Corresponding Author Email": None,
+                "Year of Last Data Point": None,
+                "Study Design": None,
+                "Countries of Data": None,
+                "Total Sample Size": None,
+                "Dataset Name": "Cohort",
+                "populations": [],
+                "screen_time_measures": [],
+                "outcomes": [outcome] * 12,
+            }
+        )
+        article_metadata = {"Rayyan ID": 123, "Authors": "Smith", "Year": 2020}
+
+        mock_airtable.create_record.return_value = {"id": "rec_1"}
+
+        integration_manager.upload_extraction_to_airtable(
+            llm_extraction, article_metadata
+        )
+
+        # One request per Airtable batch of 10, as pyairtable would send
+        calls = [c.args for c in mock_airtable.batch_create_records.call_args_list]
+        assert [table_name for table_name, _ in calls] == ["Outcomes"] * 2
+        assert [len(payloads) for _, payloads in calls] == [10, 2]
 
     def test_generates_dataset_name_from_metadata(
         self, integration_manager, mock_airtable
@@ -1187,9 +2394,7 @@ class TestCreateExtractionBatch:
         mock_openai.upload_file.assert_not_called()
         mock_submit.assert_not_called()
 
-    def test_handles_upload_errors(
-        self, integration_manager, mock_openai, mock_rayyan
-    ):
+    def test_handles_upload_errors(self, integration_manager, mock_openai, mock_rayyan):
         articles = [{"id": 1}, {"id": 2}]
 
         mock_rayyan.download_pdf.return_value = "/path/to/pdf"
@@ -1203,7 +2408,8 @@ class TestCreateExtractionBatch:
             integration_manager.create_extraction_batch(articles)
 
         # Should have created only 1 request (second article)
-        assert mock_openai.prepare_extraction_body.call_count == 1
+        assert mock_openai.create_batch_row.call_count == 1
+        mock_openai.prepare_extraction_body.assert_called_with("file_2")
 
 
 class TestProcessAbstractResults:
@@ -1238,7 +2444,7 @@ class TestProcessAbstractResults:
         )
         mock_openai.parse_screening_decision.return_value = decision
 
-        integration_manager._process_abstract_results(results)
+        integration_manager._process_abstract_result(results[0])
 
         mock_rayyan.update_article_labels.assert_called_once()
 
@@ -1253,7 +2459,7 @@ class TestProcessAbstractResults:
             }
         ]
 
-        integration_manager._process_abstract_results(results)
+        integration_manager._process_abstract_result(results[0])
 
         # Should update labels to remove batch_pending
         mock_rayyan.update_article_labels.assert_called_once()
@@ -1266,17 +2472,7 @@ class TestProcessAbstractResults:
                 "custom_id": "abstract-123",
                 "response": {
                     "status_code": 200,
-                    "body": {
-                        "output": [
-                            {
-                                "content": [
-                                    {
-                                        "text": "invalid json"
-                                    }
-                                ]
-                            }
-                        ]
-                    },
+                    "body": {"output": [{"content": [{"text": "invalid json"}]}]},
                 },
             }
         ]
@@ -1284,7 +2480,7 @@ class TestProcessAbstractResults:
         mock_openai.parse_screening_decision.side_effect = Exception("Parse error")
 
         # Should not raise, just log
-        integration_manager._process_abstract_results(results)
+        integration_manager._process_abstract_result(results[0])
 
 
 class TestProcessFulltextResults:
@@ -1325,7 +2521,7 @@ class TestProcessFulltextResults:
         )
         mock_openai.parse_screening_decision.return_value = decision
 
-        integration_manager._process_fulltext_results(results)
+        integration_manager._process_fulltext_result(results[0])
 
         mock_rayyan.update_article_labels.assert_called_once()
 
@@ -1341,13 +2537,7 @@ class TestProcessExtractionResults:
                     "status_code": 200,
                     "body": {
                         "output": [
-                            {
-                                "content": [
-                                    {
-                                        "text": '{"Corresponding Author": "Smith"}'
-                                    }
-                                ]
-                            }
+                            {"content": [{"text": '{"Corresponding Author": "Smith"}'}]}
                         ]
                     },
                 },
@@ -1395,7 +2585,7 @@ class TestProcessExtractionResults:
         }
         mock_asana.get_custom_field_value.return_value = "BP001"
 
-        integration_manager._process_extraction_results(results)
+        integration_manager._process_extraction_result(results[0])
 
         mock_rayyan.update_article_labels.assert_called_once()
 
@@ -1412,8 +2602,118 @@ class TestProcessExtractionResults:
             }
         ]
 
-        integration_manager._process_extraction_results(results)
+        integration_manager._process_extraction_result(results[0])
+
+        mock_rayyan.update_article_labels.assert_called_once()
+
+
+class TestIdempotentResultProcessing:
+    @pytest.fixture
+    def extraction_item(self):
+        return {
+            "custom_id": "extraction-789",
+            "response": {
+                "status_code": 200,
+                "body": {"output": [{"content": [{"text": "{}"}]}]},
+            },
+        }
+
+    def test_skips_results_already_applied(
+        self, integration_manager, mock_openai, mock_rayyan, mock_tracker
+    ):
+        mock_tracker.get_result.return_value = {"status": "applied"}
+        item = {
+            "custom_id": "abstract-1",
+            "response": {"status_code": 200, "body": {}},
+        }
+
+        status = integration_manager._process_abstract_result(item, "batch_1")
+
+        assert status == "applied"
+        mock_tracker.get_result.assert_called_once_with("batch_1", "abstract-1")
+        mock_openai.parse_screening_decision.assert_not_called()
+        mock_rayyan.update_article_labels.assert_not_called()
+
+    def test_records_applied_screening_result(
+        self, integration_manager, mock_openai, mock_tracker
+    ):
+        item = {
+            "custom_id": "fulltext-1",
+            "response": {
+                "status_code": 200,
+                "body": {"output": [{"content": [{"text": "{}"}]}]},
+            },
+        }
+        mock_openai.parse_screening_decision.return_value = ScreeningDecision(
+            vote="include",
+            matched_inclusion=None,
+            failed_inclusion=None,
+            triggered_exclusion=None,
+            exclusion_reasons=None,
+            rationale="Good",
+        )
+
+        integration_manager._process_fulltext_result(item, "batch_1")
+
+        mock_tracker.record_result.assert_called_once_with(
+            "batch_1", "fulltext-1", status="applied"
+        )
+
+    def test_does_not_touch_ledger_without_batch_id(
+        self, integration_manager, mock_tracker
+    ):
+        item = {"custom_id": "abstract-1", "response": {"status_code": 500, "body": {}}}
+
+        integration_manager._process_abstract_result(item)
+
+        mock_tracker.get_result.assert_not_called()
+        mock_tracker.record_result.assert_not_called()
+
+    def test_extraction_resumes_after_dataset_step(
+        self,
+        integration_manager,
+        mock_rayyan,
+        mock_airtable,
+        mock_tracker,
+        extraction_item,
+    ):
+        dataset = {"id": "rec_1", "fields": {"Dataset Name": "Test"}}
+        mock_tracker.get_result.return_value = {"dataset": dataset}
+
+        with patch.object(
+            integration_manager,
+            "create_task_from_dataset",
+            return_value={"gid": "task_1"},
+        ) as mock_create_task:
+            status = integration_manager._process_extraction_result(
+                extraction_item, "batch_1"
+            )
+
+        assert status == "applied"
+        mock_rayyan.get_article_by_id.assert_not_called()
+        mock_airtable.create_record.assert_not_called()
+        mock_create_task.assert_called_once_with(dataset)
+        mock_tracker.record_result.assert_any_call(
+            "batch_1", "extraction-789", task_gid="task_1"
+        )
+        mock_tracker.record_result.assert_called_with(
+            "batch_1", "extraction-789", status="applied"
+        )
+
+    def test_extraction_skips_task_when_already_created(
+        self, integration_manager, mock_rayyan, mock_tracker, extraction_item
+    ):
+        mock_tracker.get_result.return_value = {
+            "dataset": {"id": "rec_1", "fields": {}},
+            "task_gid": "task_1",
+        }
+
+        with patch.object(
+            integration_manager, "create_task_from_dataset"
+        ) as mock_create_task:
+            integration_manager._process_extraction_result(extraction_item, "batch_1")
 
+        mock_create_task.assert_not_called()
         mock_rayyan.update_article_labels.assert_called_once()
 
 
@@ -1524,7 +2824,11 @@ class TestCreateAbstractBatchEdgeCases:
             integration_manager.create_abstract_screening_batch(articles)
 
         # Should update labels for both articles with missing abstract
-        assert mock_rayyan.update_article_labels.call_count == 2
+        missing = {config.RAYYAN_LABELS["abstract_missing"]: 1}
+        mock_rayyan.bulk_update_article_labels.assert_called_once()
+        updates = mock_rayyan.bulk_update_article_labels.call_args.args[0]
+        assert updates == [(1, missing), (2, missing)]
+        mock_rayyan.update_article_labels.assert_not_called()
         mock_submit.assert_not_called()
 
     def test_submits_batch_when_no_requests(self, integration_manager):
@@ -1534,3 +2838,47 @@ class TestCreateAbstractBatchEdgeCases:
             integration_manager.create_abstract_screening_batch(articles)
 
         mock_submit.assert_not_called()
+
+
+class TestCreateBatches:
+    def test_skips_articles_pending_extraction(self, integration_manager, mock_tracker):
+        mock_tracker.get_pending_article_ids.return_value = {1}
+        stats = {
+            "pending_batches": {"extraction": 0},
+            "consecutive_errors": {"openai": 0},
+        }
+
+        with (
+            patch("bigger_picker.integration.utils.create_stats_table"),
+            patch.object(integration_manager, "create_extraction_batch") as mock_create,
+        ):
+            integration_manager.create_batches(
+                MagicMock(), stats, None, None, [{"id": 1}, {"id": 2}]
+            )
+
+        mock_tracker.get_pending_article_ids.assert_called_once_with("extraction")
+        mock_create.assert_called_once_with([{"id": 2}])
+        assert stats["pending_batches"]["extraction"] == 1
+
+    def test_skips_articles_already_extracted(self, integration_manager, mock_tracker):
+        mock_tracker.get_pending_article_ids.return_value = set()
+        stats = {
+            "pending_batches": {"extraction": 0},
+            "consecutive_errors": {"openai": 0},
+        }
+
+        with (
+            patch("bigger_picker.integration.utils.create_stats_table"),
+            patch.object(
+                integration_manager,
+                "skip_extracted_articles",
+                return_value=[{"id": 2}],
+            ) as mock_skip,
+            patch.object(integration_manager, "create_extraction_batch") as mock_create,
+        ):
+            integration_manager.create_batches(
+                MagicMock(), stats, None, None, [{"id": 1}, {"id": 2}]
+            )
+
+        mock_skip.assert_called_once_with([{"id": 1}, {"id": 2}])
+        mock_create.assert_called_once_with([{"id": 2}])
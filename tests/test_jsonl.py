@@ -0,0 +1,22 @@
+"""Tests for the append-only JSON lines helpers."""
+
+from bigger_picker.jsonl import append_jsonl, read_jsonl
+
+
+class TestJsonl:
+    def test_appends_and_reads_entries(self, tmp_path):
+        path = str(tmp_path / "log.jsonl")
+
+        append_jsonl(path, [{"a": 1}, {"a": 2}])
+        append_jsonl(path, iter([{"a": 3}]))
+
+        assert list(read_jsonl(path)) == [{"a": 1}, {"a": 2}, {"a": 3}]
+
+    def test_missing_file_reads_nothing(self, tmp_path):
+        assert list(read_jsonl(str(tmp_path / "missing.jsonl"))) == []
+
+    def test_skips_partial_trailing_line(self, tmp_path):
+        path = tmp_path / "log.jsonl"
+        path.write_text('{"a": 1}\n{"a": ')
+
+        assert list(read_jsonl(str(path))) == [{"a": 1}]
@@ -0,0 +1,75 @@
+"""Tests for the MinHash LSH indexer."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bigger_picker.minhash import MinHashIndex
+
+
+def pairs(names, **kwargs):
+    df = pd.DataFrame({"name": names})
+    index = MinHashIndex("name", **kwargs).index(df)
+    return sorted(index.tolist())
+
+
+class TestMinHashIndex:
+    def test_pairs_similar_names(self):
+        names = [
+            "Millennium Cohort Study",
+            "Screen Time and Sleep Trial",
+            "Cohort Study Millennium",
+            "Millenium Cohort Study",
+        ]
+
+        # The reordered names share only ~0.65 of their shingles, so use a
+        # banding whose threshold sits well below that
+        assert pairs(names, bands=32, rows=4) == [(2, 0), (3, 0), (3, 2)]
+
+    def test_pairs_are_lower_triangle(self):
+        names = ["Growing Up in Ireland"] * 4
+
+        assert all(first > second for first, second in pairs(names))
+        assert len(pairs(names)) == 6
+
+    def test_skips_missing_and_empty_names(self):
+        assert pairs([None, "", "  ", None]) == []
+
+    def test_skips_oversized_buckets(self):
+        names = ["Growing Up in Ireland"] * 4
+
+        assert pairs(names, max_bucket_size=3) == []
+
+    def test_keeps_index_labels(self):
+        df = pd.DataFrame({"name": ["ALSPAC", "Oslo", "ALSPAC"]}, index=[10, 20, 30])
+
+        index = MinHashIndex("name").index(df)
+
+        assert index.tolist() == [(30, 10)]
+
+    def test_signatures_are_deterministic(self):
+        names = pd.Series(["Generation R", "Born in Bradford"])
+
+        first = MinHashIndex("name", seed=1).signatures(names)
+        second = MinHashIndex("name", seed=1).signatures(names)
+
+        assert first.shape == (2, 16 * 8)
+        np.testing.assert_array_equal(first, second)
+
+    def test_signatures_match_exact_arithmetic(self):
+        index = MinHashIndex("name", bands=4, rows=2)
+        prime = (1 << 61) - 1
+
+        signature = index.signatures(pd.Series(["Generation R"]))[0]
+
+        shingles = index._shingles("Generation R")
+        expected = [
+            min((h * int(a) + int(b)) % prime for h in shingles)
+            for a, b in zip(index._a, index._b, strict=True)
+        ]
+        assert signature.tolist() == expected
+
+    def test_threshold(self):
+        index = MinHashIndex("name", bands=16, rows=8)
+
+        assert index.threshold() == pytest.approx((1 / 16) ** (1 / 8))
@@ -1,9 +1,13 @@
+import json
 import os
+from unittest.mock import MagicMock, patch
 
+import httpx
 import pytest
 
 import bigger_picker.credentials as credentials
 import bigger_picker.openai as openai
+from bigger_picker.datamodels import ScreeningDecision
 
 
 class DummyFile:
@@ -30,8 +34,9 @@ def dummy_openai(monkeypatch):
     created = {}
 
     class FakeOpenAIClient:
-        def __init__(self, api_key):
+        def __init__(self, api_key, **kwargs):
             created["api_key"] = api_key
+            created.update(kwargs)
             # prepare nested files and responses attrs
             self.files = type(
                 "F", (), {"create": lambda self, file, purpose: DummyFile("file123")}
@@ -40,8 +45,8 @@ def dummy_openai(monkeypatch):
                 "R",
                 (),
                 {
-                    "parse": lambda self, model, input, text_format: DummyResponse(
-                        "parsed_output"
+                    "parse": lambda self, model, input, text_format, **kw: (
+                        DummyResponse("parsed_output")
                     )
                 },
             )()
@@ -57,6 +62,19 @@ def test_init_with_provided_key(dummy_openai):
     assert mgr.model == "gpt-test"
 
 
+def test_init_uses_shared_http_client(dummy_openai):
+    openai.OpenAIManager(api_key="provided_key")
+
+    assert dummy_openai["http_client"] is not None
+    assert dummy_openai["max_retries"] == openai.HTTP_MAX_RETRIES
+
+
+def test_init_passes_base_url(dummy_openai):
+    openai.OpenAIManager(api_key="provided_key", base_url="http://localhost:9/v1")
+
+    assert dummy_openai["base_url"] == "http://localhost:9/v1"
+
+
 def test_init_without_key_uses_load_token(monkeypatch, dummy_openai):
     # Remove direct call, use default None
     mgr = openai.OpenAIManager(api_key=None)  # noqa: F841
@@ -110,7 +128,7 @@ def mock_openai_manager(monkeypatch):
             return DummyFile("mock_file_id")
 
     class MockResponses:
-        def parse(self, model, input, text_format):
+        def parse(self, model, input, text_format, **kwargs):
             return DummyResponse("mocked_parse_result")
 
     class MockBatches:
@@ -121,7 +139,7 @@ def mock_openai_manager(monkeypatch):
             return DummyBatch(batch_id, status="completed", output_file_id="output_123")
 
     class FakeClient:
-        def __init__(self, api_key):
+        def __init__(self, api_key, **kwargs):
             self.files = MockFiles()
             self.responses = MockResponses()
             self.batches = MockBatches()
@@ -165,6 +183,15 @@ class TestPrepareFulltextBody:
         assert "text" in body
 
 
+class TestPrepareFulltextTextBody:
+    def test_sends_text_instead_of_file(self, mock_openai_manager):
+        body = mock_openai_manager.prepare_fulltext_text_body("Methods\nText")
+
+        assert body["input"][1]["content"].endswith("Methods\nText")
+        assert body["text"]["format"]["name"] == "ScreeningDecision"
+        assert body["prompt_cache_key"] == "fulltext_screen"
+
+
 class TestPrepareExtractionBody:
     def test_returns_structured_payload(self, mock_openai_manager):
         body = mock_openai_manager.prepare_extraction_body("file_123")
@@ -253,6 +280,34 @@ class TestRetrieveBatch:
         assert result.status == "completed"
 
 
+class TestIterFileLines:
+    def test_streams_lines(self, mock_openai_manager):
+        class FakeStream:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                return False
+
+            def iter_lines(self):
+                yield '{"custom_id": "abstract-1"}'
+                yield '{"custom_id": "abstract-2"}'
+
+        requested = []
+
+        class StreamingFiles:
+            def content(self, file_id):
+                requested.append(file_id)
+                return FakeStream()
+
+        mock_openai_manager.client.files.with_streaming_response = StreamingFiles()
+
+        lines = list(mock_openai_manager.iter_file_lines("output_123"))
+
+        assert requested == ["output_123"]
+        assert lines == ['{"custom_id": "abstract-1"}', '{"custom_id": "abstract-2"}']
+
+
 class TestBuildAbstractPrompt:
     def test_includes_criteria(self, mock_openai_manager):
         messages = mock_openai_manager._build_abstract_prompt("Test abstract")
@@ -269,8 +324,8 @@ class TestBuildFulltextPrompt:
     def test_includes_file_reference(self, mock_openai_manager):
         messages = mock_openai_manager._build_fulltext_prompt("file_abc")
 
-        # Should have 3 messages (system, user with file, system again)
-        assert len(messages) == 3
+        # The criteria are sent once, ahead of the file
+        assert len(messages) == 2
         assert messages[0]["role"] == "system"
         assert messages[1]["role"] == "user"
         # User message should contain file reference
@@ -278,6 +333,160 @@ class TestBuildFulltextPrompt:
         assert messages[1]["content"][0]["file_id"] == "file_abc"
 
 
+class TestStructuredPayloadCaching:
+    def test_schema_is_generated_once_per_model(self, mock_openai_manager):
+        openai.OpenAIManager._text_format.cache_clear()
+
+        with patch.object(
+            ScreeningDecision,
+            "model_json_schema",
+            return_value={"type": "object"},
+        ) as mock_schema:
+            first = mock_openai_manager.prepare_abstract_body("One")
+            second = mock_openai_manager.prepare_abstract_body("Two")
+
+        openai.OpenAIManager._text_format.cache_clear()
+        mock_schema.assert_called_once()
+        assert first["text"] is second["text"]
+
+    def test_serialized_row_round_trips(self, mock_openai_manager):
+        body = mock_openai_manager.prepare_abstract_body('Quotes " and\nnewlines')
+        row = mock_openai_manager.create_batch_row("abstract-1", body)
+
+        line = mock_openai_manager.serialize_batch_row(row)
+
+        assert "\n" not in line
+        assert json.loads(line) == row
+
+    def test_shared_body_is_serialized_once(self, mock_openai_manager):
+        rows = [
+            mock_openai_manager.create_batch_row(
+                f"abstract-{i}", mock_openai_manager.prepare_abstract_body(f"A{i}")
+            )
+            for i in range(3)
+        ]
+
+        with patch.object(openai.json, "dumps", wraps=openai.json.dumps) as mock_dumps:
+            lines = [mock_openai_manager.serialize_batch_row(row) for row in rows]
+
+        # One template, then custom_id, method, url and input for each row
+        assert mock_dumps.call_count == 1 + 4 * len(rows)
+        assert [json.loads(line) for line in lines] == rows
+
+    def test_templates_are_kept_per_stage(self, mock_openai_manager):
+        abstract = mock_openai_manager.create_batch_row(
+            "abstract-1", mock_openai_manager.prepare_abstract_body("A")
+        )
+        extraction = mock_openai_manager.create_batch_row(
+            "extraction-1", mock_openai_manager.prepare_extraction_body("file_1")
+        )
+
+        mock_openai_manager.serialize_batch_row(abstract)
+        line = mock_openai_manager.serialize_batch_row(extraction)
+
+        assert json.loads(line) == extraction
+        assert len(mock_openai_manager._row_templates) == 2
+
+
+class TestPromptCaching:
+    def test_static_prefix_is_shared_across_articles(self, mock_openai_manager):
+        first = mock_openai_manager.prepare_abstract_body("First abstract")
+        second = mock_openai_manager.prepare_abstract_body("Second abstract")
+
+        assert first["input"][0] == second["input"][0]
+        assert first["input"][0]["content"] is second["input"][0]["content"]
+        assert first["prompt_cache_key"] == "abstract_screen"
+
+    def test_prefix_matches_criteria_prompt(self, mock_openai_manager):
+        prompt = mock_openai_manager._abstract_prompt
+
+        assert prompt.startswith(openai.STUDY_OBJECTIVES)
+        assert prompt.endswith(openai.ABSTRACT_SCREENING_INSTRUCTIONS)
+        assert "1. " + openai.INCLUSION_CRITERIA[0] in prompt
+
+    def test_payloads_use_per_stage_cache_keys(self, mock_openai_manager):
+        fulltext = mock_openai_manager.prepare_fulltext_body("file_1")
+        extraction = mock_openai_manager.prepare_extraction_body("file_1")
+
+        assert fulltext["prompt_cache_key"] == "fulltext_screen"
+        assert extraction["prompt_cache_key"] == "extraction"
+        assert fulltext["input"][-1]["role"] == "user"
+
+
+class TestPromptVersion:
+    def test_is_stable_for_the_same_prompt(self, mock_openai_manager):
+        other = openai.OpenAIManager(api_key="test_key")
+
+        assert other.prompt_versions == mock_openai_manager.prompt_versions
+
+    def test_changes_with_the_model(self, mock_openai_manager):
+        other = openai.OpenAIManager(api_key="test_key", model="other-model")
+
+        for stage, version in mock_openai_manager.prompt_versions.items():
+            assert other.prompt_versions[stage] != version
+
+    def test_changes_with_the_criteria(self, mock_openai_manager, monkeypatch):
+        criteria = [*openai.EXCLUSION_CRITERIA, "Published before 2000"]
+        monkeypatch.setattr(openai, "EXCLUSION_CRITERIA", criteria)
+        other = openai.OpenAIManager(api_key="test_key")
+
+        versions = mock_openai_manager.prompt_versions
+        assert other.prompt_versions["abstract_screen"] != versions["abstract_screen"]
+        assert other.prompt_versions["fulltext_screen"] != versions["fulltext_screen"]
+        assert other.prompt_versions["extraction"] == versions["extraction"]
+
+
+class TestRateLimiting:
+    def test_estimates_text_and_file_tokens(self):
+        inputs = [
+            {"role": "system", "content": "x" * 400},
+            {
+                "role": "user",
+                "content": [{"type": "input_file", "file_id": "file_1"}],
+            },
+        ]
+
+        tokens = openai.OpenAIManager.estimate_tokens(inputs)
+
+        assert tokens == 400 // openai.OPENAI_CHARS_PER_TOKEN + openai.OPENAI_PDF_TOKENS
+
+    def test_direct_calls_acquire_budget(self, mock_openai_manager):
+        mock_openai_manager.rate_limiter = MagicMock()
+
+        mock_openai_manager.screen_record_abstract("An abstract")
+
+        (tokens,) = mock_openai_manager.rate_limiter.acquire.call_args.args
+        assert tokens > len("An abstract") // openai.OPENAI_CHARS_PER_TOKEN
+
+    def test_estimates_pdf_tokens_from_page_count(self):
+        with patch.object(openai, "pdf_page_count", return_value=12):
+            tokens = openai.OpenAIManager.estimate_pdf_tokens("paper.pdf")
+
+        assert tokens == 12 * openai.OPENAI_PDF_TOKENS_PER_PAGE
+
+    def test_unreadable_pdf_uses_default_estimate(self):
+        with patch.object(openai, "pdf_page_count", return_value=None):
+            tokens = openai.OpenAIManager.estimate_pdf_tokens("paper.pdf")
+
+        assert tokens == openai.OPENAI_PDF_TOKENS
+
+    def test_observes_rate_limits_of_responses(self, mock_openai_manager):
+        mock_openai_manager.rate_limiter = MagicMock()
+        headers = {"x-ratelimit-remaining-tokens": "10"}
+
+        for url in (
+            "https://api.openai.com/v1/responses",
+            "https://api.openai.com/v1/files",
+        ):
+            response = httpx.Response(
+                200, headers=headers, request=httpx.Request("POST", url)
+            )
+            mock_openai_manager._observe_rate_limits(response)
+
+        (observed,) = mock_openai_manager.rate_limiter.observe.call_args_list
+        assert observed.args[0]["x-ratelimit-remaining-tokens"] == "10"
+
+
 class TestNumberCriteria:
     def test_numbers_criteria_list(self):
         criteria = ["First criterion", "Second criterion", "Third criterion"]
@@ -0,0 +1,114 @@
+"""Tests for local fulltext text extraction."""
+
+from unittest.mock import patch
+
+import pytest
+
+from bigger_picker import pdftext
+from bigger_picker.pdftext import PdfTextCache, trim_sections
+
+PAPER = """Screen time and sleep in children
+Abstract
+We studied screens.
+1. Introduction
+Screens are everywhere.
+2. Methods
+2.1 Participants
+We recruited 500 children.
+Measures:
+Parents reported screen time.
+3. Results
+Children slept less.
+Data Availability Statement
+Data are available on request.
+References
+Smith 2020.
+"""
+
+
+class TestTrimSections:
+    def test_keeps_wanted_sections(self):
+        trimmed = trim_sections(PAPER)
+
+        assert trimmed == (
+            "2. Methods\n"
+            "2.1 Participants\n"
+            "We recruited 500 children.\n"
+            "Measures:\n"
+            "Parents reported screen time.\n"
+            "Data Availability Statement\n"
+            "Data are available on request."
+        )
+
+    def test_selects_named_sections(self):
+        trimmed = trim_sections(PAPER, sections=["data availability"])
+
+        assert trimmed == "Data Availability Statement\nData are available on request."
+
+    def test_returns_none_without_wanted_sections(self):
+        assert trim_sections("Abstract\nJust an abstract.\nReferences") is None
+
+    def test_truncates_to_max_chars(self):
+        assert trim_sections(PAPER, max_chars=10) == "2. Methods"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with patch("bigger_picker.pdftext._require_pypdf"):
+        yield PdfTextCache(str(tmp_path / "cache"), max_workers=1)
+
+
+@pytest.fixture
+def pdfs(tmp_path):
+    paths = []
+    for i in range(2):
+        path = tmp_path / f"paper{i}.pdf"
+        path.write_bytes(f"%PDF-1.4 paper {i}".encode())
+        paths.append(str(path))
+    return paths
+
+
+class TestPdfTextCache:
+    def test_requires_pypdf(self, tmp_path):
+        with patch.dict("sys.modules", {"pypdf": None}):
+            with pytest.raises(RuntimeError, match="pypdf"):
+                PdfTextCache(str(tmp_path / "cache"))
+
+    def test_extracts_and_trims(self, cache, pdfs):
+        with patch.object(pdftext, "extract_pdf_text", return_value=PAPER):
+            texts = cache.get_texts(pdfs)
+
+        assert set(texts) == set(pdfs)
+        assert texts[pdfs[0]].startswith("2. Methods")
+
+    def test_reuses_cached_text(self, cache, pdfs):
+        with patch.object(
+            pdftext, "extract_pdf_text", return_value=PAPER
+        ) as mock_extract:
+            cache.get_texts(pdfs)
+            cache.get_texts(pdfs)
+            text = cache.get_text(pdfs[0])
+
+        assert mock_extract.call_count == 2
+        assert text.startswith("2. Methods")
+
+    def test_cache_is_keyed_by_content(self, cache, pdfs, tmp_path):
+        copy = tmp_path / "copy.pdf"
+        copy.write_bytes(open(pdfs[0], "rb").read())
+
+        with patch.object(
+            pdftext, "extract_pdf_text", return_value=PAPER
+        ) as mock_extract:
+            cache.get_text(pdfs[0])
+            cache.get_text(str(copy))
+
+        mock_extract.assert_called_once()
+
+    def test_failed_extraction_is_not_cached(self, cache, pdfs):
+        with patch.object(
+            pdftext, "extract_pdf_text", side_effect=ValueError("bad pdf")
+        ):
+            assert cache.get_text(pdfs[0]) is None
+
+        with patch.object(pdftext, "extract_pdf_text", return_value=PAPER):
+            assert cache.get_text(pdfs[0]) is not None
@@ -0,0 +1,104 @@
+"""Tests for the local abstract pre-screen."""
+
+from bigger_picker.prescreen import AbstractPrescreen, prescreen_text
+
+
+class TestAbstractPrescreen:
+    def test_excludes_adult_only_samples(self):
+        rules = AbstractPrescreen().screen(
+            ["We surveyed 400 university students about social media use."]
+        )
+
+        assert rules[0]["reason"] == "Adult-only sample"
+
+    def test_keeps_samples_that_mention_children(self):
+        rules = AbstractPrescreen().screen(
+            ["Parents and their children aged 8-12 reported daily TV time."]
+        )
+
+        assert rules == [None]
+
+    def test_excludes_samples_described_as_adults(self):
+        rules = AbstractPrescreen().screen(
+            [
+                "A sample of 300 older adults reported daily TV time.",
+                "Participants were nurses working night shifts.",
+            ]
+        )
+
+        assert [r["reason"] for r in rules] == ["Adult-only sample"] * 2
+
+    def test_keeps_child_samples_compared_with_adults(self):
+        rules = AbstractPrescreen().screen(
+            [
+                "We surveyed 1,200 12-year-olds about gaming; unlike adults, "
+                "heavy players slept less.",
+                "Screen time among 9-10 year olds rose over two years. Compared "
+                "with adults, use was higher on weekends.",
+                "We followed eighth-grade students for a year. As older adults "
+                "report, evening use delayed sleep.",
+            ]
+        )
+
+        assert rules == [None, None, None]
+
+    def test_excludes_reviews_but_not_primary_studies(self):
+        rules = AbstractPrescreen().screen(
+            [
+                "A systematic review and meta-analysis of screen time in youth.",
+                "A longitudinal cohort of adolescents; results are compared with "
+                "a previous meta-analysis.",
+            ]
+        )
+
+        assert rules[0]["reason"] == "Review rather than primary study"
+        assert rules[1] is None
+
+    def test_keeps_primary_studies_that_cite_reviews(self):
+        rules = AbstractPrescreen().screen(
+            [
+                "Screen use and sleep\nWe randomised 120 children to two arms, "
+                "following a recent systematic review.",
+                "Screen use and sleep\nThis study examined 500 adolescents; "
+                "meta-analyses have reported mixed effects.",
+                "Screen use and sleep\nPrevious systematic reviews disagree, so we "
+                "measured bedtime media use.",
+            ]
+        )
+
+        assert rules == [None, None, None]
+
+    def test_excludes_abstracts_describing_their_own_review(self):
+        rules = AbstractPrescreen().screen(
+            [
+                "Screen use and sleep\nWe conducted a systematic review of 40 studies.",
+                "Screen use and sleep\nThis meta-analysis pooled 30 studies.",
+            ]
+        )
+
+        assert [r["reason"] for r in rules] == ["Review rather than primary study"] * 2
+
+    def test_is_case_insensitive_and_handles_missing_text(self):
+        rules = AbstractPrescreen().screen(["SYSTEMATIC REVIEW of apps", None, ""])
+
+        assert rules[0] is not None
+        assert rules[1:] == [None, None]
+
+    def test_first_matching_rule_wins(self):
+        prescreen = AbstractPrescreen(
+            [
+                {"reason": "first", "exclude": r"\bscreen\b"},
+                {"reason": "second", "exclude": r"\btime\b"},
+            ]
+        )
+
+        rules = prescreen.screen(["screen time", "time only", "neither"])
+
+        assert [r and r["reason"] for r in rules] == ["first", "second", None]
+
+
+def test_prescreen_text_joins_title_and_abstract():
+    article = {"title": "Title", "abstracts": [{"content": "Abstract"}]}
+
+    assert prescreen_text(article) == "Title\nAbstract"
+    assert prescreen_text({"abstracts": []}) == "\n"
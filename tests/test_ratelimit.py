@@ -0,0 +1,149 @@
+"""Tests for the request and token rate limiter."""
+
+import threading
+
+from bigger_picker.ratelimit import RateLimiter, parse_reset
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def limiter(clock, **budgets):
+    return RateLimiter(clock=clock, sleep=clock.sleep, **budgets)
+
+
+class TestRateLimiter:
+    def test_unlimited_never_waits(self):
+        clock = FakeClock()
+        rate = limiter(clock)
+
+        for _ in range(1000):
+            rate.acquire(10_000)
+
+        assert clock.sleeps == []
+
+    def test_waits_for_request_budget(self):
+        clock = FakeClock()
+        rate = limiter(clock, requests_per_minute=2)
+
+        rate.acquire()
+        clock.now = 10
+        rate.acquire()
+        waited = rate.acquire()
+
+        assert waited == 50
+        assert clock.now == 60
+
+    def test_waits_for_token_budget(self):
+        clock = FakeClock()
+        rate = limiter(clock, tokens_per_minute=1000)
+
+        rate.acquire(600)
+        clock.now = 5
+        rate.acquire(300)
+        clock.now = 20
+        waited = rate.acquire(300)
+
+        # Only the first call has to expire to make room
+        assert waited == 40
+
+    def test_oversized_call_waits_for_an_empty_window(self):
+        clock = FakeClock()
+        rate = limiter(clock, tokens_per_minute=1000)
+
+        rate.acquire(100)
+        clock.now = 30
+        assert rate.acquire(5000) == 30
+        assert rate.acquire(10) == 60
+
+    def test_is_thread_safe(self):
+        rate = RateLimiter(requests_per_minute=50)
+        threads = [threading.Thread(target=rate.acquire) for _ in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(rate._calls) == 50
+
+
+class TestObserve:
+    def test_adopts_reported_limits_below_the_configured_ones(self):
+        rate = RateLimiter(requests_per_minute=500, tokens_per_minute=500_000)
+
+        rate.observe(
+            {"x-ratelimit-limit-requests": "100", "x-ratelimit-limit-tokens": "1000000"}
+        )
+        assert rate.requests_per_minute == 100
+        assert rate.tokens_per_minute == 500_000
+
+        rate.observe({"x-ratelimit-limit-requests": "5000"})
+        assert rate.requests_per_minute == 500
+
+    def test_adopts_reported_limits_when_unconfigured(self):
+        rate = RateLimiter()
+
+        rate.observe({"x-ratelimit-limit-tokens": "30000"})
+
+        assert rate.tokens_per_minute == 30_000
+
+    def test_pauses_until_exhausted_limit_resets(self):
+        clock = FakeClock()
+        rate = limiter(clock)
+
+        rate.acquire(100)
+        rate.observe(
+            {
+                "x-ratelimit-remaining-tokens": "50",
+                "x-ratelimit-reset-tokens": "6m0s",
+                "x-ratelimit-remaining-requests": "10",
+                "x-ratelimit-reset-requests": "1s",
+            }
+        )
+
+        assert rate.acquire(100) == 360
+
+    def test_zero_request_limit_pauses_until_reset(self):
+        clock = FakeClock()
+        rate = limiter(clock, requests_per_minute=60)
+
+        rate.acquire()
+        rate.observe(
+            {"x-ratelimit-limit-requests": "0", "x-ratelimit-reset-requests": "20s"}
+        )
+
+        assert rate.requests_per_minute == 60
+        assert rate.acquire() == 20
+
+    def test_does_not_pause_with_budget_left(self):
+        clock = FakeClock()
+        rate = limiter(clock)
+
+        rate.acquire(100)
+        rate.observe(
+            {"x-ratelimit-remaining-tokens": "5000", "x-ratelimit-reset-tokens": "2s"}
+        )
+
+        assert rate.acquire(100) == 0
+
+
+class TestParseReset:
+    def test_parses_units(self):
+        assert parse_reset("1s") == 1
+        assert parse_reset("6m0s") == 360
+        assert parse_reset("20ms") == 0.02
+        assert parse_reset("1h2m3.5s") == 3723.5
+
+    def test_missing_or_invalid(self):
+        assert parse_reset(None) is None
+        assert parse_reset("soon") is None
@@ -1,6 +1,9 @@
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pytest
 import requests
@@ -91,7 +94,6 @@ def test_download_pdf_success_and_no_url(monkeypatch, tmp_path):
                 raise requests.HTTPError()
 
     dummy = DummyResponse(b"binarypdf")
-    monkeypatch.setattr("bigger_picker.rayyan.requests.get", lambda url: dummy)
 
     # Mock tempfile.mkdtemp to use tmp_path
     monkeypatch.setattr("bigger_picker.rayyan.tempfile.mkdtemp", lambda: str(tmp_path))
@@ -104,6 +106,7 @@ def test_download_pdf_success_and_no_url(monkeypatch, tmp_path):
     monkeypatch.setenv("RAYYAN_JSON_PATH", str(fake_path))
     manager = RayyanManager()
     manager.rayyan_instance = mock_rayyan_instance
+    monkeypatch.setattr(manager.session, "get", lambda url: dummy)
 
     path = manager.download_pdf(article)
 
@@ -326,7 +329,8 @@ class TestRetryOnAuthError:
 
         # Mock token refresh
         monkeypatch.setattr(
-            "bigger_picker.rayyan.requests.post",
+            mock_manager.session,
+            "post",
             lambda url, data: MagicMock(
                 ok=True, json=lambda: {"refresh_token": "new", "access_token": "new"}
             ),
@@ -343,7 +347,8 @@ class TestRetryOnAuthError:
             raise requests.HTTPError(response=response)
 
         monkeypatch.setattr(
-            "bigger_picker.rayyan.requests.post",
+            mock_manager.session,
+            "post",
             lambda url, data: MagicMock(
                 ok=True, json=lambda: {"refresh_token": "new", "access_token": "new"}
             ),
@@ -351,3 +356,312 @@ class TestRetryOnAuthError:
 
         with pytest.raises(requests.HTTPError):
             mock_manager._retry_on_auth_error(always_fail, max_retries=3)
+
+    @staticmethod
+    def _http_error(status_code):
+        return requests.HTTPError(response=MagicMock(status_code=status_code))
+
+    def test_retries_server_errors_with_backoff(self, mock_manager, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr("bigger_picker.rayyan.time.sleep", sleeps.append)
+        operation = MagicMock(
+            side_effect=[self._http_error(503), requests.Timeout(), "success"]
+        )
+
+        assert mock_manager._retry_on_auth_error(operation) == "success"
+        assert len(sleeps) == 2
+        assert 0 <= sleeps[0] <= config.RAYYAN_RETRY_BACKOFF
+        assert 0 <= sleeps[1] <= config.RAYYAN_RETRY_BACKOFF * 2
+
+    def test_does_not_retry_client_errors(self, mock_manager):
+        operation = MagicMock(side_effect=self._http_error(404))
+
+        with pytest.raises(requests.HTTPError):
+            mock_manager._retry_on_auth_error(operation)
+        assert operation.call_count == 1
+
+    def test_raises_last_timeout(self, mock_manager, monkeypatch):
+        monkeypatch.setattr("bigger_picker.rayyan.time.sleep", lambda s: None)
+        operation = MagicMock(side_effect=requests.Timeout())
+
+        with pytest.raises(requests.Timeout):
+            mock_manager._retry_on_auth_error(operation, max_retries=2)
+        assert operation.call_count == 2
+
+    def test_does_not_retry_notes_on_timeouts_or_server_errors(self, mock_manager):
+        for error in (requests.Timeout(), self._http_error(503)):
+            mock_manager.notes_instance.create_note.reset_mock()
+            mock_manager.notes_instance.create_note.side_effect = error
+
+            with pytest.raises(type(error)):
+                mock_manager.create_article_note(123, "note")
+            assert mock_manager.notes_instance.create_note.call_count == 1
+
+    def test_retries_notes_on_401(self, mock_manager):
+        mock_manager.notes_instance.create_note.side_effect = [
+            self._http_error(401),
+            None,
+        ]
+
+        with patch.object(mock_manager, "_refresh_tokens") as mock_refresh:
+            mock_manager.create_article_note(123, "note")
+
+        mock_refresh.assert_called_once()
+        assert mock_manager.notes_instance.create_note.call_count == 2
+
+    def test_concurrent_auth_errors_refresh_once(self, mock_manager):
+        barrier = threading.Barrier(4)
+        refreshed = threading.Event()
+
+        def operation():
+            if refreshed.is_set():
+                return "success"
+            barrier.wait(timeout=5)
+            raise self._http_error(401)
+
+        def refresh(update_local=True):
+            refreshed.set()
+            mock_manager._token_generation += 1
+
+        with patch.object(mock_manager, "_refresh_tokens", side_effect=refresh) as m:
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                results = list(
+                    pool.map(
+                        lambda _: mock_manager._retry_on_auth_error(operation),
+                        range(4),
+                    )
+                )
+
+        assert results == ["success"] * 4
+        m.assert_called_once()
+
+
+class TestTokenExpiry:
+    def test_reads_expiry_from_credentials(self, tmp_path):
+        creds = tmp_path / "creds.json"
+        creds.write_text(json.dumps({"expires_in": 7200, "created_at": 1000}))
+
+        assert RayyanManager._read_token_expiry(str(creds)) == 8200
+
+    def test_unknown_expiry(self, tmp_path):
+        creds = tmp_path / "creds.json"
+        creds.write_text(json.dumps({"refresh_token": "x"}))
+
+        assert RayyanManager._read_token_expiry(str(creds)) is None
+        assert RayyanManager._read_token_expiry(str(tmp_path / "missing")) is None
+
+    def test_refreshes_ahead_of_expiry(self, mock_manager):
+        mock_manager._token_expires_at = time.time() + 10
+
+        with patch.object(mock_manager, "_refresh_tokens") as mock_refresh:
+            mock_manager._retry_on_auth_error(lambda: "success")
+
+        mock_refresh.assert_called_once()
+
+    def test_no_refresh_when_token_is_fresh(self, mock_manager):
+        mock_manager._token_expires_at = time.time() + 3600
+
+        with patch.object(mock_manager, "_refresh_tokens") as mock_refresh:
+            mock_manager._retry_on_auth_error(lambda: "success")
+
+        mock_refresh.assert_not_called()
+
+    def test_refresh_records_new_expiry(self, mock_manager, monkeypatch):
+        monkeypatch.setattr(
+            mock_manager.session,
+            "post",
+            lambda url, data: MagicMock(
+                ok=True,
+                json=lambda: {
+                    "refresh_token": "new",
+                    "access_token": "new",
+                    "expires_in": 7200,
+                    "created_at": 5000,
+                },
+            ),
+        )
+
+        mock_manager._refresh_tokens()
+
+        assert mock_manager._token_expires_at == 12200
+        assert mock_manager._token_generation == 1
+
+    def test_sdk_refresh_records_new_expiry(self, mock_manager):
+        request = mock_manager.rayyan_instance.request
+        sdk_refresh = MagicMock(
+            side_effect=lambda: Path(mock_manager._rayyan_creds_path).write_text(
+                json.dumps({"expires_in": 7200, "created_at": 5000})
+            )
+        )
+        request._refresh_credentials = sdk_refresh
+        mock_manager.rayyan_instance = mock_manager._create_rayyan(
+            mock_manager._rayyan_creds_path
+        )
+
+        mock_manager.rayyan_instance.request._refresh_credentials()
+
+        sdk_refresh.assert_called_once()
+        assert mock_manager._token_expires_at == 12200
+        assert mock_manager._token_generation == 1
+
+
+class TestDoiIndex:
+    @pytest.fixture
+    def manager(self, mock_manager, tmp_path):
+        mock_manager.doi_index_path = str(tmp_path / "doi_index.json")
+        return mock_manager
+
+    @staticmethod
+    def _review(records):
+        def results(review_id, params):
+            start = params["start"]
+            return {
+                "recordsTotal": len(records),
+                "data": records[start : start + params["length"]],
+            }
+
+        return results
+
+    def test_builds_index_from_all_records(self, manager):
+        records = [
+            {"id": 1, "doi": "https://doi.org/10.1/A"},
+            {"id": 2, "doi": None},
+            {"id": 3, "doi": "10.1/b"},
+            {"id": 4, "doi": "10.1/a"},
+        ]
+        manager.review.results.side_effect = self._review(records)
+
+        dois = manager.refresh_doi_index(batch_size=2)
+
+        assert dois == {"10.1/a": [1, 4], "10.1/b": [3]}
+        saved = json.loads(Path(manager.doi_index_path).read_text())
+        assert saved["records_indexed"] == 4
+        assert saved["last_record_id"] == 4
+        assert saved["review_id"] == manager.review_id
+
+    def test_refresh_only_fetches_new_records(self, manager):
+        records = [{"id": 1, "doi": "10.1/a"}, {"id": 2, "doi": "10.1/b"}]
+        manager.review.results.side_effect = self._review(records)
+        manager.refresh_doi_index()
+
+        records.append({"id": 3, "doi": "10.1/c"})
+        manager.review.results.reset_mock()
+        dois = manager.refresh_doi_index()
+
+        starts = [c.args[1]["start"] for c in manager.review.results.call_args_list]
+        assert starts == [1, 2]
+        assert dois["10.1/c"] == [3]
+        assert dois["10.1/a"] == [1]
+
+    def test_rebuilds_when_review_shrinks(self, manager):
+        records = [{"id": 1, "doi": "10.1/a"}, {"id": 2, "doi": "10.1/b"}]
+        manager.review.results.side_effect = self._review(records)
+        manager.refresh_doi_index()
+
+        del records[0]
+        dois = manager.refresh_doi_index()
+
+        assert dois == {"10.1/b": [2]}
+
+    def test_rebuilds_when_records_are_replaced(self, manager):
+        records = [{"id": 1, "doi": "10.1/a"}, {"id": 2, "doi": "10.1/b"}]
+        manager.review.results.side_effect = self._review(records)
+        manager.refresh_doi_index()
+
+        # Same count as before, but the offsets no longer line up
+        del records[0]
+        records.append({"id": 3, "doi": "10.1/c"})
+        dois = manager.refresh_doi_index()
+
+        assert dois == {"10.1/b": [2], "10.1/c": [3]}
+
+    def test_find_articles_by_doi(self, manager):
+        records = [{"id": 1, "doi": "10.1/a"}, {"id": 2, "doi": "10.1/b"}]
+        manager.review.results.side_effect = self._review(records)
+        manager.refresh_doi_index()
+
+        # A fresh manager reads the persisted index without calling Rayyan
+        manager._doi_index = None
+        manager.review.results.reset_mock()
+        matches = manager.find_articles_by_doi(["https://doi.org/10.1/A", "10.1/z"])
+
+        assert matches == {"10.1/a": [1]}
+        manager.review.results.assert_not_called()
+
+
+class TestBulkUpdateArticleLabels:
+    def test_groups_additions_into_bulk_calls(self, mock_manager):
+        failures = mock_manager.bulk_update_article_labels(
+            [(1, {"Pending": 1}), (2, {"Pending": 1}), (3, {"Other": 1})]
+        )
+
+        assert failures == {}
+        calls = {
+            (c.args[1], c.args[2]): c.args[3]
+            for c in mock_manager.review.bulk_customizations.call_args_list
+        }
+        assert calls == {("Pending", 1): [1, 2], ("Other", 1): [3]}
+        mock_manager.review.customize.assert_not_called()
+
+    def test_removals_are_sent_per_article(self, mock_manager):
+        mock_manager.bulk_update_article_labels(
+            [(1, {"Included": 1, "Pending": -1}), (2, {"Pending": -1})]
+        )
+
+        mock_manager.review.bulk_customizations.assert_called_once_with(
+            mock_manager.review_id, "Included", 1, [1]
+        )
+        customized = sorted(
+            (c.args[1], c.args[2]) for c in mock_manager.review.customize.call_args_list
+        )
+        assert customized == [(1, {"Pending": -1}), (2, {"Pending": -1})]
+
+    def test_coalesces_plans_for_the_same_article(self, mock_manager):
+        mock_manager.bulk_update_article_labels(
+            [(1, {"Pending": 1}), (1, {"Pending": -1, "Done": 1})]
+        )
+
+        mock_manager.review.bulk_customizations.assert_called_once_with(
+            mock_manager.review_id, "Done", 1, [1]
+        )
+        mock_manager.review.customize.assert_called_once_with(
+            mock_manager.review_id, 1, {"Pending": -1}
+        )
+
+    def test_chunks_large_bulk_calls(self, mock_manager):
+        mock_manager.bulk_update_article_labels(
+            [(i, {"Pending": 1}) for i in range(5)], chunk_size=2
+        )
+
+        chunks = sorted(
+            c.args[3] for c in mock_manager.review.bulk_customizations.call_args_list
+        )
+        assert chunks == [[0, 1], [2, 3], [4]]
+
+    def test_returns_failed_articles(self, mock_manager):
+        def fail_for_other(review_id, label, value, article_ids):
+            if label == "Other":
+                raise ValueError("boom")
+
+        mock_manager.review.bulk_customizations.side_effect = fail_for_other
+
+        failures = mock_manager.bulk_update_article_labels(
+            [(1, {"Pending": 1}), (2, {"Other": 1}), (3, {"Other": 1})]
+        )
+
+        assert set(failures) == {2, 3}
+        assert isinstance(failures[2], ValueError)
+
+    def test_retries_after_auth_error(self, mock_manager):
+        response = MagicMock(status_code=401)
+        mock_manager.review.bulk_customizations.side_effect = [
+            requests.HTTPError(response=response),
+            {},
+        ]
+
+        with patch.object(mock_manager, "_refresh_tokens") as mock_refresh:
+            failures = mock_manager.bulk_update_article_labels([(1, {"Pending": 1})])
+
+        assert failures == {}
+        mock_refresh.assert_called_once()
+        assert mock_manager.review.bulk_customizations.call_count == 2
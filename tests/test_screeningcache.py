@@ -0,0 +1,73 @@
+"""Tests for the abstract screening decision cache."""
+
+import json
+
+from bigger_picker.screeningcache import ScreeningCache
+
+DECISION = {"vote": "exclude", "rationale": "Adults only"}
+
+
+class TestScreeningCache:
+    def test_put_and_get(self, tmp_path):
+        cache = ScreeningCache(str(tmp_path / "cache.jsonl"))
+
+        cache.put("v1:abc", DECISION)
+
+        assert cache.get("v1:abc") == DECISION
+        assert cache.get("v2:abc") is None
+
+    def test_resolves_pending_articles(self, tmp_path):
+        cache = ScreeningCache(str(tmp_path / "cache.jsonl"))
+        cache.expect({1: "v1:abc", 2: "v1:def"})
+
+        cache.resolve(1, DECISION)
+        cache.resolve(3, {"vote": "include"})
+
+        assert cache.get("v1:abc") == DECISION
+        assert cache.get("v1:def") is None
+
+    def test_reloads_from_disk(self, tmp_path):
+        path = str(tmp_path / "cache.jsonl")
+        cache = ScreeningCache(path)
+        cache.put("v1:abc", DECISION)
+        cache.expect({2: "v1:def"})
+
+        reloaded = ScreeningCache(path)
+        reloaded.resolve(2, {"vote": "include"})
+
+        assert reloaded.get("v1:abc") == DECISION
+        assert reloaded.get("v1:def") == {"vote": "include"}
+
+    def test_tracks_pending_keys(self, tmp_path):
+        path = str(tmp_path / "cache.jsonl")
+        cache = ScreeningCache(path)
+        cache.expect({1: "v1:abc", 2: "v1:def"})
+
+        cache.resolve(1, DECISION)
+        cache.release(2)
+        cache.expect({3: "v1:ghi"})
+
+        assert not cache.is_pending("v1:abc")
+        assert not cache.is_pending("v1:def")
+        assert cache.is_pending("v1:ghi")
+        assert ScreeningCache(path).is_pending("v1:ghi")
+        assert cache.get("v1:def") is None
+
+    def test_ignores_decisions_without_a_valid_vote(self, tmp_path):
+        cache = ScreeningCache(str(tmp_path / "cache.jsonl"))
+        cache.expect({1: "v1:abc"})
+
+        cache.put("v1:def", {"vote": "unsure"})
+        cache.resolve(1, {"vote": "unsure"})
+
+        assert cache.get("v1:abc") is None
+        assert cache.get("v1:def") is None
+        assert not cache.is_pending("v1:abc")
+
+    def test_skips_partial_lines(self, tmp_path):
+        path = tmp_path / "cache.jsonl"
+        path.write_text(
+            json.dumps({"key": "v1:abc", "decision": DECISION}) + "\n" + '{"key": "v'
+        )
+
+        assert ScreeningCache(str(path)).get("v1:abc") == DECISION
@@ -0,0 +1,111 @@
+from unittest.mock import MagicMock, patch
+
+import asana
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+
+import bigger_picker.config as config
+import bigger_picker.sessions as sessions
+
+
+class TestCreateSession:
+    def test_mounts_pooled_adapter(self):
+        session = sessions.create_session(pool_size=7, max_retries=2)
+
+        adapter = session.get_adapter("https://rayyan.ai")
+        assert isinstance(adapter, sessions.TimeoutHTTPAdapter)
+        assert adapter._pool_maxsize == 7
+        assert adapter.max_retries.total == 2
+        assert session.get_adapter("http://localhost") is adapter
+
+    def test_configure_session_keeps_existing_headers(self):
+        session = requests.Session()
+        session.headers["Authorization"] = "Bearer x"
+
+        sessions.configure_session(session)
+
+        assert session.headers["Authorization"] == "Bearer x"
+        assert isinstance(
+            session.get_adapter("https://api.airtable.com"),
+            sessions.TimeoutHTTPAdapter,
+        )
+
+    def test_mount_transport_replaces_adapter(self):
+        session = sessions.create_session()
+        transport = MagicMock()
+
+        sessions.mount_transport(session, transport)
+
+        assert session.get_adapter("https://rayyan.ai") is transport
+        assert session.get_adapter("http://localhost") is transport
+
+
+class TestTimeoutHTTPAdapter:
+    def test_applies_default_timeout(self):
+        adapter = sessions.TimeoutHTTPAdapter(timeout=(1, 2))
+
+        with patch.object(HTTPAdapter, "send") as mock_send:
+            adapter.send(MagicMock())
+            adapter.send(MagicMock(), timeout=5)
+
+        assert mock_send.call_args_list[0].kwargs["timeout"] == (1, 2)
+        assert mock_send.call_args_list[1].kwargs["timeout"] == 5
+
+
+class TestRetryStrategy:
+    def test_retries_unprocessed_responses_for_any_method(self):
+        retry = sessions.retry_strategy(3)
+
+        assert retry.is_retry("POST", 429)
+        assert retry.is_retry("PATCH", 503)
+        assert not retry.is_retry("POST", 500)
+
+    def test_does_not_retry_reads(self):
+        assert sessions.retry_strategy(3).read == 0
+
+
+class TestServiceClients:
+    def test_configure_asana(self):
+        configuration = MagicMock()
+
+        sessions.configure_asana(configuration, pool_size=5, max_retries=1)
+
+        assert configuration.connection_pool_maxsize == 5
+        assert configuration.retry_strategy.total == 1
+
+    def test_configure_asana_client_sets_default_timeout(self):
+        configuration = sessions.configure_asana(asana.Configuration(), pool_size=5)
+        client = asana.ApiClient(configuration)
+
+        sessions.configure_asana_client(client, timeout=(2, 7))
+
+        pool = client.rest_client.pool_manager.connection_from_host(
+            "app.asana.com", 443, "https"
+        )
+        assert pool.timeout.connect_timeout == 2
+        assert pool.timeout.read_timeout == 7
+        assert pool.pool.maxsize == 5
+
+    def test_timeout_pool_manager_ignores_none_timeout(self):
+        manager = sessions.TimeoutPoolManager()
+
+        with patch.object(urllib3.PoolManager, "urlopen") as urlopen:
+            manager.urlopen("GET", "https://app.asana.com", timeout=None)
+
+        assert "timeout" not in urlopen.call_args.kwargs
+
+    def test_openai_http_client_uses_timeouts(self):
+        client = sessions.create_openai_http_client()
+
+        assert client.timeout.connect == config.HTTP_CONNECT_TIMEOUT
+        assert client.timeout.read == config.HTTP_READ_TIMEOUT
+        client.close()
+
+    def test_openai_http_client_calls_response_hook(self):
+        on_response = MagicMock()
+
+        client = sessions.create_openai_http_client(on_response=on_response)
+
+        assert client.event_hooks["response"] == [on_response]
+        client.close()
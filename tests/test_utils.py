@@ -921,6 +921,35 @@ def test_create_stats_table_with_pending_batches():
     assert len(table.rows) > 0
 
 
+def test_create_stats_table_with_throughput():
+    from datetime import datetime
+
+    stats = {
+        "start_time": datetime.now(),
+        "status": "[green]Idle[/green]",
+        "platforms": "All",
+        "last_check": {"asana": "N/A", "rayyan": "N/A", "openai": "N/A"},
+        "last_sync": {"asana": "N/A", "rayyan": "N/A", "openai": "N/A"},
+        "total_syncs": {"asana": 0, "rayyan": 0, "openai": 0},
+        "total_polls": {"asana": 0, "rayyan": 0, "openai": 0},
+        "pending_batches": {
+            "abstract_screen": 0,
+            "fulltext_screen": 0,
+            "extraction": 0,
+        },
+    }
+    rows_without = len(utils.create_stats_table(stats).rows)
+
+    stats["throughput"] = {
+        "abstract_screen": "-",
+        "fulltext_screen": "-",
+        "extraction": "2.50/s (10 in 4s)",
+    }
+    table = utils.create_stats_table(stats)
+
+    assert len(table.rows) == rows_without + 1
+
+
 def test_identify_duplicate_datasets_edge_case_pairs_none():
     # Test edge case where one of the pair indexes is None
     # This tests lines 289-294 where pairs might be None
@@ -1090,3 +1119,225 @@ def test_compute_dataset_value_synergy_term():
     # So synergy should be approximately 1.0
     assert value > 0
     assert value < 3.0  # Reasonable upper bound
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("10.1000/XYZ", "10.1000/xyz"),
+        ("https://doi.org/10.1000/xyz", "10.1000/xyz"),
+        ("  https://dx.doi.org/10.1000/Abc ", "10.1000/abc"),
+        ("doi:10.1000/xyz", "10.1000/xyz"),
+        ("", None),
+        (None, None),
+        (123, None),
+    ],
+)
+def test_normalize_doi(raw, expected):
+    assert utils.normalize_doi(raw) == expected
+
+
+def test_read_ris_dois(tmp_path):
+    ris = tmp_path / "search.ris"
+    ris.write_text(
+        "TY  - JOUR\n"
+        "TI  - First\n"
+        "DO  - https://doi.org/10.1000/ABC\n"
+        "ER  - \n"
+        "TY  - JOUR\n"
+        "TI  - No DOI\n"
+        "ER  - \n"
+        "TY  - JOUR\n"
+        "DO  - 10.1000/def\n"
+        "ER  - \n"
+    )
+
+    assert utils.read_ris_dois(str(ris)) == {"10.1000/abc", "10.1000/def"}
+
+
+def test_extract_token_usage():
+    item = {
+        "response": {
+            "body": {
+                "usage": {
+                    "input_tokens": 1200,
+                    "input_tokens_details": {"cached_tokens": 1024},
+                }
+            }
+        }
+    }
+
+    assert utils.extract_token_usage(item) == (1200, 1024)
+    assert utils.extract_token_usage({"response": None}) == (0, 0)
+    assert utils.extract_token_usage({"response": {"body": {}}}) == (0, 0)
+
+
+def test_format_cache_ratio():
+    assert utils.format_cache_ratio(2000, 1500) == "75% (1500/2000)"
+    assert utils.format_cache_ratio(0, 0) == "-"
+
+
+def test_group_duplicates_merges_chained_pairs():
+    groups = utils.group_duplicates([("a", "b"), ("c", "d"), ("b", "c"), ("x", "y")])
+
+    assert sorted(groups["a"]) == ["b", "c", "d"]
+    assert sorted(groups["d"]) == ["a", "b", "c"]
+    assert groups["x"] == ["y"]
+    assert "z" not in groups
+
+
+def test_group_duplicates_ignores_repeated_pairs():
+    groups = utils.group_duplicates([("a", "b"), ("b", "a"), ("a", "b")])
+
+    assert groups == {"a": ["b"], "b": ["a"]}
+
+
+def test_identify_duplicate_datasets_lists_each_duplicate_once():
+    datasets = [
+        fake_record(
+            {
+                "Dataset Name": "Study A",
+                "Dataset Contact Name": "John Doe",
+                "Dataset Contact Email": "john@example.com",
+            }
+        )
+        for _ in range(3)
+    ]
+
+    duplicates = utils.identify_duplicate_datasets(datasets, threshold=0.9)
+
+    for dataset in datasets:
+        others = [d["id"] for d in datasets if d is not dataset]
+        assert sorted(duplicates[dataset["id"]]) == sorted(others)
+
+
+def test_match_dataset_pairs_scores_only_given_pairs():
+    datasets = [
+        fake_record(
+            {
+                "Dataset Name": "Study A",
+                "Dataset Contact Name": "John Doe",
+                "Dataset Contact Email": "john@example.com",
+            }
+        )
+        for _ in range(3)
+    ]
+    first, second, third = (d["id"] for d in datasets)
+
+    matches = utils.match_dataset_pairs(datasets, [(first, third)], threshold=0.9)
+
+    assert matches == [(first, third)]
+    assert utils.match_dataset_pairs(datasets, [], threshold=0.9) == []
+
+
+def test_duplicate_blocking_keys():
+    ds = fake_record(
+        {
+            "Dataset Name": "  Étude Birth-Cohort of 2010 ",
+            "Dataset Contact Email": "Jane@Example.org",
+        }
+    )
+
+    assert utils.duplicate_blocking_keys(ds) == [
+        "name:etude",
+        "name:birth",
+        "name:cohort",
+        "name:2010",
+        "name:birth+etude",
+        "name:cohort+etude",
+        "name:2010+etude",
+        "name:birth+cohort",
+        "name:2010+birth",
+        "name:2010+cohort",
+        "email:jane@example.org",
+    ]
+
+
+def test_duplicate_blocking_keys_single_token_and_no_email():
+    ds = fake_record({"Dataset Name": "ALSPAC"})
+
+    assert utils.duplicate_blocking_keys(ds) == ["name:alspac"]
+
+
+def test_duplicate_blocking_keys_keeps_leading_tokens():
+    name = "Zeta Young Study of Sleep, Diet and Screens in Rural Schools at Home"
+    ds = fake_record({"Dataset Name": name})
+
+    keys = utils.duplicate_blocking_keys(ds)
+
+    assert "name:zeta" in keys
+    assert "name:home" not in keys
+
+
+def test_identify_duplicate_datasets_with_minhash_indexing():
+    datasets = [
+        fake_record(
+            {
+                "Dataset Name": name,
+                "Dataset Contact Name": "John Doe",
+                "Dataset Contact Email": email,
+            }
+        )
+        for name, email in [
+            ("Millennium Cohort Study", "john@example.com"),
+            ("Millenium Cohort Study", "doe@example.com"),
+            ("Oslo Sleep Trial", "oslo@example.com"),
+        ]
+    ]
+
+    duplicates = utils.identify_duplicate_datasets(
+        datasets, threshold=0.51, indexing="minhash"
+    )
+
+    assert duplicates == {
+        datasets[0]["id"]: [datasets[1]["id"]],
+        datasets[1]["id"]: [datasets[0]["id"]],
+    }
+
+
+def test_identify_duplicate_datasets_rejects_unknown_indexing():
+    with pytest.raises(ValueError, match="Unknown indexing strategy"):
+        utils.identify_duplicate_datasets([fake_record({})], indexing="bogus")
+
+
+def test_duplicate_candidate_pairs_uses_record_ids():
+    datasets = [
+        fake_record({"Dataset Name": "Study A", "Dataset Contact Email": "a@x.org"}),
+        fake_record({"Dataset Name": "Study B", "Dataset Contact Email": "a@x.org"}),
+    ]
+
+    pairs = utils.duplicate_candidate_pairs(datasets, indexing="full")
+
+    assert {frozenset(pair) for pair in pairs} == {frozenset(d["id"] for d in datasets)}
+
+
+def test_article_match_keys():
+    keys = utils.article_match_keys(
+        "https://doi.org/10.1000/ABC", "  Screen Time & Sleep: A Study ", 2020
+    )
+
+    assert keys == ["doi:10.1000/abc", "title:screen time sleep a study|2020"]
+    assert utils.article_match_keys("", "Title without year", None) == []
+
+
+def test_index_articles_keeps_first_record_per_key():
+    records = [
+        fake_record({"DOI": "10.1000/abc", "Article Title": "One", "Year": 2020}),
+        fake_record({"DOI": "10.1000/ABC"}),
+    ]
+
+    index = utils.index_articles(records)
+
+    assert index == {
+        "doi:10.1000/abc": records[0]["id"],
+        "title:one|2020": records[0]["id"],
+    }
+
+
+def test_abstract_key_ignores_formatting_differences():
+    key = utils.abstract_key("Screen time in Children:  a cohort.", "v1")
+
+    assert key.startswith("v1:")
+    assert utils.abstract_key("screen time in children a cohort", "v1") == key
+    assert utils.abstract_key("Screen time in children, a cohort", "v2") != key
+    assert utils.abstract_key("Screen time in adults: a cohort.", "v1") != key